@@ -0,0 +1,77 @@
+"""
+chroma 벡터 계산 비교: 세그먼트마다 chroma_cqt (기존) vs 곡 전체 CQT 한 번 (chroma_engine)
+
+    uv run python -m bench.bench_chroma path/to/song.wav --repeat 3
+"""
+
+import argparse
+import time
+
+import librosa
+import numpy as np
+
+from service import chroma_engine
+from service.ffmpeg_function import (
+    compute_chroma_vector,
+    compute_ks_correlations,
+    preprocess_audio,
+    select_key,
+)
+
+
+def legacy_chroma_vector(y, sr, segment_seconds=10.0, hop_length=512):
+    """바꾸기 전 compute_chroma_vector"""
+    seg_len = int(sr * segment_seconds)
+    num_segments = max(1, len(y) // seg_len)
+
+    chroma_sum = np.zeros(12)
+    for i in range(num_segments):
+        segment = y[i * seg_len : min(len(y), (i + 1) * seg_len)]
+        chroma = librosa.feature.chroma_cqt(y=segment, sr=sr, hop_length=hop_length)
+        chroma_sum += np.mean(chroma, axis=1)
+
+    chroma_vec = chroma_sum / num_segments
+    return chroma_vec / np.linalg.norm(chroma_vec)
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wav")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--atol", type=float, default=5e-3)
+    args = parser.parse_args()
+
+    y, sr = librosa.load(args.wav, sr=None, mono=True)
+    y = preprocess_audio(y, sr)
+    print(f"{len(y) / sr:.1f}s @ {sr} Hz")
+
+    # 첫 호출의 import / JIT 비용은 빼고 잰다.
+    chroma_engine.chroma_vector(y[: sr * 10], sr)
+    legacy_chroma_vector(y[: sr * 10], sr)
+
+    legacy_sec, expected = best(lambda: legacy_chroma_vector(y, sr), args.repeat)
+    engine_sec, actual = best(lambda: compute_chroma_vector(y, sr), args.repeat)
+
+    diff = np.abs(expected - actual).max()
+    print(f"legacy {legacy_sec:7.3f}s")
+    print(f"engine {engine_sec:7.3f}s  ({legacy_sec / engine_sec:.1f}x)  max |diff| {diff:.2e}")
+
+    assert diff < args.atol, diff
+
+    old_key = select_key(*compute_ks_correlations(expected))
+    new_key = select_key(*compute_ks_correlations(actual))
+    print(f"key    {old_key['key']} {old_key['mode']} -> {new_key['key']} {new_key['mode']}")
+    assert (old_key["key"], old_key["mode"]) == (new_key["key"], new_key["mode"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+가사 페이지 추출 백엔드 비교 (bs4 vs lxml) + 결과 동일성 확인
+
+    uv run python -m bench.bench_extract --number 50
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+
+from service.lyrics_extract import BACKENDS, parse_search_results, parse_track_lyrics
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    search_html = (FIXTURES / "bugs_search.html").read_text(encoding="utf-8")
+    track_pages = [
+        (FIXTURES / name).read_text(encoding="utf-8")
+        for name in (
+            "bugs_track.html",
+            "bugs_track_no_lyrics.html",
+            "bugs_track_xmp_outside.html",
+            "bugs_track_upper_xmp.html",
+        )
+    ]
+
+    for limit in (1, 8, 100):
+        expected = parse_search_results(search_html, limit, backend="bs4")
+        for backend in BACKENDS:
+            assert parse_search_results(search_html, limit, backend=backend) == expected
+
+    for html in track_pages:
+        expected = parse_track_lyrics(html, backend="bs4")
+        for backend in BACKENDS:
+            assert parse_track_lyrics(html, backend=backend) == expected
+
+    for backend in BACKENDS:
+        search_sec = timeit.timeit(
+            lambda: parse_search_results(search_html, 8, backend=backend),
+            number=args.number,
+        )
+        track_sec = timeit.timeit(
+            lambda: parse_track_lyrics(track_pages[0], backend=backend),
+            number=args.number,
+        )
+        print(
+            f"{backend:>5}: search {search_sec / args.number * 1000:7.2f} ms"
+            f" / track {track_sec / args.number * 1000:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+페이지 첫 화면까지 걸리는 시간 + 첫 디코딩 시간 (매번 새 프로세스에서, 콜드 import 포함)
+
+- first paint : streamlit AppTest 로 페이지 스크립트를 버튼 누르기 전까지 한 번 실행
+- first decode: librosa.load (soundfile / resample) vs decode_audio (ffmpeg → np.frombuffer)
+
+    uv run python -m bench.bench_import --page pages/3_youtube_bpm_code.py --wav song.wav
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["librosa.core", "scipy.signal", "numba", "matplotlib.pyplot", "pandas", "pptx"]
+
+_FIRST_PAINT = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout=120)
+at.run()
+sec = time.perf_counter() - t0
+assert not at.exception, at.exception
+print(json.dumps({{"sec": sec, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_DECODE = {
+    "librosa.load": """
+import librosa
+y, sr = librosa.load({wav!r}, sr=22050, mono=True)
+""",
+    "decode_audio": """
+from service.ffmpeg_function import decode_audio
+y = decode_audio({wav!r}, sr=22050)
+""",
+}
+
+_TIMED = """
+import json, time
+t0 = time.perf_counter()
+{body}
+print(json.dumps({{"sec": time.perf_counter() - t0}}))
+"""
+
+
+def run_fresh(code: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page", default="pages/3_youtube_bpm_code.py")
+    parser.add_argument("--wav", help="첫 디코딩 비교용 오디오 파일 (없으면 건너뜀)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [
+        run_fresh(_FIRST_PAINT.format(page=args.page, heavy=HEAVY_MODULES))
+        for _ in range(args.repeat)
+    ]
+    print(f"first paint  : {statistics.median(r['sec'] for r in runs):.3f}s (median of {args.repeat})")
+    print(f"  loaded     : {', '.join(runs[0]['loaded']) or '-'}")
+
+    if args.wav:
+        for name, body in _DECODE.items():
+            code = _TIMED.format(body=body.format(wav=args.wav))
+            secs = [run_fresh(code)["sec"] for _ in range(args.repeat)]
+            print(f"{name:13}: {statistics.median(secs):.3f}s (cold import 포함)")
+
+
+if __name__ == "__main__":
+    main()
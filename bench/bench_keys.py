@@ -0,0 +1,92 @@
+"""
+키 점수 계산 비교: 기존 12회 np.corrcoef 루프 vs 24×12 행렬 곱 (단일 / 배치)
+
+    uv run python -m bench.bench_keys --number 2000 --batch 360
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from service.ffmpeg_function import (
+    MAJOR_PROFILE,
+    MINOR_PROFILE,
+    build_ranked_results,
+    compute_ks_correlations,
+)
+from service.key_scoring import PROFILES, get_scorer
+
+
+def legacy_ks_correlations(chroma_vec, major_profile=MAJOR_PROFILE, minor_profile=MINOR_PROFILE):
+    """바꾸기 전 compute_ks_correlations"""
+    major_scores = []
+    minor_scores = []
+
+    for i in range(12):
+        major_scores.append(np.corrcoef(np.roll(major_profile, i), chroma_vec)[0, 1])
+        minor_scores.append(np.corrcoef(np.roll(minor_profile, i), chroma_vec)[0, 1])
+
+    return np.array(major_scores), np.array(minor_scores)
+
+
+def legacy_ranked_results(major_scores, minor_scores, top_n=5):
+    labels = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+    results = [(labels[i], "Major", float(s)) for i, s in enumerate(major_scores)]
+    results += [(labels[i], "Minor", float(s)) for i, s in enumerate(minor_scores)]
+    results.sort(key=lambda x: x[2], reverse=True)
+    return results[:top_n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=360, help="세그먼트/곡 수 (N×12)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    chromas = rng.random((args.batch, 12))
+
+    # 결과 동일성
+    for chroma in chromas[:100]:
+        old_major, old_minor = legacy_ks_correlations(chroma)
+        new_major, new_minor = compute_ks_correlations(chroma)
+        assert np.allclose(old_major, new_major) and np.allclose(old_minor, new_minor)
+        assert [r[:2] for r in legacy_ranked_results(old_major, old_minor)] == [
+            r[:2] for r in build_ranked_results(new_major, new_minor)
+        ]
+
+    for name, (major, minor) in PROFILES.items():
+        expected = np.hstack(legacy_ks_correlations(chromas[0], np.array(major), np.array(minor)))
+        assert np.allclose(get_scorer(name).correlations(chromas[0]), expected), name
+
+    batch_scores = get_scorer().correlations(chromas)
+    assert batch_scores.shape == (args.batch, 24)
+    assert np.allclose(batch_scores[7], np.hstack(legacy_ks_correlations(chromas[7])))
+
+    # 속도
+    chroma = chromas[0]
+    n = args.number
+
+    legacy = timeit.timeit(lambda: legacy_ks_correlations(chroma), number=n) / n
+    single = timeit.timeit(lambda: compute_ks_correlations(chroma), number=n) / n
+    print(f"single  loop   {legacy * 1e6:9.1f} us")
+    print(f"single  matrix {single * 1e6:9.1f} us  ({legacy / single:.0f}x)")
+
+    batch_n = max(1, n // 20)
+    legacy_batch = (
+        timeit.timeit(lambda: [legacy_ks_correlations(c) for c in chromas], number=batch_n)
+        / batch_n
+    )
+    matrix_batch = (
+        timeit.timeit(lambda: get_scorer().correlations(chromas), number=batch_n) / batch_n
+    )
+    print(f"batch {args.batch} loop   {legacy_batch * 1e3:9.2f} ms")
+    print(
+        f"batch {args.batch} matrix {matrix_batch * 1e3:9.2f} ms"
+        f"  ({legacy_batch / matrix_batch:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
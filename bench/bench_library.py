@@ -0,0 +1,77 @@
+"""
+SONGS 리터럴 모듈 import vs 곡 라이브러리(SQLite) — 시간 / 메모리 (매번 새 프로세스)
+
+- module   : 곡 N개짜리 SONGS 모듈을 import (지금 source/lyrics.py 를 쓰는 방식)
+- open     : 라이브러리를 열고 len() 만
+- find     : 제목으로 곡 하나 찾기 (그 곡만 풀어서 읽는다)
+- iterate  : 라이브러리 전체를 순회 (한 번에 한 페이지만 메모리에)
+
+    uv run python -m bench.bench_library --songs 2000
+"""
+
+import argparse
+import json
+import pprint
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from service.song_library import SongLibrary
+from source.lyrics import SONGS
+
+# 메모리는 최대 RSS 증가분. (tracemalloc 을 켜면 큰 리터럴 모듈 import 가 몇 분씩 걸린다)
+_MEASURE = """
+import json, resource, sys, time
+sys.path.insert(0, {tmp!r})
+import sqlite3, zlib
+rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+{body}
+sec = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0
+print(json.dumps({{"sec": sec, "peak": rss * 1024}}))
+"""
+
+_CASES = {
+    "module": "import bench_songs; n = len(bench_songs.SONGS)",
+    "open": "from service.song_library import SongLibrary; n = len(SongLibrary({db!r}))",
+    "find": "from service.song_library import SongLibrary; s = SongLibrary({db!r}).find({title!r})",
+    "iterate": "from service.song_library import SongLibrary\nfor s in SongLibrary({db!r}): pass",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=2000)
+    args = parser.parse_args()
+
+    songs = [
+        {**SONGS[i % len(SONGS)], "title": f"{SONGS[i % len(SONGS)]['title']} {i}"}
+        for i in range(args.songs)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        module = Path(tmp) / "bench_songs.py"
+        module.write_text(f"SONGS = {pprint.pformat(songs)}\n", encoding="utf-8")
+
+        db = Path(tmp) / "songs.sqlite3"
+        library = SongLibrary(db)
+        library.import_songs("bench_songs.py", songs)
+        library.close()
+
+        print(f"songs : {args.songs}  (module {module.stat().st_size / 1e6:.1f} MB, db {db.stat().st_size / 1e6:.1f} MB)")
+        title = songs[len(songs) // 2]["title"]
+        for name, body in _CASES.items():
+            code = _MEASURE.format(tmp=tmp, body=body.format(db=str(db), title=title))
+            # 첫 실행은 .pyc 를 만드느라 느리므로 두 번째 실행을 잰다. (실제 import 도 .pyc 를 쓴다)
+            for _ in range(2):
+                out = subprocess.run(
+                    [sys.executable, "-c", code], capture_output=True, text=True, check=True
+                ).stdout
+            r = json.loads(out)
+            print(f"{name:8}: {r['sec'] * 1000:8.1f} ms   peak {r['peak'] / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
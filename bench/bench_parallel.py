@@ -0,0 +1,48 @@
+"""
+순차 렌더링 vs 프로세스 풀 병렬 렌더링 비교
+(같은 덱이 나오는지는 test/test_parallel_render.py 에서 확인한다)
+
+    uv run python -m bench.bench_parallel --copies 4 --jobs 8
+"""
+
+import argparse
+import os
+import time
+from io import BytesIO
+
+from pptx import Presentation
+
+from service.streamlit_function import ppt_save
+from source.lyrics import SONGS
+
+
+def build(songs, **kwargs):
+    buf = BytesIO()
+    t0 = time.perf_counter()
+    ppt_save(songs, buf, **kwargs)
+    sec = time.perf_counter() - t0
+
+    buf.seek(0)
+    return Presentation(buf), sec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=4, help="SONGS 반복 횟수")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    songs = SONGS * args.copies
+
+    sequential, seq_sec = build(songs)
+    parallel, par_sec = build(songs, jobs=args.jobs)
+    streamed, stream_sec = build(songs, jobs=args.jobs, stream=True)
+
+    print(f"{len(songs)} songs, {len(sequential.slides)} slides, jobs={args.jobs}")
+    print(f"  sequential: {seq_sec:.3f}s")
+    print(f"    parallel: {par_sec:.3f}s ({seq_sec / par_sec:.1f}x)")
+    print(f"  par+stream: {stream_sec:.3f}s ({seq_sec / stream_sec:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+가사 한 곳을 고쳤을 때: 덱 전체 다시 만들기 vs 기존 덱 패치
+
+- regenerate : ppt_save(stream=True) 로 덱 전체를 새로 (슬라이드 캐시 사용)
+- patch      : 기존 덱에서 바뀐 슬라이드만 다시 쓰기 (슬라이드 캐시 사용)
+둘 다 템플릿 / 폰트는 미리 데워 둔 상태. (Streamlit 페이지처럼 프로세스가 살아 있을 때)
+
+    uv run python -m bench.bench_patch --copies 1
+"""
+
+import argparse
+import copy
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from pptx import Presentation
+
+from service.deck_patch import patch_deck
+from service.pptx_stream import stream_deck
+from service.slide_cache import SongSlideCache
+from service.slide_template import SlideTemplates
+from source.lyrics import SONGS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=1, help="SONGS 반복 횟수")
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    songs = [copy.deepcopy(song) for _ in range(args.copies) for song in SONGS]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = SongSlideCache(tmp / "slides")
+        prs = Presentation()
+        templates = SlideTemplates(prs.slide_width, prs.slide_height)
+
+        deck = tmp / "deck.pptx"
+        stream_deck(songs, deck, cache=cache)
+
+        # 가운데 곡 첫 파트에 글자 하나씩 (매번 다른 내용)
+        middle = songs[len(songs) // 2]
+        part = next(iter(middle["parts"]))
+        original = middle["parts"][part]
+
+        regen, patch = [], []
+        for n in range(args.number):
+            middle["parts"][part] = f"{original}{n}"
+
+            t0 = time.perf_counter()
+            stream_deck(songs, tmp / "regen.pptx", cache=cache)
+            regen.append(time.perf_counter() - t0)
+
+            work = tmp / "work.pptx"
+            shutil.copyfile(deck, work)
+            t0 = time.perf_counter()
+            stats = patch_deck(work, songs, templates=templates, cache=cache)
+            patch.append(time.perf_counter() - t0)
+
+        # 패치한 덱의 슬라이드 = 새로 만든 덱의 슬라이드
+        a, b = Presentation(work), Presentation(tmp / "regen.pptx")
+        assert [s.part.blob for s in a.slides] == [s.part.blob for s in b.slides]
+
+        before = {i.filename: i.CRC for i in zipfile.ZipFile(deck).infolist()}
+        after = {i.filename: i.CRC for i in zipfile.ZipFile(work).infolist()}
+        changed = sum(1 for name, crc in after.items() if before.get(name) != crc)
+
+        regen_ms = min(regen) * 1000
+        patch_ms = min(patch) * 1000
+        print(f"slides     : {stats['slides']} (zip 항목 {len(after)}개 중 바뀐 항목 {changed}개)")
+        print(f"regenerate : {regen_ms:8.1f} ms")
+        print(f"patch      : {patch_ms:8.1f} ms  (x{regen_ms / patch_ms:.1f})")
+
+
+if __name__ == "__main__":
+    main()
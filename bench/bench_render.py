@@ -0,0 +1,64 @@
+"""
+render_song(기존) vs TemplateRenderer(프로토타입 복제) 슬라이드 생성 속도 비교
+
+    uv run python -m bench.bench_render --repeat 5
+"""
+
+import argparse
+import time
+from io import BytesIO
+
+from lxml import etree
+from pptx import Presentation
+
+from service.function import render_song
+from service.slide_template import TemplateRenderer
+from source.lyrics import SONGS
+
+
+def build_legacy(songs):
+    prs = Presentation()
+    for song in songs:
+        render_song(prs, song)
+    return prs
+
+
+def build_template(songs):
+    prs = Presentation()
+    renderer = TemplateRenderer(prs)
+    for song in songs:
+        renderer.render_song(song)
+    return prs
+
+
+def slide_xmls(prs):
+    return [etree.tostring(s._element) for s in prs.slides]
+
+
+def measure(build, songs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        prs = build(songs)
+        prs.save(BytesIO())
+        best = min(best, time.perf_counter() - t0)
+    return best, len(prs.slides)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=5, help="SONGS 반복 횟수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    songs = SONGS * args.copies
+
+    assert slide_xmls(build_legacy(songs)) == slide_xmls(build_template(songs))
+
+    for name, build in [("legacy", build_legacy), ("template", build_template)]:
+        sec, n = measure(build, songs, args.repeat)
+        print(f"{name:>10}: {n} slides / {sec:.3f}s = {n / sec:,.0f} slides/s")
+
+
+if __name__ == "__main__":
+    main()
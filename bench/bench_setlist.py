@@ -0,0 +1,77 @@
+"""
+PPT 생성기 페이지의 키 입력 한 번(rerun) 당 파싱 시간 비교
+
+- legacy     : 텍스트 전체 ast.literal_eval + 곡마다 송폼 검사 (바꾸기 전 페이지 코드)
+- cold       : 세트리스트 형식 parse_setlist, 블록 캐시가 빈 상태 (처음 붙여넣었을 때)
+- keystroke  : 곡 하나에 글자 하나를 바꾼 뒤 parse_setlist (바뀐 블록만 다시 파싱)
+
+    uv run python -m bench.bench_setlist --copies 20
+"""
+
+import argparse
+import ast
+import pprint
+import timeit
+
+from service.setlist_format import _parse_block, format_setlist, parse_setlist
+from service.slide_plan import plan_song
+from service.song_form import compile_song_form
+from source.lyrics import SONGS
+
+
+def legacy_parse(text):
+    song_list = ast.literal_eval(text)
+    for item in song_list:
+        compile_song_form(item.get("song_form", ""))
+    return song_list
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=20, help="SONGS 반복 횟수")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    # 곡마다 제목이 달라야 블록도 다르다. (수련회 세트리스트 크기 흉내)
+    songs = [
+        {**song, "title": f"{song['title']} {n}"}
+        for n in range(args.copies)
+        for song in SONGS
+    ]
+    literal = pprint.pformat(songs)
+    text = format_setlist(songs)
+
+    # 같은 곡이 나오는지
+    parsed = parse_setlist(text)
+    assert parsed.ok and len(parsed.songs) == len(songs)
+    assert all(plan_song(a) == plan_song(b) for a, b in zip(songs, parsed.songs))
+    assert len(parse_setlist(literal).songs) == len(songs)
+
+    legacy = timeit.timeit(lambda: legacy_parse(literal), number=args.number) / args.number
+
+    def cold():
+        _parse_block.cache_clear()
+        parse_setlist(text)
+
+    cold_sec = timeit.timeit(cold, number=args.number) / args.number
+
+    # 가운데 곡 가사에 글자를 하나씩 더해 가며 (매번 다른 텍스트)
+    _parse_block.cache_clear()
+    parse_setlist(text)
+    middle = text.index(f"= {songs[len(songs) // 2]['title']}\n")
+    edits = iter(range(10**9))
+
+    def keystroke():
+        n = next(edits)
+        parse_setlist(text[:middle] + f"= 수정{n}" + text[middle + 1 :])
+
+    key_sec = timeit.timeit(keystroke, number=args.number) / args.number
+
+    print(f"songs      : {len(songs)} ({len(text.splitlines())} lines)")
+    print(f"legacy     : {legacy * 1000:8.2f} ms")
+    print(f"cold       : {cold_sec * 1000:8.2f} ms")
+    print(f"keystroke  : {key_sec * 1000:8.2f} ms  (x{legacy / key_sec:.1f} vs legacy)")
+
+
+if __name__ == "__main__":
+    main()
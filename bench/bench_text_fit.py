@@ -0,0 +1,77 @@
+"""
+가사 줄 맞추기(text_fit) 비용
+
+- load     : 폰트 읽고 글자 폭 표 만들기 (프로세스마다 한 번)
+- cold     : 처음 보는 슬라이드 N장 맞추기 (줄 폭 재기 + 줄 나누기)
+- warm     : 같은 슬라이드 다시 (기억해 둔 결과)
+- naive    : 글자마다 파이썬으로 폭을 더하는 방식으로 같은 줄 폭 재기 (비교용)
+
+    uv run python -m bench.bench_text_fit --copies 20
+"""
+
+import argparse
+import time
+
+from pptx.util import Pt
+
+from service.function import LYRICS_BOX_HEIGHT, LYRICS_BOX_WIDTH
+from service.slide_plan import LYRICS, plan_song
+from service.text_fit import _fitter, default_font_path, fit_lyrics, get_metrics
+from source.lyrics import SONGS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=20, help="SONGS 반복 횟수")
+    args = parser.parse_args()
+
+    width = min(LYRICS_BOX_WIDTH, Pt(720))
+
+    t0 = time.perf_counter()
+    metrics = get_metrics()
+    load = time.perf_counter() - t0
+
+    # 복사본마다 글자를 붙여서 줄이 모두 달라지게 한다. (캐시가 안 맞도록)
+    slides = [
+        tuple(f"{line} {n}" for line in planned.lines)
+        for n in range(args.copies)
+        for song in SONGS
+        for planned in plan_song(song)
+        if planned.kind == LYRICS
+    ]
+    lines = [line for slide in slides for line in slide]
+
+    t0 = time.perf_counter()
+    results = [fit_lyrics(slide, width, LYRICS_BOX_HEIGHT) for slide in slides]
+    cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for slide in slides:
+        fit_lyrics(slide, width, LYRICS_BOX_HEIGHT)
+    warm = time.perf_counter() - t0
+
+    widths = metrics.widths.tolist()
+    t0 = time.perf_counter()
+    for line in lines:
+        sum(widths[min(ord(ch), 0xFFFF)] for ch in line)
+    naive = time.perf_counter() - t0
+
+    metrics.line_em.cache_clear()
+    t0 = time.perf_counter()
+    for line in lines:
+        metrics.line_em(line)
+    vector = time.perf_counter() - t0
+
+    wrapped = sum(len(r[1]) != len(s) for r, s in zip(results, slides))
+    shrunk = sum(r[0] < _fitter(int(width), int(LYRICS_BOX_HEIGHT)).max_size for r in results)
+
+    print(f"font     : {default_font_path()}")
+    print(f"slides   : {len(slides)} ({len(lines)} lines, 줄바꿈 {wrapped}장, 글자 줄임 {shrunk}장)")
+    print(f"load     : {load * 1000:8.1f} ms")
+    print(f"cold     : {cold / len(slides) * 1e6:8.1f} us / slide")
+    print(f"warm     : {warm / len(slides) * 1e6:8.1f} us / slide")
+    print(f"line em  : {vector / len(lines) * 1e6:8.1f} us / line (naive {naive / len(lines) * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
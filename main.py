@@ -1,21 +1,92 @@
-# from pptx import Presentation
-# from source.lyrics import SONGS
-# from service.function import render_song
+"""
+PPT 덱을 명령줄에서 한 번에 여러 개 만든다. (Streamlit 없이)
 
+    uv run python main.py source/lyrics.py
+    uv run python main.py setlists/*.txt --out-dir PPT --jobs 4
+    uv run python main.py setlists/0301.txt --patch   # PPT/0301.pptx 에서 바뀐 슬라이드만 고치기
 
-# def ppt_save(path):
-#     prs = Presentation()
+입력 파일 하나가 덱 하나가 된다. (<out-dir>/<입력 파일 이름>.pptx)
+입력 형식은 service/deck_builder.py 참고.
+"""
 
-#     for song in SONGS:
-#         render_song(prs, song)
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
 
-#     prs.save(path)
+from service.deck_builder import iter_build_decks
 
 
-# def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="세트리스트 / 곡 모듈로 PPT 덱 만들기")
+    parser.add_argument("inputs", nargs="+", help="세트리스트 파일(.txt / .json), SONGS 모듈(.py), 곡 라이브러리(.sqlite3)")
+    parser.add_argument("--out-dir", default="PPT", help="출력 폴더 (기본: PPT)")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=f"동시에 만들 덱 수 (프로세스, 이 머신: {os.cpu_count()}코어)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".cache/slides",
+        help="곡 슬라이드 캐시 폴더 (PPT 생성기 페이지와 같이 쓴다)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="슬라이드 캐시를 쓰지 않는다")
+    parser.add_argument(
+        "--patch",
+        action="store_true",
+        help="출력 덱이 이미 있으면 다시 만들지 않고 바뀐 슬라이드만 고친다",
+    )
+    return parser.parse_args(argv)
 
-#     ppt_save("./PPT/setlist.pptx")
 
+def main(argv=None) -> int:
+    args = parse_args(argv)
 
-# if __name__ == "__main__":
-#     main()
+    out_dir = Path(args.out_dir)
+    decks = [(src, out_dir / f"{Path(src).stem}.pptx") for src in args.inputs]
+
+    outs = [out for _, out in decks]
+    if len(set(outs)) != len(outs):
+        print("입력 파일 이름이 겹쳐서 출력 파일이 덮어써집니다.", file=sys.stderr)
+        return 2
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    jobs = max(1, min(args.jobs, len(decks)))
+
+    t0 = time.perf_counter()
+    failed = 0
+
+    for src, out, stats, error in iter_build_decks(
+        decks, jobs=jobs, cache_dir=cache_dir, patch=args.patch
+    ):
+        if error is not None:
+            failed += 1
+            print(f"[FAIL] {src}: {error}", file=sys.stderr)
+            continue
+
+        if "patched" in stats:
+            changed = ", ".join(stats["changed_songs"]) or "-"
+            print(
+                f"[TIME] {out}: {stats['seconds']:.3f}s "
+                f"(패치 {stats['patched']}/{stats['slides']}장, 바뀐 곡: {changed})"
+            )
+            continue
+
+        print(
+            f"[TIME] {out}: {stats['seconds']:.3f}s "
+            f"({stats['songs']}곡 / {stats['slides']}장, 파싱 {stats['parse_seconds']:.3f}s, "
+            f"캐시 재사용 {stats['hits']}곡)"
+        )
+
+    print(
+        f"[TIME] total: {time.perf_counter() - t0:.3f}s "
+        f"({len(decks) - failed}/{len(decks)} 덱, jobs={jobs})"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,12 @@ from service.streamlit_function import (
     reset_session,
     export_retreat,
     export_holiday,
-    crawl_lyrics,
+    search_lyrics,
     sync_lyrics_with_track,
     listup_lyrics_result,
 )
 from service.streamlit_function import load_css
+from service.song_form import compile_song_form, SongFormError
 
 st.set_page_config(
     page_title="가사 검색기",
@@ -63,7 +64,8 @@ with col_left:
             st.toast("검색어를 입력하세요.", icon="⚠️")
         else:
             try:
-                results = crawl_lyrics(query)
+                # 로컬 라이브러리/캐시에서 먼저 찾고, 그대로 맞는 곡이 없으면 벅스 검색
+                results = search_lyrics(query)
                 st.session_state.search_results = results
                 st.toast("검색 완료", icon="✅")
             except Exception as e:
@@ -92,9 +94,17 @@ with col_right:
 
     song_form = st.text_input(
         label="송폼",
-        placeholder="예: A1BCBB(4)A2BBC",
+        placeholder="예: A1BCBB(4)A2BBC, B(x2), [AB]x2",
     )
 
+    song_form_error = None
+    if song_form.strip():
+        try:
+            compile_song_form(song_form)
+        except SongFormError as e:
+            song_form_error = e
+            st.error(f"송폼 오류 - {e}")
+
     st.divider()
 
     for i in range(st.session_state.part_count):
@@ -117,14 +127,20 @@ with col_right:
         st.session_state.part_count += 1
 
 if st.button("🙏🏻 주일예배 추출하기", use_container_width=True):
-    export_holiday(song_form)
-    st.session_state.export_type = "sunday"
-    st.toast("복사되었습니다 ✅", icon="📋")
+    if song_form_error:
+        st.toast(f"송폼 오류 - {song_form_error}", icon="❌")
+    else:
+        export_holiday(song_form)
+        st.session_state.export_type = "sunday"
+        st.toast("복사되었습니다 ✅", icon="📋")
 
 if st.button("📤 수련회용 추출하기", use_container_width=True):
-    export_retreat(song_form)
-    st.session_state.export_type = "retreat"
-    st.toast("복사되었습니다 ✅", icon="📋")
+    if song_form_error:
+        st.toast(f"송폼 오류 - {song_form_error}", icon="❌")
+    else:
+        export_retreat(song_form)
+        st.session_state.export_type = "retreat"
+        st.toast("복사되었습니다 ✅", icon="📋")
 
 if "extracted_text" in st.session_state:
     st.subheader("📋 추출 결과")
@@ -1,8 +1,11 @@
 from datetime import datetime
+from service.deck_patch import DeckPatchError, patch_deck
 from service.streamlit_function import ppt_save
-from io import BytesIO
+from service.slide_cache import SongSlideCache
+from service.setlist_format import parse_setlist
 import streamlit as st
-import ast
+import io
+import tempfile
 
 st.set_page_config(
     page_title="수련회용 PPT 생성기",
@@ -12,6 +15,13 @@ st.set_page_config(
 
 st.title("💬 PPT 생성기")
 
+
+@st.cache_resource
+def get_slide_cache():
+    # 프로세스 전체에서 하나만 써야 hit/miss 누적이 의미가 있다.
+    return SongSlideCache(".cache/slides")
+
+
 # ----------------------
 # Layout: 2 Columns
 # ----------------------
@@ -20,31 +30,40 @@ col_left, col_right = st.columns([3, 1])
 # ----------------------
 # Left: Text Input
 # ----------------------
+song_list = None  # 파싱된 세트리스트가 있을 때만 버튼을 쓸 수 있다.
+
 with col_left:
-    st.subheader("DICT형태의 곡 정보 첨부")
+    st.subheader("세트리스트 첨부")
 
     ppt_text = st.text_area(
         label="",
         height=500,
-        placeholder="여기에 PPT로 만들 텍스트를 붙여넣으세요",
+        placeholder=(
+            "= 곡 제목\nform: (4)AB(4)ABB\n\n[A]\n가사 ...\n\n[B]\n가사 ...\n\n"
+            "= 다음 곡 ...\n\n(예전 list 형식도 그대로 붙여넣을 수 있습니다)"
+        ),
         key="ppt_source_text",
     )
     if ppt_text.strip():
         try:
-            song_list = ast.literal_eval(ppt_text)
-
-            if not isinstance(song_list, list):
-                raise ValueError("list 형식이 아닙니다.")
-
-            for i, item in enumerate(song_list):
-                if not isinstance(item, dict):
-                    raise ValueError(f"{i}번째 요소가 dict가 아닙니다.")
-
+            # 곡 블록 단위로 캐시되어서 키 입력마다 바뀐 곡만 다시 파싱한다.
+            setlist = parse_setlist(ppt_text)
+        except Exception as e:
+            st.toast(f"세트리스트 파싱 실패: {e}", icon="❌")
+        else:
+            song_list = setlist.songs
             st.session_state.song_list = song_list
-            st.toast(f"{len(song_list)}곡이 list로 저장되었습니다.", icon="✅")
 
-        except Exception as e:
-            st.toast(f"list 파싱 실패: {e}", icon="❌")
+            if setlist.issues:
+                st.error(
+                    f"{len(setlist.issues)}개 오류 (오류가 있는 곡은 빼고 {len(setlist.songs)}곡으로 만듭니다)\n\n"
+                    + "\n".join(f"- {issue}" for issue in setlist.issues)
+                )
+            else:
+                st.toast(f"{len(setlist.songs)}곡이 list로 저장되었습니다.", icon="✅")
+
+            if setlist.warnings:
+                st.warning("\n".join(f"- {warning}" for warning in setlist.warnings))
 
 # ----------------------
 # Right: Action Button
@@ -54,21 +73,57 @@ with col_right:
 
     st.markdown("<br>", unsafe_allow_html=True)
 
-    if st.button("📄 PPT 생성하기", use_container_width=True):
+    if st.button("📄 PPT 생성하기", use_container_width=True, disabled=song_list is None):
         now = datetime.now().strftime("%Y%m%d_%H%M%S")
         file_name = f"{now}.pptx"
 
-        ppt_buffer = BytesIO()
+        # Presentation 객체를 메모리에 쌓지 않도록 임시 파일로 스트리밍해서 저장
+        slide_cache = get_slide_cache()
+        slide_cache.reset_stats()
 
-        # ppt_save 함수가 path 대신 file-like object를 받도록 수정
-        ppt_save(song_list, ppt_buffer)
+        ppt_file = tempfile.TemporaryFile()
+        ppt_save(song_list, ppt_file, stream=True, cache=slide_cache)
 
-        ppt_buffer.seek(0)
+        stats = slide_cache.stats()
+        st.caption(f"캐시 재사용 {stats['hits']}곡 / 새로 렌더링 {stats['misses']}곡")
+
+        # download_button 은 파일 객체 중 BufferedReader / BytesIO 만 받고, 어느 쪽이든 내용을 바이트로 들고 있는다.
+        # 그래서 완성된 zip 은 여기서 한 번 메모리에 올라온다. (아끼는 건 렌더링 중의 객체 그래프)
+        ppt_file.seek(0)
 
         st.download_button(
             label="⬇️ PPT 다운로드",
-            data=ppt_buffer,
+            data=ppt_file.read(),
             file_name=file_name,
             mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
             use_container_width=True,
         )
+
+    # ----------------------
+    # 이미 만든 덱 고치기 (바뀐 슬라이드만)
+    # ----------------------
+    st.markdown("<br>", unsafe_allow_html=True)
+    old_deck = st.file_uploader("고칠 PPT (이전에 만든 덱)", type=["pptx"])
+
+    if old_deck is not None and st.button(
+        "🩹 바뀐 슬라이드만 고치기", use_container_width=True, disabled=song_list is None
+    ):
+        slide_cache = get_slide_cache()
+        patched_file = io.BytesIO()
+        try:
+            stats = patch_deck(old_deck, song_list, out=patched_file, cache=slide_cache)
+        except DeckPatchError as e:
+            st.error(str(e))
+        else:
+            changed = stats["rewritten"] + stats["added"] + stats["removed"]
+            st.caption(
+                f"{stats['slides']}장 중 {changed}장 고침"
+                + (f" ({', '.join(stats['changed_songs'])})" if stats["changed_songs"] else "")
+            )
+            st.download_button(
+                label="⬇️ 고친 PPT 다운로드",
+                data=patched_file.getvalue(),
+                file_name=old_deck.name,
+                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                use_container_width=True,
+            )
@@ -2,7 +2,13 @@ import streamlit as st
 from pathlib import Path
 from datetime import datetime
 from io import BytesIO
-from service.streamlit_function import plot_chroma_histogram, build_key_ranking_table
+from service.audio_view import (
+    plot_chroma_histogram,
+    build_key_ranking_table,
+    build_batch_row,
+    build_batch_table,
+    plot_key_timeline,
+)
 from service.ffmpeg_function import (
     extract_video_id,
     download_wav_to_memory,
@@ -12,6 +18,10 @@ from service.ffmpeg_function import (
     get_key_from_buffer,
     get_key_from_wav,
 )
+from service.analysis_cache import AnalysisCache
+from service.analysis_jobs import FAILED, QUEUED, AnalysisQueue
+from service.batch_analysis import iter_batch_analysis
+from service.progressive_key import DEFAULT_MIN_MARGIN
 
 st.set_page_config(
     page_title="BPM, Key 찾기",
@@ -30,6 +40,104 @@ def log_time(msg, t0):
     return now
 
 
+@st.cache_resource
+def get_analysis_cache():
+    return AnalysisCache(".cache/analysis")
+
+
+@st.cache_resource
+def get_analysis_queue():
+    # 모든 세션이 같은 큐를 쓴다. 동시에 도는 분석은 workers 개까지, 같은 곡은 작업 하나를 같이 본다.
+    return AnalysisQueue(cache=get_analysis_cache(), workers=2)
+
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id):
+    """작업이 끝날 때까지 이 부분만 1초마다 다시 그리고, 끝나면 페이지 전체를 rerun 해서 결과를 그린다."""
+    job = get_analysis_queue().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+
+    snapshot = job.snapshot()
+    if snapshot["status"] == QUEUED:
+        st.info(f"분석 대기 중... (대기 / 진행 중인 작업 {get_analysis_queue().pending()}개)")
+        return
+
+    progress = snapshot["progress"]
+    st.info("오디오 다운로드 및 분석 중...")
+    st.caption(
+        f"{progress['seconds']:.0f}초 분석 · BPM {progress['bpm'] or '-'} · "
+        f"키 {progress['key'] or '-'} · {snapshot['elapsed']:.0f}초 경과"
+    )
+
+
+def show_analysis(analysis):
+    bpm = analysis["bpm"]
+    result = analysis["key"]
+
+    if analysis["source"] == "cache":
+        st.caption("저장된 분석 결과")
+    else:
+        caption = f"앞부분 {analysis['seconds_used']:.0f}초 분석"
+        if analysis["stopped_early"]:
+            caption += " (결과가 안정되어 일찍 종료)"
+        if analysis["source"] == "pcm":
+            caption = "저장된 오디오로 다시 분석 (다운로드 생략) · " + caption
+        st.caption(caption)
+
+    st.success("분석 완료")
+
+    # ------------------
+    # BPM & Primary Key (side by side)
+    # ------------------
+    col_bpm, col_key = st.columns(2)
+
+    with col_bpm:
+        st.subheader("⏱ BPM")
+        st.markdown(f"## **{int(round(bpm))}**", unsafe_allow_html=True)
+
+    with col_key:
+        primary = result["primary_key"]
+        st.subheader("🎵 예상 키")
+        st.markdown(
+            f"## **{primary['key']} {primary['mode']}**  \n"
+            f"<span style='color:gray'>(correlation = {primary['score']:.3f})</span>",
+            unsafe_allow_html=True,
+        )
+
+    # ------------------
+    # Chroma Histogram
+    # ------------------
+    col_chroma, col_timeline = st.columns(2)
+
+    with col_chroma:
+        st.subheader("🎹 음별 에너지 분포")
+        fig = plot_chroma_histogram(result["chroma_vector"])
+        st.pyplot(fig)
+
+    # ------------------
+    # Key / Tempo Timeline (전조 확인용)
+    # ------------------
+    with col_timeline:
+        st.subheader("🕒 키 / 템포 변화")
+        if analysis["timeline"]:
+            fig = plot_key_timeline(analysis["timeline"], analysis["tempo_curve"])
+            st.pyplot(fig)
+
+            keys = [f"{span['key']} {span['mode']}" for span in analysis["timeline"]]
+            if len(set(keys)) > 1:
+                st.caption("키 변화: " + " → ".join(keys))
+        else:
+            st.caption("타임라인 없음")
+
+    # ------------------
+    # Key Ranking Table
+    # ------------------
+    st.subheader("📊 키 후보 랭킹")
+    df_rank = build_key_ranking_table(result["ranked_candidates"], top_n=10)
+    st.dataframe(df_rank, use_container_width=True)
+
+
 left, right = st.columns([1.2, 1])
 
 with left:
@@ -50,54 +158,85 @@ with left:
 with right:
     st.subheader("🎼 음향 분석")
 
+    streaming = st.toggle(
+        "스트리밍 분석 (임시 파일 없이, 결과가 안정되면 일찍 종료)", value=True
+    )
+
+    with st.expander("키 분석 옵션 (전체 다운로드 / 일괄 분석)"):
+        quick_key = st.toggle("확신이 서면 키 분석 일찍 종료", value=True)
+        key_margin = st.slider(
+            "1·2위 후보 상관계수 차이 기준",
+            min_value=0.02,
+            max_value=0.3,
+            value=DEFAULT_MIN_MARGIN,
+            step=0.01,
+            disabled=not quick_key,
+        )
+        if not quick_key:
+            key_margin = None
+
     if st.button("분석 시작", use_container_width=True):
         if not url:
             st.warning("YouTube URL을 입력하세요.")
         else:
-            t = time.time()
-            print("[TIME] start")
-
-            with st.spinner("오디오 다운로드 및 분석 중..."):
-                audio_buf = download_wav_to_tempfile(url)
-                t = log_time("download_wav_to_memory", t)
-
-                bpm = get_bpm_from_wav(audio_buf)
-                t = log_time("get_bpm_from_buffer", t)
-
-                result = get_key_from_wav(audio_buf)
-                t = log_time("get_key_from_buffer", t)
-
-            print(f"[TIME] totla : {time.time() - t:.3f}s")
-            st.success("분석 완료")
-
-            # ------------------
-            # BPM & Primary Key (side by side)
-            # ------------------
-            col_bpm, col_key = st.columns(2)
-
-            with col_bpm:
-                st.subheader("⏱ BPM")
-                st.markdown(f"## **{int(round(bpm))}**", unsafe_allow_html=True)
-
-            with col_key:
-                primary = result["primary_key"]
-                st.subheader("🎵 예상 키")
-                st.markdown(
-                    f"## **{primary['key']} {primary['mode']}**  \n"
-                    f"<span style='color:gray'>(correlation = {primary['score']:.3f})</span>",
-                    unsafe_allow_html=True,
-                )
-
-            # ------------------
-            # Chroma Histogram
-            # ------------------
-            st.subheader("🎹 음별 에너지 분포")
-            fig = plot_chroma_histogram(result["chroma_vector"])
-            st.pyplot(fig)
+            # 분석은 백그라운드 작업 큐에서 돈다. 페이지는 job id 만 들고 진행 상황을 확인한다.
+            job = get_analysis_queue().submit(
+                url, streaming=streaming, key_margin=key_margin, timeline=True
+            )
+            st.session_state.analysis_job_id = job.id
+
+    job = get_analysis_queue().get(st.session_state.get("analysis_job_id"))
+    if job is not None:
+        snapshot = job.snapshot()
+        if not job.finished:
+            show_job_progress(job.id)
+        elif snapshot["status"] == FAILED:
+            st.error(f"분석 실패: {snapshot['error']}")
+        else:
+            show_analysis(snapshot["result"])
+
 
-            # ------------------
-            # Key Ranking Table
-            # ------------------
-            st.subheader("📊 키 후보 랭킹")
-            df_rank = build_key_ranking_table(result["ranked_candidates"], top_n=10)
-            st.dataframe(df_rank, use_container_width=True)
+# ----------------------
+# 세트리스트 일괄 분석
+# ----------------------
+st.divider()
+st.subheader("📋 세트리스트 일괄 분석")
+
+batch_text = st.text_area(
+    "YouTube URL 목록 (한 줄에 하나)",
+    height=200,
+    key="batch_urls",
+)
+download_jobs = st.slider("동시 다운로드 수", min_value=1, max_value=8, value=4)
+
+if st.button("일괄 분석 시작", use_container_width=True):
+    urls = [line.strip() for line in batch_text.splitlines() if line.strip()]
+    if not urls:
+        st.warning("YouTube URL을 입력하세요.")
+    else:
+        t = time.time()
+        progress = st.progress(0.0, text=f"0 / {len(urls)}")
+        table = st.empty()
+        rows = {}
+
+        # 끝나는 곡부터 표에 채운다. (순서는 입력 순서로 정렬해서 보여준다)
+        for index, item_url, analysis, error in iter_batch_analysis(
+            urls,
+            cache=get_analysis_cache(),
+            download_jobs=download_jobs,
+            key_margin=key_margin,
+        ):
+            rows[index] = build_batch_row(index, item_url, analysis, error)
+            table.dataframe(
+                build_batch_table(rows),
+                use_container_width=True,
+                hide_index=True,
+            )
+            progress.progress(len(rows) / len(urls), text=f"{len(rows)} / {len(urls)}")
+
+        t = log_time(f"batch ({len(urls)} songs)", t)
+        failed = sum(1 for row in rows.values() if row["BPM"] is None)
+        if failed:
+            st.warning(f"{len(urls) - failed}곡 완료, {failed}곡 실패")
+        else:
+            st.success(f"{len(urls)}곡 분석 완료")
@@ -0,0 +1,240 @@
+"""
+YouTube 오디오 분석 결과 캐시
+
+같은 곡을 한 주에 여러 번 분석하는 경우가 많아서, 영상 ID 별로 디스크에 남겨 둔다.
+
+.cache/analysis/<video_id>/
+    result-<params 해시>.json   BPM, primary_key, ranked_candidates, chroma_vector ...
+    pcm-<sr>.npy               디코딩한 mono float32 PCM (선택)
+    pcm-<sr>.json              PCM 이 덮는 길이 (초) / 곡 끝까지인지
+
+- 결과는 분석 파라미터(길이, 샘플레이트, 세그먼트 길이, 방식, 키 조기 종료 기준)가 같을 때만 쓴다.
+- 파라미터가 달라도 PCM 이 필요한 길이를 덮으면 다운로드 없이 다시 분석한다.
+  PCM 은 np.load(mmap_mode="r") 로 열어서 필요한 만큼만 읽는다.
+- 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴 영상 폴더부터 지운다. (폴더 mtime = 최근 사용)
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 분석 알고리즘을 바꿔서 결과가 달라지면 올려서 기존 결과를 무효화한다.
+ANALYSIS_VERSION = 1
+
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_cacheable_id(video_id: str | None) -> bool:
+    """extract_video_id 결과가 폴더 이름으로 써도 안전한 영상 ID 인지"""
+    return bool(video_id) and _VIDEO_ID.match(video_id) is not None
+
+
+def analysis_params(
+    sr: int,
+    max_seconds: float,
+    segment_seconds: float,
+    streaming: bool,
+    key_margin: float | None = None,
+    timeline: bool = False,
+) -> dict:
+    """
+    결과 캐시 키이자 작업 큐의 중복 판단 키. 결과에 영향이 없는 값은 여기서 걸러낸다.
+    스트리밍 분석은 key_margin 을 쓰지 않으므로 (세그먼트마다 안정됐는지로 멈춘다) None 으로 둔다.
+    analyze_url 은 여기서 나온 key_margin 으로 분석한다.
+    """
+    if streaming:
+        key_margin = None
+    return {
+        "version": ANALYSIS_VERSION,
+        "sr": int(sr),
+        "max_seconds": float(max_seconds),
+        "segment_seconds": float(segment_seconds),
+        "streaming": bool(streaming),
+        "key_margin": None if key_margin is None else float(key_margin),
+        "timeline": bool(timeline),
+    }
+
+
+def params_key(params: dict) -> str:
+    raw = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_result(result: dict) -> dict:
+    out = {}
+    for name, value in result.items():
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        out[name] = value
+    return out
+
+
+def _decode_result(data: dict) -> dict:
+    for name in ("chroma_vector", "major_scores", "minor_scores"):
+        if name in data:
+            data[name] = np.asarray(data[name])
+    if "ranked_candidates" in data:
+        data["ranked_candidates"] = [tuple(r) for r in data["ranked_candidates"]]
+    return data
+
+
+def _write_atomic(path: Path, write) -> bool:
+    """
+    배치 분석(CLI)과 페이지의 작업 큐가 같은 곡을 동시에 쓸 수 있으므로 쓰는 쪽마다 다른 임시 파일에
+    쓰고 바꿔 끼운다. 실패하면 (다른 쪽 evict 로 폴더가 지워진 경우 등) False. 다음에 캐시 miss 일 뿐이다.
+    """
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    except OSError:
+        return False
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except OSError:
+        return False
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return True
+
+
+def _dir_size(directory: Path) -> int:
+    size = 0
+    for p in directory.iterdir():
+        try:
+            size += p.stat().st_size
+        except FileNotFoundError:
+            pass  # 다른 쪽이 바꿔 끼우는 중인 임시 파일
+    return size
+
+
+class AnalysisCache:
+    def __init__(self, cache_dir, max_bytes: int = 2 * 1024**3, keep_pcm: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.keep_pcm = keep_pcm
+
+    def _dir(self, video_id: str) -> Path:
+        if not is_cacheable_id(video_id):
+            raise ValueError(f"invalid video id: {video_id!r}")
+        return self.cache_dir / video_id
+
+    def _touch(self, video_id: str):
+        try:
+            os.utime(self._dir(video_id))
+        except FileNotFoundError:
+            pass
+
+    # ----------------------
+    # 분석 결과
+    # ----------------------
+    def get_result(self, video_id: str, params: dict) -> dict | None:
+        path = self._dir(video_id) / f"result-{params_key(params)}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        self._touch(video_id)
+        return _decode_result(data)
+
+    def put_result(self, video_id: str, params: dict, result: dict):
+        directory = self._dir(video_id)
+        directory.mkdir(exist_ok=True)
+
+        payload = json.dumps(_encode_result(result), ensure_ascii=False).encode("utf-8")
+        if not _write_atomic(
+            directory / f"result-{params_key(params)}.json", lambda f: f.write(payload)
+        ):
+            return
+
+        self._touch(video_id)
+        self._evict()
+
+    # ----------------------
+    # 디코딩한 PCM
+    # ----------------------
+    def get_pcm(self, video_id: str, sr: int, seconds: float) -> np.ndarray | None:
+        """
+        앞에서부터 seconds 초 PCM (읽기 전용 memmap). 캐시된 PCM 이 그만큼을 덮지 못하면 None.
+        곡이 seconds 보다 짧아서 끝까지 저장된 경우에는 있는 만큼 돌려준다.
+        """
+        directory = self._dir(video_id)
+        try:
+            meta = json.loads((directory / f"pcm-{sr}.json").read_text(encoding="utf-8"))
+            pcm = np.load(directory / f"pcm-{sr}.npy", mmap_mode="r")
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return None
+
+        if meta["seconds"] < seconds and not meta["complete"]:
+            return None
+
+        self._touch(video_id)
+        return pcm[: int(sr * seconds)]
+
+    def put_pcm(self, video_id: str, sr: int, pcm: np.ndarray, complete: bool):
+        """
+        complete: 곡 끝까지 디코딩했는지 (max_seconds 에서 잘리거나 일찍 멈췄으면 False)
+        이미 더 긴 PCM 이 있으면 덮어쓰지 않는다.
+        """
+        if not self.keep_pcm:
+            return
+
+        directory = self._dir(video_id)
+        directory.mkdir(exist_ok=True)
+
+        seconds = len(pcm) / sr
+        meta_path = directory / f"pcm-{sr}.json"
+        try:
+            old = json.loads(meta_path.read_text(encoding="utf-8"))
+            if old["complete"] or old["seconds"] >= seconds:
+                return
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        pcm = np.ascontiguousarray(pcm, dtype=np.float32)
+        if not _write_atomic(directory / f"pcm-{sr}.npy", lambda f: np.save(f, pcm)):
+            return
+        meta = json.dumps({"seconds": seconds, "complete": bool(complete)}).encode("utf-8")
+        if not _write_atomic(meta_path, lambda f: f.write(meta)):
+            return
+
+        self._touch(video_id)
+        self._evict()
+
+    # ----------------------
+    # 용량 관리
+    # ----------------------
+    def _evict(self):
+        entries = []
+        total = 0
+        for directory in self.cache_dir.iterdir():
+            if not directory.is_dir():
+                continue
+            try:
+                size = _dir_size(directory)
+                entries.append((directory.stat().st_mtime, size, directory))
+            except FileNotFoundError:
+                continue  # 다른 쪽 evict 가 먼저 지움
+            total += size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, directory in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
@@ -0,0 +1,196 @@
+"""
+음향 분석 백그라운드 작업 큐 (프로세스 전체에서 하나)
+
+analyze_url 을 Streamlit 스크립트 스레드에서 바로 돌리면
+- 분석하는 동안 페이지가 멈추고
+- URL 을 바꾸거나 다른 사람이 페이지를 열어 rerun 이 되면 하던 작업을 버리거나 같은 곡을 또 분석한다.
+
+AnalysisQueue 는 작업을 workers 개 스레드 풀에서 돌린다. (동시에 도는 분석 수 = workers)
+- 같은 영상 ID + 같은 분석 파라미터로 이미 대기 / 진행 중인 작업이 있으면 새로 만들지 않고 그 작업을 돌려준다.
+  (끝난 작업도 keep_seconds 동안은 그대로 돌려준다. 그 뒤로는 AnalysisCache 가 받아 준다)
+- 작업은 진행 상황(분석한 초, 중간 BPM / 키, 마지막 단계)을 들고 있고, 페이지는 job_id 로 꺼내서 본다.
+- 페이지가 rerun 되거나 세션이 끝나도 작업은 끝까지 돌고 결과는 캐시에 남는다.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from service.analysis_cache import analysis_params, params_key
+from service.audio_analysis import analyze_url
+from service.ffmpeg_function import extract_video_id
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class AnalysisJob:
+    """
+    job.status      "queued" / "running" / "done" / "failed"
+    job.progress    {"seconds", "bpm", "key", "step"} (분석 도중 계속 바뀐다)
+    job.result      analyze_url 반환값 (done 일 때)
+    job.error       실패 이유 (failed 일 때)
+    """
+
+    def __init__(self, url: str, dedup_key: tuple, options: dict):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.dedup_key = dedup_key
+        self.options = options
+
+        self.status = QUEUED
+        self.progress = {"seconds": 0.0, "bpm": None, "key": None, "step": None}
+        self.result = None
+        self.error = None
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.steps = []  # [(단계 이름, 걸린 초), ...]
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self) -> dict:
+        """페이지에서 읽을 때는 이걸로 (작업 스레드가 쓰는 도중에도 한 시점의 값)"""
+        with self._lock:
+            return {
+                "id": self.id,
+                "url": self.url,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "waited": (self.started_at or time.time()) - self.created_at,
+                "elapsed": (self.finished_at or time.time()) - (self.started_at or time.time()),
+                "steps": list(self.steps),
+            }
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    # ----------------------
+    # 작업 스레드에서만 부른다
+    # ----------------------
+    def _update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+
+    def _run(self, cache):
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = last = time.time()
+
+        def on_update(seconds, bpm, key_result):
+            key = None
+            if key_result is not None:
+                primary = key_result["primary_key"]
+                key = f"{primary['key']} {primary['mode']}"
+            self._update(seconds=seconds, bpm=bpm, key=key)
+
+        def on_step(name):
+            nonlocal last
+            now = time.time()
+            with self._lock:
+                self.steps.append((name, now - last))
+                self.progress["step"] = name
+            print(f"[TIME] {self.url} {name}: {now - last:.3f}s")
+            last = now
+
+        try:
+            result = analyze_url(
+                self.url, cache=cache, on_update=on_update, on_step=on_step, **self.options
+            )
+        except Exception as e:
+            with self._lock:
+                self.status, self.error = FAILED, str(e)
+        else:
+            with self._lock:
+                self.status, self.result = DONE, result
+        finally:
+            with self._lock:
+                self.finished_at = time.time()
+            self._done.set()
+
+
+class AnalysisQueue:
+    """
+    queue = AnalysisQueue(cache=AnalysisCache(".cache/analysis"), workers=2)
+    job = queue.submit(url, streaming=True, timeline=True)
+    queue.get(job.id).snapshot()    # rerun 마다 상태 확인
+    """
+
+    def __init__(self, cache=None, workers: int = 2, keep_seconds: float = 600):
+        self.cache = cache
+        self.keep_seconds = keep_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self._lock = threading.Lock()
+        self._jobs: dict[str, AnalysisJob] = {}
+        self._by_key: dict[tuple, AnalysisJob] = {}
+
+    def submit(
+        self,
+        url: str,
+        streaming: bool = True,
+        sr: int = 22050,
+        max_seconds: float = 180,
+        segment_seconds: float = 10.0,
+        key_margin: float | None = None,
+        timeline: bool = False,
+    ) -> AnalysisJob:
+        """analyze_url 과 같은 옵션. 같은 곡 / 같은 옵션의 작업이 이미 있으면 그 작업을 돌려준다."""
+        # analyze_url 이 캐시 키로 쓰는 것과 같은 params. 결과에 영향이 없는 옵션
+        # (스트리밍일 때 key_margin) 은 빠져 있어서 그 값만 다른 요청은 같은 작업이 된다.
+        params = analysis_params(sr, max_seconds, segment_seconds, streaming, key_margin, timeline)
+        options = {
+            "streaming": streaming,
+            "sr": sr,
+            "max_seconds": max_seconds,
+            "segment_seconds": segment_seconds,
+            "key_margin": params["key_margin"],
+            "timeline": timeline,
+        }
+        dedup_key = (extract_video_id(url) or url, params_key(params))
+
+        with self._lock:
+            self._prune()
+
+            job = self._by_key.get(dedup_key)
+            if job is not None and job.status != FAILED:
+                return job
+
+            job = AnalysisJob(url, dedup_key, options)
+            self._jobs[job.id] = job
+            self._by_key[dedup_key] = job
+
+        self._executor.submit(job._run, self.cache)
+        return job
+
+    def get(self, job_id: str | None) -> AnalysisJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        """대기 + 진행 중인 작업 수"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _prune(self):
+        """끝난 지 keep_seconds 가 지난 작업은 목록에서 뺀다. (self._lock 안에서 부른다)"""
+        cutoff = time.time() - self.keep_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.dedup_key) is job:
+                    del self._by_key[job.dedup_key]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
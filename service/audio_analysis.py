@@ -0,0 +1,342 @@
+"""
+한 번 디코딩한 오디오로 BPM / 키를 같이 구하는 분석 세션
+
+get_bpm_from_wav 와 get_key_from_wav 는 같은 파일을 각자 다시 디코딩한다.
+AnalysisSession 은 디코딩을 한 번만 하고, 중간 결과(STFT 파워 스펙트로그램, onset envelope,
+튜닝, chroma)를 처음 필요할 때 계산해서 들고 있다가 BPM / 키 계산에서 같이 쓴다.
+
+결과는 기존 함수와 같다.
+- bpm : beat_track 이 안에서 쓰는 onset_strength(aggregate=median) + tempo 와 같은 계산
+- key : key_find_algorithm 과 같은 dict
+"""
+
+import os
+from functools import cached_property
+
+import librosa
+import numpy as np
+
+from service.analysis_cache import analysis_params, is_cacheable_id
+from service.audio_stream import analyze_stream
+from service import chroma_engine
+from service.chroma_engine import estimate_tuning
+from service.key_timeline import key_timeline, tempo_curve
+from service.progressive_key import progressive_key_find
+from service.ffmpeg_function import (
+    build_ranked_results,
+    compute_ks_correlations,
+    decode_audio,
+    download_wav_to_tempfile,
+    extract_video_id,
+    preprocess_audio,
+    select_key,
+)
+
+HOP_LENGTH = 512
+N_FFT = 2048
+
+# 키 타임라인: 10초 구간을 앞뒤 이웃과 묶어 30초 단위로 평균
+TIMELINE_SECONDS = 10.0
+
+
+class AnalysisSession:
+    """
+    session = AnalysisSession.from_wav(path)
+    session.bpm, session.key        # 따로 꺼내거나
+    session.analyze()               # {"bpm", "primary_key", "ranked_candidates", ...} 한 번에
+    """
+
+    def __init__(
+        self,
+        y: np.ndarray,
+        sr: int,
+        hop_length: int = HOP_LENGTH,
+        segment_seconds: float = 10.0,
+        key_margin: float | None = None,
+    ):
+        """
+        key_margin 을 주면 키는 progressive_key_find 로 앞부분부터 늘려 가며 분석하고,
+        1·2위 차이가 key_margin 을 넘으면 거기서 멈춘다.
+        """
+        if y.ndim > 1:
+            y = librosa.to_mono(y)
+
+        self.y = y
+        self.sr = sr
+        self.hop_length = hop_length
+        self.segment_seconds = segment_seconds
+        self.key_margin = key_margin
+
+    @classmethod
+    def from_wav(cls, wav_path, sr=22050, duration=None, **kwargs) -> "AnalysisSession":
+        """ffmpeg → numpy 로 바로 디코딩 (decode_audio)"""
+        y = decode_audio(wav_path, sr=sr, max_seconds=duration)
+        return cls(y, sr, **kwargs)
+
+    @property
+    def duration(self) -> float:
+        return len(self.y) / self.sr
+
+    # ----------------------
+    # 공유 중간 결과
+    # ----------------------
+    @cached_property
+    def power_spectrogram(self) -> np.ndarray:
+        """|STFT|^2. onset envelope(mel) 와 이후 분석에서 같이 쓴다."""
+        stft = librosa.stft(self.y, n_fft=N_FFT, hop_length=self.hop_length)
+        return np.abs(stft) ** 2
+
+    @cached_property
+    def onset_envelope(self) -> np.ndarray:
+        mel = librosa.feature.melspectrogram(
+            S=self.power_spectrogram, sr=self.sr, n_fft=N_FFT, hop_length=self.hop_length
+        )
+        return librosa.onset.onset_strength(
+            S=librosa.power_to_db(mel),
+            sr=self.sr,
+            hop_length=self.hop_length,
+            aggregate=np.median,
+        )
+
+    @cached_property
+    def _trim(self):
+        return preprocess_audio(self.y, self.sr, return_offset=True)
+
+    @property
+    def trimmed(self) -> np.ndarray:
+        """키 분석용. key_find_algorithm 처럼 앞뒤 무음을 잘라낸 신호."""
+        return self._trim[0]
+
+    @property
+    def trim_offset_seconds(self) -> float:
+        return self._trim[1] / self.sr
+
+    @cached_property
+    def tuning(self) -> float:
+        """CQT 튜닝. BPM 용으로 만든 STFT 를 그대로 써서 추정한다."""
+        return estimate_tuning(
+            S=np.sqrt(self.power_spectrogram), sr=self.sr, hop_length=self.hop_length
+        )
+
+    @cached_property
+    def chroma_frames(self) -> np.ndarray:
+        """잘라낸 신호 전체의 프레임별 chroma. 키 벡터와 키 타임라인이 같이 쓴다. (CQT 한 번)"""
+        return chroma_engine.chroma_frames(
+            self.trimmed, self.sr, hop_length=self.hop_length, tuning=self.tuning
+        )
+
+    @cached_property
+    def chroma_vector(self) -> np.ndarray:
+        # compute_chroma_vector 와 같은 세그먼트 규칙 (꽉 찬 세그먼트만)
+        _, seg_len, num_segments = chroma_engine.segment_layout(
+            self.trimmed, self.sr, self.segment_seconds
+        )
+        frames = self.chroma_frames
+        if len(self.trimmed) >= seg_len:
+            frames = frames[:, : -(-num_segments * seg_len // self.hop_length)]
+
+        return chroma_engine.normalized_mean(
+            chroma_engine.segment_means(frames, self.hop_length, seg_len, num_segments)
+        )
+
+    @cached_property
+    def timeline(self) -> list[dict]:
+        """[{"start", "end", "key", "mode", "confidence"}, ...] (원래 곡 기준 초)"""
+        seg_len = int(self.sr * TIMELINE_SECONDS)
+        num_segments = -(-len(self.trimmed) // seg_len)
+        means = chroma_engine.segment_means(
+            self.chroma_frames, self.hop_length, seg_len, num_segments
+        )
+        return key_timeline(
+            means,
+            TIMELINE_SECONDS,
+            total_seconds=len(self.trimmed) / self.sr,
+            offset_seconds=self.trim_offset_seconds,
+        )
+
+    @cached_property
+    def tempo_curve(self) -> list[tuple[float, float]]:
+        return tempo_curve(self.onset_envelope, self.sr, hop_length=self.hop_length)
+
+    # ----------------------
+    # 결과
+    # ----------------------
+    @cached_property
+    def tempo(self) -> float:
+        onset_env = self.onset_envelope
+        if not onset_env.any():
+            # beat_track 도 onset 이 하나도 없으면 0 을 돌려준다.
+            return 0.0
+
+        tempo = librosa.feature.tempo(
+            onset_envelope=onset_env, sr=self.sr, hop_length=self.hop_length
+        )
+        return float(np.asarray(tempo).squeeze())
+
+    @property
+    def bpm(self) -> int:
+        return int(round(self.tempo))
+
+    @cached_property
+    def key(self) -> dict:
+        if self.key_margin is not None:
+            return progressive_key_find(
+                self.y,
+                self.sr,
+                segment_seconds=self.segment_seconds,
+                min_margin=self.key_margin,
+                hop_length=self.hop_length,
+                tuning=self.tuning,
+            )
+
+        chroma_vec = self.chroma_vector
+
+        major_scores, minor_scores = compute_ks_correlations(chroma_vec)
+
+        return {
+            "primary_key": select_key(major_scores, minor_scores),
+            "ranked_candidates": build_ranked_results(major_scores, minor_scores),
+            "major_scores": major_scores,
+            "minor_scores": minor_scores,
+            "chroma_vector": chroma_vec,
+        }
+
+    def analyze(self, timeline: bool = False) -> dict:
+        """timeline 이면 키 타임라인 / 템포 곡선도 같이 ("timeline", "tempo_curve")"""
+        key = self.key
+        result = {
+            "bpm": self.bpm,
+            **key,
+            "seconds_used": key.get("seconds_used", self.duration),
+            "stopped_early": key.get("stopped_early", False),
+        }
+        if timeline:
+            result["timeline"] = self.timeline
+            result["tempo_curve"] = self.tempo_curve
+        return result
+
+
+def analyze_wav(wav_path, **kwargs) -> dict:
+    return AnalysisSession.from_wav(wav_path, **kwargs).analyze()
+
+
+def analyze_url(
+    url: str,
+    cache=None,
+    streaming: bool = True,
+    sr: int = 22050,
+    max_seconds: float = 180,
+    segment_seconds: float = 10.0,
+    key_margin: float | None = None,
+    timeline: bool = False,
+    on_update=None,
+    on_step=None,
+) -> dict:
+    """
+    YouTube URL 분석. cache(AnalysisCache) 를 주면
+    1) 같은 파라미터의 결과가 있으면 그대로 돌려주고
+    2) 디코딩해 둔 PCM 이 있으면 다운로드 없이 AnalysisSession 으로 분석하고
+    3) 둘 다 없으면 다운로드해서 분석한 뒤 결과와 PCM 을 저장한다.
+
+    반환값: {"bpm", "key" (key_find_algorithm 과 같은 dict), "seconds_used", "stopped_early",
+             "source" ("cache" / "pcm" / "download")}
+    key_margin 은 streaming=False 일 때만 AnalysisSession 에 넘긴다. (analysis_params 참고)
+    timeline 이면 결과에 "timeline" (구간별 키) / "tempo_curve" 도 넣는다. (스트리밍은 항상 넣는다)
+    on_step(name) 은 단계가 끝날 때마다 불린다. (페이지의 [TIME] 로그용)
+    """
+    step = on_step or (lambda name: None)
+
+    video_id = extract_video_id(url)
+    params = analysis_params(
+        sr, max_seconds, segment_seconds, streaming, key_margin, timeline
+    )
+    # 캐시 키와 같은 값으로 분석한다. (캐시된 PCM 으로 분석할 때도)
+    key_margin = params["key_margin"]
+    use_cache = cache is not None and is_cacheable_id(video_id)
+
+    if use_cache:
+        cached = cache.get_result(video_id, params)
+        step("cache lookup")
+        if cached is not None:
+            return split_result(cached, source="cache")
+
+    pcm = cache.get_pcm(video_id, sr, max_seconds) if use_cache else None
+
+    if pcm is not None:
+        session = AnalysisSession(
+            np.asarray(pcm), sr, segment_seconds=segment_seconds, key_margin=key_margin
+        )
+        step("decode (cached pcm)")
+        result = session.analyze(timeline=timeline)
+        step("analyze")
+        source = "pcm"
+    elif streaming:
+        streamed = analyze_stream(
+            url,
+            sr=sr,
+            max_seconds=max_seconds,
+            segment_seconds=segment_seconds,
+            on_update=on_update,
+            keep_pcm=use_cache and cache.keep_pcm,
+        )
+        step("analyze_stream")
+        result = {
+            "bpm": streamed["bpm"],
+            **streamed["key"],
+            "seconds_used": streamed["seconds_used"],
+            "stopped_early": streamed["stopped_early"],
+            "timeline": streamed["timeline"],
+            "tempo_curve": streamed["tempo_curve"],
+        }
+        if "pcm" in streamed:
+            cache.put_pcm(video_id, sr, streamed["pcm"], streamed["complete"])
+        source = "download"
+    else:
+        wav_path = download_wav_to_tempfile(url, max_seconds=max_seconds, sr=sr)
+        step("download")
+        try:
+            session = AnalysisSession.from_wav(
+                wav_path, sr=sr, segment_seconds=segment_seconds, key_margin=key_margin
+            )
+        finally:
+            os.unlink(wav_path)
+        step("decode")
+        result = session.analyze(timeline=timeline)
+        step("analyze")
+        if use_cache:
+            complete = len(session.y) < int(sr * max_seconds)
+            cache.put_pcm(video_id, sr, session.y, complete)
+        source = "download"
+
+    if use_cache:
+        cache.put_result(video_id, params, result)
+        step("cache store")
+
+    return split_result(result, source=source)
+
+
+def split_result(result: dict, source: str) -> dict:
+    """
+    캐시에 저장하는 평평한 결과 dict 를 analyze_url 반환 모양
+    ({"bpm", "key": {...}, "seconds_used", "stopped_early", "timeline", "tempo_curve", "source"})
+    으로 바꾼다. timeline / tempo_curve 는 없으면 None.
+    """
+    key = {
+        name: result[name]
+        for name in (
+            "primary_key",
+            "ranked_candidates",
+            "major_scores",
+            "minor_scores",
+            "chroma_vector",
+        )
+    }
+    return {
+        "bpm": result["bpm"],
+        "key": key,
+        "seconds_used": result["seconds_used"],
+        "stopped_early": result["stopped_early"],
+        "timeline": result.get("timeline"),
+        "tempo_curve": result.get("tempo_curve"),
+        "source": source,
+    }
@@ -0,0 +1,308 @@
+"""
+yt-dlp → ffmpeg → 분석을 디스크 없이 스트리밍으로 연결하는 파이프라인
+
+download_wav_to_memory 와 같은 파이프 구조로 yt-dlp 출력을 ffmpeg 에 넘기되,
+ffmpeg 는 wav 대신 raw float32(f32le) PCM 을 stdout 으로 낸다.
+읽은 프레임은 링 버퍼에 쌓고, 세그먼트(기본 10초)가 찰 때마다 바로 onset / chroma 를 계산한다.
+BPM 과 키 추정이 몇 세그먼트 연속으로 같으면 남은 다운로드를 끊고 일찍 끝낸다.
+"""
+
+import subprocess
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+from service.ffmpeg_function import (
+    build_ranked_results,
+    compute_ks_correlations,
+    ffmpeg_pcm_cmd,
+    select_key,
+)
+from service.key_timeline import key_timeline, tempo_curve
+
+SAMPLE_RATE = 22050
+HOP_LENGTH = 512
+
+# onset envelope 를 세그먼트 경계에서 끊기지 않게 이어 붙이려고 앞 세그먼트 끝을 조금 겹쳐 읽는다.
+_CONTEXT_SAMPLES = 4 * HOP_LENGTH
+
+# ffmpeg 에서 한 번에 읽는 길이 (초)
+CHUNK_SECONDS = 1.0
+
+
+def spawn_pcm_pipeline(url: str, sr: int = SAMPLE_RATE, max_seconds: float = 180):
+    """
+    (ffmpeg 프로세스, 같이 띄운 프로세스 목록) 을 돌려준다.
+    url 이 로컬 파일이면 yt-dlp 없이 ffmpeg 가 바로 읽는다.
+    """
+    if Path(url).is_file():
+        ffmpeg_proc = subprocess.Popen(
+            ffmpeg_pcm_cmd(url, sr, max_seconds),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        return ffmpeg_proc, [ffmpeg_proc]
+
+    ytdlp_proc = subprocess.Popen(
+        [
+            "yt-dlp",
+            "--no-playlist",
+            "-f",
+            "bestaudio[abr<=192]/bestaudio",
+            "-o",
+            "-",
+            url,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+
+    ffmpeg_proc = subprocess.Popen(
+        ffmpeg_pcm_cmd("pipe:0", sr, max_seconds),
+        stdin=ytdlp_proc.stdout,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    # ffmpeg 가 먼저 끝나면 yt-dlp 가 SIGPIPE 를 받을 수 있도록 부모 쪽 파이프는 닫는다.
+    ytdlp_proc.stdout.close()
+
+    return ffmpeg_proc, [ytdlp_proc, ffmpeg_proc]
+
+
+def iter_pcm_chunks(
+    url: str,
+    sr: int = SAMPLE_RATE,
+    max_seconds: float = 180,
+    chunk_seconds: float = CHUNK_SECONDS,
+):
+    """
+    float32 mono PCM 을 chunk_seconds 단위 numpy 배열로 내보낸다.
+    제너레이터를 중간에 닫으면(break) 다운로드/디코딩 프로세스도 같이 끝낸다.
+    """
+    ffmpeg_proc, procs = spawn_pcm_pipeline(url, sr=sr, max_seconds=max_seconds)
+    chunk_bytes = int(sr * chunk_seconds) * 4
+
+    try:
+        while True:
+            data = ffmpeg_proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+
+            usable = len(data) - len(data) % 4
+            yield np.frombuffer(data[:usable], dtype="<f4")
+    finally:
+        for proc in reversed(procs):
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+        ffmpeg_proc.stdout.close()
+
+
+def decode_pcm(url: str, sr: int = SAMPLE_RATE, max_seconds: float = 180) -> np.ndarray:
+    """앞에서부터 max_seconds 초를 한 번에 디코딩한 float32 mono PCM (디스크를 거치지 않는다)"""
+    chunks = list(iter_pcm_chunks(url, sr=sr, max_seconds=max_seconds))
+    if not chunks:
+        raise ValueError("Audio stream is empty (download or decode failed)")
+    return np.concatenate(chunks)
+
+
+class RingBuffer:
+    """
+    고정 크기 float32 링 버퍼.
+    write() 로 쌓고, read(n, context) 로 앞쪽 context 샘플을 겹쳐서 n 샘플씩 꺼낸다.
+    """
+
+    def __init__(self, capacity: int):
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._capacity = capacity
+        self._write = 0  # 지금까지 쓴 총 샘플 수
+        self._read = 0  # 지금까지 꺼낸 총 샘플 수
+
+    @property
+    def available(self) -> int:
+        return self._write - self._read
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if self.available + n + _CONTEXT_SAMPLES > self._capacity:
+            raise OverflowError("ring buffer overflow")
+
+        start = self._write % self._capacity
+        first = min(n, self._capacity - start)
+        self._buf[start : start + first] = samples[:first]
+        self._buf[: n - first] = samples[first:]
+        self._write += n
+
+    def read(self, n: int, context: int = 0) -> np.ndarray:
+        n = min(n, self.available)
+        context = min(context, self._read)
+
+        idx = np.arange(self._read - context, self._read + n) % self._capacity
+        self._read += n
+        return self._buf[idx]
+
+
+class StreamingAnalyzer:
+    """
+    세그먼트 단위로 PCM 을 받아서 onset envelope 와 세그먼트별 chroma 평균을 누적한다.
+    chroma 는 compute_chroma_vector 와 같이 세그먼트별 평균의 평균을 L2 정규화해서 쓴다.
+    """
+
+    def __init__(self, sr: int = SAMPLE_RATE, hop_length: int = HOP_LENGTH):
+        self.sr = sr
+        self.hop_length = hop_length
+
+        self.seconds = 0.0
+        self._onset_frames = []
+        self._chroma_sum = np.zeros(12)
+        self._segments = 0
+        self._segment_chroma = []  # 키 타임라인용 세그먼트별 평균 (무음이면 0)
+
+    def feed(self, segment: np.ndarray, context: np.ndarray):
+        """context: 바로 앞 세그먼트의 끝부분 (onset 계산용으로만 쓰고 버린다)"""
+        y = np.concatenate([context, segment]) if len(context) else segment
+
+        onset = librosa.onset.onset_strength(y=y, sr=self.sr, hop_length=self.hop_length)
+        skip = len(context) // self.hop_length
+        self._onset_frames.append(onset[skip : skip + len(segment) // self.hop_length])
+
+        mean = np.zeros(12)
+        if np.max(np.abs(segment)) > 1e-4:
+            chroma = librosa.feature.chroma_cqt(
+                y=segment, sr=self.sr, hop_length=self.hop_length
+            )
+            mean = np.mean(chroma, axis=1)
+            self._chroma_sum += mean
+            self._segments += 1
+        self._segment_chroma.append(mean)
+
+        self.seconds += len(segment) / self.sr
+
+    def onset_envelope(self) -> np.ndarray:
+        return np.concatenate(self._onset_frames) if self._onset_frames else np.zeros(0)
+
+    def timeline(self, segment_seconds: float) -> list[dict]:
+        return key_timeline(
+            np.array(self._segment_chroma).reshape(-1, 12),
+            segment_seconds,
+            total_seconds=self.seconds,
+        )
+
+    def bpm(self) -> int | None:
+        if not self._onset_frames:
+            return None
+
+        onset_env = self.onset_envelope()
+        tempo = librosa.feature.tempo(
+            onset_envelope=onset_env, sr=self.sr, hop_length=self.hop_length
+        )
+        return int(round(float(np.asarray(tempo).squeeze())))
+
+    def key(self) -> dict | None:
+        if self._segments == 0:
+            return None
+
+        chroma_vec = self._chroma_sum / self._segments
+        norm = np.linalg.norm(chroma_vec)
+        if norm < 1e-12:
+            return None
+        chroma_vec = chroma_vec / norm
+
+        major_scores, minor_scores = compute_ks_correlations(chroma_vec)
+        return {
+            "primary_key": select_key(major_scores, minor_scores),
+            "ranked_candidates": build_ranked_results(major_scores, minor_scores),
+            "major_scores": major_scores,
+            "minor_scores": minor_scores,
+            "chroma_vector": chroma_vec,
+        }
+
+
+def analyze_stream(
+    url: str,
+    sr: int = SAMPLE_RATE,
+    max_seconds: float = 180,
+    segment_seconds: float = 10.0,
+    min_seconds: float = 30.0,
+    stable_rounds: int = 3,
+    on_update=None,
+    keep_pcm: bool = False,
+):
+    """
+    스트리밍 분석. 세그먼트마다 BPM / 키를 다시 추정하고,
+    min_seconds 이후 stable_rounds 번 연속 같은 값이면 일찍 멈춘다.
+
+    on_update(seconds, bpm, key_result) 는 세그먼트마다 호출된다. (진행 표시용)
+    반환값: {"bpm", "key" (key_find_algorithm 과 같은 dict), "seconds_used", "stopped_early",
+             "timeline" (구간별 키), "tempo_curve" ([(초, BPM), ...])}
+    keep_pcm 이면 받은 PCM 전체("pcm")와 곡 끝까지 받았는지("complete")도 같이 돌려준다. (캐시용)
+    """
+    seg_len = int(sr * segment_seconds)
+    # 세그먼트를 다 꺼내고 남은 (seg_len 미만) 샘플 위에 청크 하나가 통째로 들어와도 넘치지 않게
+    chunk_len = int(sr * CHUNK_SECONDS)
+    ring = RingBuffer(seg_len + max(seg_len, chunk_len) + _CONTEXT_SAMPLES)
+    analyzer = StreamingAnalyzer(sr=sr)
+
+    history = []
+    bpm = key = None
+    stopped_early = False
+    received = []
+
+    def step(n):
+        nonlocal bpm, key
+        context = ring.read(0, context=_CONTEXT_SAMPLES)
+        analyzer.feed(ring.read(n), context)
+
+        bpm, key = analyzer.bpm(), analyzer.key()
+        if on_update is not None:
+            on_update(analyzer.seconds, bpm, key)
+
+        if key is None:
+            return False
+
+        history.append((bpm, key["primary_key"]["key"], key["primary_key"]["mode"]))
+        recent = history[-stable_rounds:]
+        return (
+            analyzer.seconds >= min_seconds
+            and len(recent) == stable_rounds
+            and len(set(recent)) == 1
+        )
+
+    chunks = iter_pcm_chunks(url, sr=sr, max_seconds=max_seconds, chunk_seconds=CHUNK_SECONDS)
+    try:
+        for chunk in chunks:
+            if keep_pcm:
+                received.append(chunk)
+            ring.write(chunk)
+            # segment_seconds 가 청크보다 짧으면 청크 하나에 세그먼트가 여러 개 들어 있다.
+            while ring.available >= seg_len:
+                if step(seg_len):
+                    stopped_early = True
+                    break
+            if stopped_early:
+                break
+        else:
+            # 남은 꼬리 (세그먼트 반 이상일 때만. compute_chroma_vector 도 짧은 꼬리는 버린다)
+            if ring.available >= seg_len // 2 or analyzer.seconds == 0:
+                if ring.available:
+                    step(ring.available)
+    finally:
+        chunks.close()
+
+    if key is None:
+        raise ValueError("Audio stream is empty or silent")
+
+    result = {
+        "bpm": bpm,
+        "key": key,
+        "seconds_used": analyzer.seconds,
+        "stopped_early": stopped_early,
+        "timeline": analyzer.timeline(segment_seconds),
+        "tempo_curve": tempo_curve(analyzer.onset_envelope(), sr, hop_length=HOP_LENGTH),
+    }
+    if keep_pcm:
+        pcm = np.concatenate(received) if received else np.zeros(0, dtype=np.float32)
+        result["pcm"] = pcm
+        result["complete"] = not stopped_early and len(pcm) < int(sr * max_seconds)
+    return result
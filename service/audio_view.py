@@ -0,0 +1,96 @@
+"""
+음향 분석 페이지(pages/3_youtube_bpm_code.py) 전용 그래프 / 표
+
+matplotlib.pyplot 과 pandas 는 import 만 해도 1초 가까이 걸리는데 분석 결과가 나오기 전에는 쓸 일이 없다.
+그래서 streamlit_function(가사 / PPT 쪽 의존성까지 같이 읽는다)에서 빼내고, 함수 안에서 처음 쓸 때 import 한다.
+"""
+
+
+def plot_chroma_histogram(chroma_vec):
+    import matplotlib.pyplot as plt
+
+    notes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+    fig, ax = plt.subplots(figsize=(8, 3))
+    ax.bar(notes, chroma_vec)
+    ax.set_title("Pitch Class Histogram (Chroma)")
+    ax.set_ylabel("Normalized Energy")
+    ax.set_xlabel("Note")
+
+    return fig
+
+
+def plot_key_timeline(timeline, tempo_curve):
+    """구간별 키(위)와 local tempo(아래)"""
+    import matplotlib.pyplot as plt
+
+    fig, (ax_key, ax_tempo) = plt.subplots(
+        2, 1, figsize=(8, 3), sharex=True, gridspec_kw={"height_ratios": [1, 2]}
+    )
+
+    labels = sorted({f"{span['key']} {span['mode']}" for span in timeline})
+    colors = {label: plt.cm.tab20(i % 20) for i, label in enumerate(labels)}
+
+    for span in timeline:
+        label = f"{span['key']} {span['mode']}"
+        ax_key.barh(
+            0, span["end"] - span["start"], left=span["start"], color=colors[label]
+        )
+        ax_key.text(
+            (span["start"] + span["end"]) / 2, 0, label, ha="center", va="center", fontsize=8
+        )
+    ax_key.set_yticks([])
+    ax_key.set_title("Key / Tempo Timeline")
+
+    if tempo_curve:
+        times, bpms = zip(*tempo_curve)
+        ax_tempo.plot(times, bpms)
+    ax_tempo.set_ylabel("BPM")
+    ax_tempo.set_xlabel("Time (s)")
+
+    fig.tight_layout()
+    return fig
+
+
+def build_key_ranking_table(ranked_candidates, top_n=10):
+    import pandas as pd
+
+    rows = []
+    for i, (key, mode, score) in enumerate(ranked_candidates[:top_n], start=1):
+        rows.append(
+            {"Rank": i, "Key": key, "Mode": mode, "Correlation": round(score, 3)}
+        )
+
+    return pd.DataFrame(rows)
+
+
+def build_batch_table(rows: dict):
+    """{index: build_batch_row(...)} → 입력 순서로 정렬한 DataFrame"""
+    import pandas as pd
+
+    return pd.DataFrame([rows[i] for i in sorted(rows)])
+
+
+def build_batch_row(index, url, analysis, error):
+    """iter_batch_analysis 결과 한 건을 일괄 분석 표의 한 줄로"""
+    if analysis is None:
+        return {
+            "#": index + 1,
+            "URL": url,
+            "BPM": None,
+            "Key": None,
+            "Score": None,
+            "분석 길이(초)": None,
+            "상태": f"❌ {error}",
+        }
+
+    primary = analysis["key"]["primary_key"]
+    return {
+        "#": index + 1,
+        "URL": url,
+        "BPM": int(round(analysis["bpm"])),
+        "Key": f"{primary['key']} {primary['mode']}",
+        "Score": round(primary["score"], 3),
+        "분석 길이(초)": round(analysis["seconds_used"]),
+        "상태": "💾 캐시" if analysis["source"] == "cache" else "✅ 완료",
+    }
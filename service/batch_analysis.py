@@ -0,0 +1,104 @@
+"""
+세트리스트 일괄 BPM / 키 분석
+
+- 다운로드(yt-dlp → ffmpeg → PCM)는 서브프로세스 대기라서 스레드 download_jobs 개로 동시에 돌리고
+  (동시에 떠 있는 yt-dlp / ffmpeg 수가 download_jobs 로 묶인다)
+- 분석(AnalysisSession)은 CPU 작업이라 ProcessPoolExecutor 워커에서 돌린다.
+- 다운로드가 끝난 곡부터 바로 분석에 넘기고, 분석이 끝난 곡부터 결과를 내보낸다.
+- 한 곡이 실패해도(잘못된 URL, 다운로드 실패 등) 그 곡만 error 로 표시하고 나머지는 계속한다.
+
+AnalysisCache 를 주면 결과 / PCM 캐시를 analyze_url 과 같은 규칙으로 쓴다.
+"""
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import numpy as np
+
+from service.analysis_cache import analysis_params, is_cacheable_id
+from service.audio_analysis import AnalysisSession, split_result
+from service.audio_stream import decode_pcm
+from service.ffmpeg_function import extract_video_id
+
+_DOWNLOAD = "download"
+_ANALYZE = "analyze"
+
+
+def _analyze_pcm(pcm: np.ndarray, sr: int, segment_seconds: float, key_margin) -> dict:
+    session = AnalysisSession(pcm, sr, segment_seconds=segment_seconds, key_margin=key_margin)
+    return session.analyze()
+
+
+def iter_batch_analysis(
+    urls,
+    cache=None,
+    download_jobs: int = 4,
+    jobs: int | None = None,
+    sr: int = 22050,
+    max_seconds: float = 180,
+    segment_seconds: float = 10.0,
+    key_margin: float | None = None,
+):
+    """
+    끝나는 순서대로 (index, url, analysis, error) 를 내보낸다.
+    analysis 는 analyze_url 과 같은 모양, 실패한 곡은 analysis=None 이고 error 에 이유.
+    """
+    params = analysis_params(sr, max_seconds, segment_seconds, False, key_margin)
+
+    downloader = ThreadPoolExecutor(max_workers=download_jobs, thread_name_prefix="audio")
+    analyzer = ProcessPoolExecutor(max_workers=jobs)
+    running = {}
+
+    def submit_analysis(index, url, video_id, source, pcm):
+        future = analyzer.submit(_analyze_pcm, pcm, sr, segment_seconds, key_margin)
+        running[future] = (index, url, video_id, _ANALYZE, source)
+
+    try:
+        for index, url in enumerate(urls):
+            video_id = extract_video_id(url)
+            if cache is None or not is_cacheable_id(video_id):
+                video_id = None
+
+            if video_id is not None:
+                cached = cache.get_result(video_id, params)
+                if cached is not None:
+                    yield index, url, split_result(cached, source="cache"), None
+                    continue
+
+                pcm = cache.get_pcm(video_id, sr, max_seconds)
+                if pcm is not None:
+                    submit_analysis(index, url, video_id, "pcm", np.asarray(pcm))
+                    continue
+
+            future = downloader.submit(decode_pcm, url, sr, max_seconds)
+            running[future] = (index, url, video_id, _DOWNLOAD, "download")
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index, url, video_id, stage, source = running.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    yield index, url, None, f"{stage}: {e}"
+                    continue
+
+                if stage == _DOWNLOAD:
+                    if video_id is not None:
+                        complete = len(value) < int(sr * max_seconds)
+                        cache.put_pcm(video_id, sr, value, complete)
+                    submit_analysis(index, url, video_id, source, value)
+                    continue
+
+                if video_id is not None:
+                    cache.put_result(video_id, params, value)
+                yield index, url, split_result(value, source=source), None
+    finally:
+        # 중간에 그만 읽으면(페이지 rerun 등) 아직 시작 안 한 작업은 버린다.
+        downloader.shutdown(wait=False, cancel_futures=True)
+        analyzer.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,201 @@
+"""
+CQT chroma 를 곡 전체에 한 번에 계산하는 엔진
+
+compute_chroma_vector 는 10초 세그먼트마다 librosa.feature.chroma_cqt 를 불러서,
+세그먼트마다 CQT 필터를 다시 만들고 튜닝 추정(piptrack)도 다시 한다.
+여기서는
+- 튜닝은 곡 전체에서 한 번 (프레임을 듬성듬성 뽑은 STFT 로) 추정하고
+- CQT 는 곡 전체에 한 번 (아주 긴 입력만 block_seconds 단위로, 앞뒤를 겹쳐서) 돌리고
+- chroma 로 접는 행렬은 설정별로 캐시해 두고
+- 세그먼트 평균은 프레임을 세그먼트 경계로 잘라 np.add.reduceat 으로 한 번에 구한다.
+
+chroma_cqt 와 같은 설정(36 bins/octave, 7 octave, 프레임별 max 정규화)이라
+세그먼트 경계 프레임과 튜닝 추정 차이 정도만 다르다. (bench/bench_chroma.py)
+"""
+
+from functools import lru_cache
+
+import librosa
+import numpy as np
+
+BINS_PER_OCTAVE = 36
+N_OCTAVES = 7
+N_CHROMA = 12
+
+# 블록으로 나눌 때 앞뒤로 겹쳐 읽는 길이. 가장 낮은 CQT 필터(C1)보다 길게.
+_BLOCK_CONTEXT_SECONDS = 4.0
+
+
+@lru_cache(maxsize=16)
+def _chroma_filter(n_bins: int, bins_per_octave: int, n_chroma: int) -> np.ndarray:
+    """CQT bin → chroma 로 접는 행렬. (n_chroma, n_bins)"""
+    matrix = librosa.filters.cq_to_chroma(
+        n_bins, bins_per_octave=bins_per_octave, n_chroma=n_chroma
+    )
+    matrix.setflags(write=False)
+    return matrix
+
+
+def estimate_tuning(
+    y: np.ndarray = None,
+    sr: int = 22050,
+    S: np.ndarray = None,
+    hop_length: int = 512,
+    stride: int = 4,
+) -> float:
+    """
+    곡 전체 튜닝(bin 단위 편차) 추정. 튜닝은 곡 안에서 거의 안 변하므로
+    프레임을 stride 개마다 하나만 써서 piptrack 비용을 줄인다.
+    S(크기 스펙트로그램, n_fft=2048)가 이미 있으면 그걸 쓴다.
+    """
+    if S is None:
+        S = np.abs(librosa.stft(y, n_fft=2048, hop_length=hop_length * stride))
+    else:
+        S = S[:, ::stride]
+
+    return float(
+        librosa.estimate_tuning(S=S, sr=sr, n_fft=2048, bins_per_octave=BINS_PER_OCTAVE)
+    )
+
+
+def _cqt_magnitude(y, sr, hop_length, tuning):
+    return np.abs(
+        librosa.cqt(
+            y,
+            sr=sr,
+            hop_length=hop_length,
+            n_bins=N_OCTAVES * BINS_PER_OCTAVE,
+            bins_per_octave=BINS_PER_OCTAVE,
+            tuning=tuning,
+        )
+    )
+
+
+def chroma_frames(
+    y: np.ndarray,
+    sr: int,
+    hop_length: int = 512,
+    tuning: float | None = None,
+    block_seconds: float = 300.0,
+) -> np.ndarray:
+    """
+    프레임별 chroma (12, 1 + len(y) // hop_length). chroma_cqt 와 같은 모양/정규화.
+    block_seconds 보다 긴 입력은 겹치는 블록으로 나눠서 메모리를 묶어 둔다.
+    """
+    if tuning is None:
+        tuning = estimate_tuning(y, sr, hop_length=hop_length)
+
+    block = int(block_seconds * sr) // hop_length * hop_length
+    if len(y) <= block:
+        C = _cqt_magnitude(y, sr, hop_length, tuning)
+    else:
+        context = int(_BLOCK_CONTEXT_SECONDS * sr) // hop_length * hop_length
+        n_frames = 1 + len(y) // hop_length
+
+        parts = []
+        for start in range(0, len(y), block):
+            lo = max(0, start - context)
+            hi = min(len(y), start + block + context)
+            C = _cqt_magnitude(y[lo:hi], sr, hop_length, tuning)
+
+            first = (start - lo) // hop_length
+            count = min(block // hop_length, n_frames - start // hop_length)
+            parts.append(C[:, first : first + count])
+        C = np.hstack(parts)
+
+    chroma = _chroma_filter(C.shape[0], BINS_PER_OCTAVE, N_CHROMA) @ C
+    return librosa.util.normalize(chroma, norm=np.inf, axis=0)
+
+
+def segment_layout(y: np.ndarray, sr: int, segment_seconds: float):
+    """compute_chroma_vector 와 같은 세그먼트 규칙: 꽉 찬 세그먼트만, 짧으면 전체 하나."""
+    seg_len = int(sr * segment_seconds)
+    num_segments = max(1, len(y) // seg_len)
+    if len(y) >= seg_len:
+        y = y[: num_segments * seg_len]
+    return y, seg_len, num_segments
+
+
+def segment_means(
+    chroma: np.ndarray,
+    hop_length: int,
+    seg_len: int,
+    num_segments: int,
+    frame_pos: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    프레임별 chroma (12, T) → 세그먼트별 평균 (num_segments, 12)
+    frame_pos: 프레임 중심의 샘플 위치 (기본은 0 부터 hop_length 간격)
+    """
+    if frame_pos is None:
+        frame_pos = np.arange(chroma.shape[1]) * hop_length
+    seg_idx = np.minimum(frame_pos // seg_len, num_segments - 1)
+
+    starts = np.searchsorted(seg_idx, np.arange(num_segments))
+    counts = np.diff(np.append(starts, chroma.shape[1]))
+
+    sums = np.add.reduceat(chroma, starts, axis=1)
+    return (sums / counts).T
+
+
+def segment_chroma_range(
+    y: np.ndarray,
+    sr: int,
+    seg_len: int,
+    first: int,
+    last: int,
+    hop_length: int = 512,
+    tuning: float = 0.0,
+) -> np.ndarray:
+    """
+    세그먼트 [first, last) 만의 chroma 평균 (last - first, 12).
+    앞뒤로 _BLOCK_CONTEXT_SECONDS 만큼 더 읽고, 프레임 격자는 곡 전체 기준(hop 배수)에 맞춘다.
+    앞부분부터 조금씩 늘려 가며 분석할 때(progressive_key) 이미 본 구간을 다시 계산하지 않으려고 쓴다.
+    """
+    context = int(_BLOCK_CONTEXT_SECONDS * sr)
+    start, end = first * seg_len, min(len(y), last * seg_len)
+
+    lo = max(0, start - context) // hop_length * hop_length
+    hi = min(len(y), end + context)
+    chroma = chroma_frames(y[lo:hi], sr, hop_length=hop_length, tuning=tuning)
+
+    frame_pos = lo + np.arange(chroma.shape[1]) * hop_length
+    keep = (frame_pos >= start) & (frame_pos < end)
+    return segment_means(
+        chroma[:, keep], hop_length, seg_len, last - first, frame_pos[keep] - start
+    )
+
+
+def segment_chroma(
+    y: np.ndarray,
+    sr: int,
+    segment_seconds: float = 10.0,
+    hop_length: int = 512,
+    tuning: float | None = None,
+) -> np.ndarray:
+    """세그먼트별 chroma 평균 (num_segments, 12). CQT 는 한 번만 돈다."""
+    y, seg_len, num_segments = segment_layout(y, sr, segment_seconds)
+    chroma = chroma_frames(y, sr, hop_length=hop_length, tuning=tuning)
+    return segment_means(chroma, hop_length, seg_len, num_segments)
+
+
+def normalized_mean(segment_chroma: np.ndarray) -> np.ndarray:
+    """세그먼트 평균들 (n, 12) 의 평균을 L2 정규화"""
+    chroma_vec = segment_chroma.mean(axis=0)
+
+    norm = np.linalg.norm(chroma_vec)
+    if norm < 1e-12:
+        raise ValueError("Chroma vector is near zero")
+
+    return chroma_vec / norm
+
+
+def chroma_vector(
+    y: np.ndarray,
+    sr: int,
+    segment_seconds: float = 10.0,
+    hop_length: int = 512,
+    tuning: float | None = None,
+) -> np.ndarray:
+    """세그먼트 평균들의 평균을 L2 정규화한 12차원 벡터 (compute_chroma_vector 와 같은 정의)"""
+    return normalized_mean(segment_chroma(y, sr, segment_seconds, hop_length, tuning))
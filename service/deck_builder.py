@@ -0,0 +1,135 @@
+"""
+여러 덱을 한 프로세스에서 만드는 배치 빌더 (main.py CLI 용)
+
+입력 파일 하나 = 덱 하나.
+- 세트리스트 파일 (.txt / .setlist 등): PPT 생성기 페이지 텍스트 영역에 붙여넣는 것과 같은 텍스트
+  (service/setlist_format.py 형식, 또는 예전 list 리터럴)
+- .json: 같은 모양의 JSON 배열
+- 곡 모듈 (.py): source/lyrics.py 처럼 SONGS = [...] 가 있는 파일.
+  import 하지 않고 ast 로 SONGS 리터럴만 읽는다. (파일 안의 코드는 실행하지 않는다)
+- 곡 라이브러리 (.sqlite3, service/song_library.py): 라이브러리 전체를 덱 하나로. 곡은 순회하면서 읽는다.
+
+patch=True 면 출력 덱이 이미 있을 때 새로 만들지 않고 바뀐 슬라이드만 고친다. (service/deck_patch.py)
+
+덱끼리는 공유하는 상태가 없어서 jobs > 1 이면 프로세스 풀에서 덱 단위로 나눠 만든다.
+워커마다 SlideTemplates(프로토타입 슬라이드)와 SongSlideCache 를 한 번만 만들어서
+그 워커가 만드는 모든 덱에서 재사용한다. (jobs == 1 이면 현재 프로세스가 워커 역할)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from pptx import Presentation
+
+from service.deck_patch import patch_deck
+from service.pptx_stream import StreamingDeckWriter
+from service.slide_cache import SongSlideCache
+from service.slide_template import SlideTemplates
+from service.song_library import SongLibrary, read_songs_module
+from service.setlist_format import SetlistError, load_setlist, validate_songs
+
+
+def load_song_list(path):
+    """곡 dict 목록. 곡 라이브러리(.sqlite3)는 리스트로 풀지 않고 SongLibrary 를 그대로 (순회할 때 읽는다)"""
+    path = Path(path)
+    if path.suffix == ".sqlite3":
+        return SongLibrary(path)
+
+    text = path.read_text(encoding="utf-8")
+
+    try:
+        if path.suffix == ".py":
+            song_list = read_songs_module(path)
+        elif path.suffix == ".json":
+            song_list = json.loads(text)
+        else:
+            return load_setlist(text)
+    except SetlistError:
+        raise
+    except (SyntaxError, ValueError) as e:
+        raise SetlistError(f"파싱 실패: {e}") from e
+
+    return validate_songs(song_list)
+
+
+# 워커 프로세스(또는 jobs == 1 일 때 현재 프로세스)마다 한 번만 만드는 상태
+_templates = None
+_cache = None
+
+
+def _init_worker(cache_dir):
+    global _templates, _cache
+    prs = Presentation()
+    _templates = SlideTemplates(prs.slide_width, prs.slide_height)
+    _cache = SongSlideCache(cache_dir) if cache_dir is not None else None
+
+
+def _build_deck(src, out, patch: bool = False) -> dict:
+    t0 = time.perf_counter()
+    song_list = load_song_list(src)
+    parsed = time.perf_counter()
+
+    if _cache is not None:
+        _cache.reset_stats()
+
+    out = Path(out)
+    extra = {}
+    if patch and out.exists():
+        result = patch_deck(out, song_list, templates=_templates, cache=_cache)
+        slides = result["slides"]
+        extra = {
+            "patched": result["rewritten"] + result["added"] + result["removed"],
+            "changed_songs": result["changed_songs"],
+        }
+    else:
+        # 중간에 실패하면 만들다 만 파일이 남지 않도록 임시 파일에 쓰고 바꿔 끼운다.
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(out.name + ".tmp")
+        try:
+            with StreamingDeckWriter(tmp, templates=_templates) as writer:
+                for song in song_list:
+                    writer.write_song(song, cache=_cache)
+            os.replace(tmp, out)
+        finally:
+            tmp.unlink(missing_ok=True)
+        slides = writer.slide_count
+
+    return {
+        "songs": len(song_list),
+        "slides": slides,
+        "parse_seconds": parsed - t0,
+        "seconds": time.perf_counter() - t0,
+        **(_cache.stats() if _cache is not None else {"hits": 0, "misses": len(song_list)}),
+        **extra,
+    }
+
+
+def iter_build_decks(decks, jobs: int = 1, cache_dir=None, patch: bool = False):
+    """
+    decks: [(입력 파일, 출력 .pptx 경로), ...]
+    patch=True 면 이미 있는 출력 덱은 바뀐 슬라이드만 고친다.
+    끝나는 순서대로 (src, out, stats, error) 를 내보낸다. 한 덱이 실패해도 나머지는 계속 만든다.
+    """
+    if jobs <= 1:
+        _init_worker(cache_dir)
+        for src, out in decks:
+            try:
+                yield src, out, _build_deck(src, out, patch), None
+            except Exception as e:
+                yield src, out, None, str(e)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(cache_dir,)
+    ) as executor:
+        futures = {executor.submit(_build_deck, src, out, patch): (src, out) for src, out in decks}
+
+        for future in as_completed(futures):
+            src, out = futures[future]
+            try:
+                yield src, out, future.result(), None
+            except Exception as e:
+                yield src, out, None, str(e)
@@ -0,0 +1,369 @@
+"""
+이미 만든 덱(.pptx)을 고친 곡 목록에 맞게 패치 (바뀐 슬라이드 파트만 다시 쓴다)
+
+예배 직전에 가사 오타 하나 때문에 덱 전체를 ppt_save 로 다시 만들지 않도록,
+새 곡 목록의 슬라이드를 렌더링해서 덱에 이미 있는 슬라이드와 비교한다.
+
+- 비교는 zip 목차(central directory)의 CRC32 + 크기로 한다. 기존 슬라이드는 압축을 풀지 않는다.
+  SlideTemplates 로 만든 슬라이드 XML 은 ppt_save / 스트리밍 / 캐시 어느 경로든 같은 바이트라서
+  같은 내용이면 CRC 도 같다.
+- 순서는 SequenceMatcher 로 맞춘다. 곡 하나에 슬라이드가 늘거나 줄어도 뒤쪽 슬라이드는 그대로 남는다.
+- 바뀐 슬라이드는 기존 파트(slideN.xml) 자리에 새 XML 을 쓰고,
+  늘어난 슬라이드는 새 파트로 붙이고 줄어든 슬라이드는 뺀다.
+  빠지는 슬라이드에만 딸린 파트(발표자 노트, 메모)도 같이 뺀다. 이미지 같은 미디어는
+  다른 슬라이드와 같이 쓸 수 있어서 남긴다. (PowerPoint 에서 저장하면 정리된다)
+  슬라이드 수가 바뀔 때만 presentation.xml / 그 관계 파일 / [Content_Types].xml 을 다시 쓴다.
+- 나머지 zip 항목은 압축된 바이트 그대로(로컬 헤더 포함) 옮긴다. 다시 압축하지 않는다.
+
+결과 덱의 슬라이드는 같은 곡 목록으로 ppt_save 한 덱의 슬라이드와 같은 XML 이다.
+"""
+
+import copy
+import io
+import os
+import posixpath
+import stat
+import tempfile
+import zipfile
+import zlib
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+
+from service.slide_template import SlideTemplates, iter_song_slides
+
+_PKG_RELS = "_rels/.rels"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_OVERRIDE = "{http://schemas.openxmlformats.org/package/2006/content-types}Override"
+
+# 슬라이드 하나에만 딸린 관계. 슬라이드를 빼면 이 파트들도 뺀다.
+_OWNED_RELS = {RT.NOTES_SLIDE, RT.COMMENTS}
+
+
+class DeckPatchError(ValueError):
+    """패치할 수 없는 덱 (pptx 가 아니거나 슬라이드 목록을 읽을 수 없음)"""
+
+
+def _rels_member(member: str) -> str:
+    folder, name = posixpath.split(member)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _read_rels(zin: zipfile.ZipFile, member: str):
+    """member 의 관계 파일. 없으면 None"""
+    try:
+        return parse_xml(zin.read(_rels_member(member)))
+    except KeyError:
+        return None
+
+
+def _owned_parts(zin: zipfile.ZipFile, slide_member: str) -> list[str]:
+    """슬라이드에만 딸린 파트(노트, 메모)의 zip 항목 이름"""
+    rels = _read_rels(zin, slide_member)
+    if rels is None:
+        return []
+    return [
+        _resolve(slide_member, rel.get("Target"))
+        for rel in rels.iter(_REL)
+        if rel.get("Type") in _OWNED_RELS and rel.get("TargetMode") != "External"
+    ]
+
+
+def _resolve(base_member: str, target: str) -> str:
+    """관계 Target(상대 / 절대 경로)을 zip 항목 이름으로"""
+    if target.startswith("/"):
+        return target[1:]
+    folder = posixpath.dirname(base_member)
+    if "." not in posixpath.dirname(target):
+        return f"{folder}/{target}" if folder else target
+    return posixpath.normpath(posixpath.join(folder, target))
+
+
+class _Deck:
+    """기존 덱에서 패치에 필요한 것만 읽는다. (presentation.xml, 관계, 슬라이드 목차)"""
+
+    def __init__(self, zin: zipfile.ZipFile):
+        self.zin = zin
+        try:
+            pkg_rels = parse_xml(zin.read(_PKG_RELS))
+            self.prs_member = next(
+                _resolve("", rel.get("Target"))
+                for rel in pkg_rels.iter(_REL)
+                if rel.get("Type") == RT.OFFICE_DOCUMENT
+            )
+            self.prs_rels_member = _rels_member(self.prs_member)
+            self.prs = parse_xml(zin.read(self.prs_member))
+            self.prs_rels = parse_xml(zin.read(self.prs_rels_member))
+        except (KeyError, StopIteration) as e:
+            raise DeckPatchError(f"pptx 덱이 아닙니다: {e}") from e
+
+        self.targets = {rel.get("Id"): rel for rel in self.prs_rels.iter(_REL)}
+
+        sldSz = self.prs.find(qn("p:sldSz"))
+        self.slide_width = int(sldSz.get("cx"))
+        self.slide_height = int(sldSz.get("cy"))
+
+        # 슬라이드 순서대로 (p:sldId 엘리먼트, zip 항목 이름)
+        self.slides = []
+        sldIdLst = self.prs.find(qn("p:sldIdLst"))
+        for sldId in sldIdLst if sldIdLst is not None else ():
+            rel = self.targets[sldId.get(qn("r:id"))]
+            self.slides.append((sldId, _resolve(self.prs_member, rel.get("Target"))))
+
+    def key(self, member: str) -> tuple[int, int]:
+        info = self.zin.getinfo(member)
+        return info.CRC, info.file_size
+
+
+def _slide_key(blob: bytes) -> tuple[int, int]:
+    return zlib.crc32(blob), len(blob)
+
+
+def _render(song_list, templates, cache):
+    """곡마다 슬라이드 XML 목록. cache(SongSlideCache)가 있으면 바뀌지 않은 곡은 저장된 조각."""
+    for song in song_list:
+        if cache is not None:
+            yield song, cache.song_fragments(templates, song)
+        else:
+            yield song, [serialize_part_xml(sld) for sld in iter_song_slides(templates, song)]
+
+
+def diff_slides(old_keys, new_keys):
+    """
+    새 슬라이드마다 (재사용할 기존 슬라이드 번호 또는 None, 내용이 바뀌었는지).
+    같은 빈 슬라이드가 많아서 autojunk 는 끈다.
+    """
+    # 보통은 곡 하나만 바뀌므로 앞뒤로 같은 구간을 먼저 떼고 가운데만 비교한다.
+    n = min(len(old_keys), len(new_keys))
+    head = 0
+    while head < n and old_keys[head] == new_keys[head]:
+        head += 1
+    tail = 0
+    while tail < n - head and old_keys[-1 - tail] == new_keys[-1 - tail]:
+        tail += 1
+
+    plan = [(i, False) for i in range(head)]
+    old_mid = old_keys[head : len(old_keys) - tail]
+    new_mid = new_keys[head : len(new_keys) - tail]
+
+    matcher = SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        i1, i2 = i1 + head, i2 + head
+        if tag == "equal":
+            plan.extend((i, False) for i in range(i1, i2))
+            continue
+        # 바뀐 구간은 앞에서부터 기존 파트 자리를 재사용하고, 남는 쪽만 추가 / 삭제
+        for k in range(j2 - j1):
+            plan.append((i1 + k if i1 + k < i2 else None, True))
+
+    plan.extend((i, False) for i in range(len(old_keys) - tail, len(old_keys)))
+    return plan
+
+
+def patch_deck(src, song_list, out=None, templates: SlideTemplates | None = None, cache=None) -> dict:
+    """
+    src 덱을 song_list 에 맞게 고쳐서 out 에 쓴다. (out 이 없으면 src 경로에 덮어쓴다)
+    src / out 은 경로 또는 바이너리 파일 객체. 바뀐 것이 없으면 아무것도 다시 쓰지 않는다. (out 이 src 일 때)
+
+    돌려주는 값: slides / kept / rewritten / added / removed / changed_songs(바뀐 곡 제목)
+    """
+    if out is None:
+        if not isinstance(src, (str, os.PathLike)):
+            raise ValueError("src 가 파일 객체면 out 을 줘야 합니다.")
+        out = src
+
+    data = Path(src).read_bytes() if isinstance(src, (str, os.PathLike)) else src.read()
+    try:
+        zin = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as e:
+        raise DeckPatchError(f"pptx 덱이 아닙니다: {e}") from e
+
+    deck = _Deck(zin)
+
+    if templates is None or (templates.slide_width, templates.slide_height) != (
+        deck.slide_width,
+        deck.slide_height,
+    ):
+        templates = SlideTemplates(deck.slide_width, deck.slide_height)
+
+    # 새 슬라이드와 그 슬라이드가 속한 곡
+    blobs, owners, titles = [], [], []
+    for n, (song, fragments) in enumerate(_render(song_list, templates, cache)):
+        blobs.extend(fragments)
+        owners.extend([n] * len(fragments))
+        titles.append(song.get("title") or f"{n + 1}번째 곡")
+
+    old_keys = [deck.key(member) for _, member in deck.slides]
+    plan = diff_slides(old_keys, [_slide_key(blob) for blob in blobs])
+
+    reused = {i for i, _ in plan if i is not None}
+    removed = [i for i in range(len(deck.slides)) if i not in reused]
+    rewritten = sum(1 for i, changed in plan if changed and i is not None)
+    added = sum(1 for i, _ in plan if i is None)
+
+    stats = {
+        "slides": len(plan),
+        "kept": sum(1 for _, changed in plan if not changed),
+        "rewritten": rewritten,
+        "added": added,
+        "removed": len(removed),
+        "changed_songs": [
+            titles[n] for n in sorted({owners[j] for j, (_, changed) in enumerate(plan) if changed})
+        ],
+    }
+
+    if not (rewritten or added or removed):
+        if out is not src:
+            _write_file(out, data)
+        return stats
+
+    # 기존 파트 자리에 다시 쓸 XML
+    replace = {
+        deck.slides[i][1]: blobs[j] for j, (i, changed) in enumerate(plan) if changed and i is not None
+    }
+    skip = set()
+    for i in removed:
+        member = deck.slides[i][1]
+        for part in (member, *_owned_parts(zin, member)):
+            skip.update((part, _rels_member(part)))
+
+    new_parts = []  # (zip 항목 이름, XML)
+    if added or removed:
+        new_parts = _restructure(deck, plan, blobs, replace, removed, skip)
+
+    # 항목의 끝 = 다음 항목의 시작 (마지막 항목은 목차 시작)
+    members = sorted(zin.infolist(), key=lambda info: info.header_offset)
+    offsets = [info.header_offset for info in members] + [zin.start_dir]
+    ends = dict(zip(offsets, offsets[1:]))
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+        for info in members:
+            if info.filename in skip:
+                continue
+            if info.filename in replace:
+                zinfo = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                zinfo.compress_type = info.compress_type
+                zout.writestr(zinfo, replace[info.filename])
+            else:
+                _copy_raw(zout, info, data[info.header_offset : ends[info.header_offset]])
+
+        for member, blob in new_parts:
+            zout.writestr(member, blob)
+
+    _write_file(out, buf.getvalue())
+    return stats
+
+
+def _restructure(deck: _Deck, plan, blobs, replace, removed, dropped) -> list[tuple[str, bytes]]:
+    """
+    슬라이드가 늘거나 줄 때: 새 슬라이드 파트를 만들고,
+    presentation.xml / 그 관계 / [Content_Types].xml 은 고친 XML 을 replace 에 넣는다.
+    dropped 는 빠지는 zip 항목 (슬라이드와 그 노트 등). content type 에서도 뺀다.
+    """
+    zin = deck.zin
+    content_types = parse_xml(zin.read(CONTENT_TYPES_URI.membername))
+
+    # 새 슬라이드 관계 파일은 기존 슬라이드의 레이아웃 관계만 남겨서 쓴다. (모두 같은 레이아웃)
+    # 노트 같은 관계까지 복사하면 새 슬라이드가 남의 노트를 가리킨다.
+    if not deck.slides:
+        raise DeckPatchError("슬라이드가 없는 덱은 고칠 수 없습니다. 새로 만드세요.")
+    rels = _read_rels(zin, deck.slides[0][1])
+    for rel in list(rels.iter(_REL)):
+        if rel.get("Type") != RT.SLIDE_LAYOUT:
+            rels.remove(rel)
+    slide_rels = serialize_part_xml(rels)
+    slide_dir = posixpath.dirname(deck.slides[0][1])
+
+    names = set(zin.namelist())
+    next_slide = 1
+    next_rel = 1 + max(
+        (int(rid[3:]) for rid in deck.targets if rid.startswith("rId") and rid[3:].isdigit()),
+        default=0,
+    )
+    next_id = 1 + max((int(sldId.get("id")) for sldId, _ in deck.slides), default=255)
+
+    # 빠지는 슬라이드: 관계 제거, 빠지는 파트의 content type 제거
+    for i in removed:
+        sldId, _ = deck.slides[i]
+        deck.prs_rels.remove(deck.targets[sldId.get(qn("r:id"))])
+    for override in list(content_types.iter(_OVERRIDE)):
+        if override.get("PartName")[1:] in dropped:
+            content_types.remove(override)
+
+    sldIdLst = deck.prs.find(qn("p:sldIdLst"))
+    for sldId in list(sldIdLst):
+        sldIdLst.remove(sldId)
+
+    new_parts = []
+    for j, (i, _) in enumerate(plan):
+        if i is not None:
+            sldIdLst.append(deck.slides[i][0])
+            continue
+
+        while posixpath.join(slide_dir, f"slide{next_slide}.xml") in names:
+            next_slide += 1
+        member = posixpath.join(slide_dir, f"slide{next_slide}.xml")
+        names.add(member)
+
+        rId = f"rId{next_rel}"
+        next_rel += 1
+        rel = deck.prs_rels.makeelement(
+            _REL,
+            {
+                "Id": rId,
+                "Type": RT.SLIDE,
+                "Target": posixpath.relpath(member, posixpath.dirname(deck.prs_member)),
+            },
+        )
+        deck.prs_rels.append(rel)
+        content_types.append(
+            content_types.makeelement(_OVERRIDE, {"PartName": f"/{member}", "ContentType": CT.PML_SLIDE})
+        )
+        sldIdLst._add_sldId(id=next_id, rId=rId)
+        next_id += 1
+
+        new_parts += [(member, blobs[j]), (_rels_member(member), slide_rels)]
+
+    replace[deck.prs_member] = serialize_part_xml(deck.prs)
+    replace[deck.prs_rels_member] = serialize_part_xml(deck.prs_rels)
+    replace[CONTENT_TYPES_URI.membername] = serialize_part_xml(content_types)
+    return new_parts
+
+
+def _copy_raw(zout: zipfile.ZipFile, info: zipfile.ZipInfo, raw: bytes):
+    """
+    zip 항목 하나를 압축된 그대로 옮긴다. raw = 로컬 헤더 + 압축 데이터 (+ data descriptor)
+    로컬 헤더에는 위치 정보가 없어서 바이트를 그대로 붙이고 목차(central directory)의 위치만 바꾼다.
+    """
+    zinfo = copy.copy(info)
+    zinfo.header_offset = zout.fp.tell()
+    zout.fp.write(raw)
+    zout.filelist.append(zinfo)
+    zout.NameToInfo[zinfo.filename] = zinfo
+    # 다음 writestr 가 이어서 쓰도록 (zipfile 은 start_dir 위치부터 쓴다)
+    zout.start_dir = zout.fp.tell()
+
+
+def _write_file(out, data: bytes):
+    """경로면 임시 파일에 쓰고 바꿔 끼운다. (쓰다 실패해도 기존 덱은 그대로)"""
+    if not isinstance(out, (str, os.PathLike)):
+        out.write(data)
+        return
+
+    out = Path(out)
+    fd, tmp = tempfile.mkstemp(dir=out.parent, prefix=f"{out.name}.", suffix=".tmp")
+    try:
+        # mkstemp 는 0600 으로 만든다. 덮어쓰는 파일이 있으면 그 권한을 따른다.
+        mode = stat.S_IMODE(out.stat().st_mode) if out.exists() else 0o644
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out)
+    finally:
+        Path(tmp).unlink(missing_ok=True)
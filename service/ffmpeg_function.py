@@ -2,20 +2,25 @@ from io import BytesIO
 from pathlib import Path
 import tempfile
 import subprocess
-import subprocess
-import librosa
 import os
 import numpy as np
 
-MAJOR_PROFILE = np.array(
-    [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
-)
+# librosa 는 하위 모듈(feature, effects, ...)을 처음 쓸 때 읽는다. (lazy_loader)
+# 여기서 import 해도 scipy / numba 는 분석 함수가 처음 불릴 때까지 안 읽는다.
+import librosa
 
-MINOR_PROFILE = np.array(
-    [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
+from service import chroma_engine
+from service.key_scoring import (
+    CHROMA_LABELS,
+    PROFILES,
+    KeyScorer,
+    get_scorer,
+    ranked_keys,
 )
 
-CHROMA_LABELS = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+MAJOR_PROFILE = np.array(PROFILES["krumhansl"][0])
+
+MINOR_PROFILE = np.array(PROFILES["krumhansl"][1])
 
 
 def extract_video_id(url: str) -> str | None:
@@ -70,7 +75,54 @@ def download_wav_to_memory(url: str) -> BytesIO:
     return BytesIO(audio_bytes)
 
 
-def download_wav_to_tempfile(url: str) -> Path:
+def ffmpeg_pcm_cmd(input_arg: str, sr: int, max_seconds: float | None = None) -> list[str]:
+    """input_arg 를 mono float32(f32le) raw PCM 으로 stdout 에 내보내는 ffmpeg 명령"""
+    limit = ["-t", str(max_seconds)] if max_seconds is not None else []
+    return [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-i",
+        input_arg,
+        *limit,
+        "-ac",
+        "1",  # mono
+        "-ar",
+        str(sr),
+        "-f",
+        "f32le",  # raw float32 little-endian
+        "pipe:1",
+    ]
+
+
+def decode_audio(
+    source: str | Path | BytesIO | bytes,
+    sr: int = 22050,
+    max_seconds: float | None = None,
+) -> np.ndarray:
+    """
+    파일 경로 / 메모리 버퍼를 ffmpeg 로 바로 float32 mono PCM 으로 디코딩한다.
+    librosa.load (soundfile / audioread + 리샘플링)를 거치지 않아서 scipy 등을 import 하지 않는다.
+    리샘플링도 ffmpeg 가 하므로 sr 은 항상 지정한다. (librosa.load 기본값과 같은 22050)
+    """
+    if isinstance(source, (str, Path)):
+        cmd, data = ffmpeg_pcm_cmd(str(source), sr, max_seconds), None
+    else:
+        data = source.getvalue() if isinstance(source, BytesIO) else source
+        cmd = ffmpeg_pcm_cmd("pipe:0", sr, max_seconds)
+
+    proc = subprocess.run(cmd, input=data, capture_output=True)
+    if proc.returncode != 0:
+        raise ValueError(f"ffmpeg decode failed: {proc.stderr.decode(errors='replace').strip()}")
+
+    pcm = proc.stdout
+    y = np.frombuffer(pcm[: len(pcm) - len(pcm) % 4], dtype="<f4")
+    if len(y) == 0:
+        raise ValueError("Audio buffer is empty (decode failed)")
+    return y
+
+
+def download_wav_to_tempfile(url: str, max_seconds: float = 180, sr: int = 22050) -> Path:
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
         tmp_path = Path(tmp.name)
 
@@ -86,7 +138,7 @@ def download_wav_to_tempfile(url: str) -> Path:
             "--audio-format",
             "wav",
             "--postprocessor-args",
-            "-t 180 -ac 1 -ar 22050",
+            f"-t {max_seconds} -ac 1 -ar {sr}",
             "--force-overwrites",
             "-o",
             str(tmp_path),
@@ -98,8 +150,8 @@ def download_wav_to_tempfile(url: str) -> Path:
     return tmp_path
 
 
-def get_bpm_from_wav(wav_path: str) -> int:
-    y, sr = librosa.load(wav_path, sr=None, mono=True)
+def get_bpm_from_wav(wav_path: str, sr: int = 22050) -> int:
+    y = decode_audio(wav_path, sr=sr)
 
     tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
     tempo = float(np.asarray(tempo).squeeze())
@@ -107,16 +159,15 @@ def get_bpm_from_wav(wav_path: str) -> int:
     return int(round(tempo))
 
 
-def get_key_from_wav(wav_path: str):
-    y, sr = librosa.load(wav_path, sr=None, mono=True)
+def get_key_from_wav(wav_path: str, sr: int = 22050):
+    y = decode_audio(wav_path, sr=sr)
 
     result = key_find_algorithm(y, sr)
     return result
 
 
-def get_bpm_from_buffer(buf: BytesIO) -> int:
-    buf.seek(0)
-    y, sr = librosa.load(buf, sr=None)
+def get_bpm_from_buffer(buf: BytesIO, sr: int = 16000) -> int:
+    y = decode_audio(buf, sr=sr)
 
     tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
 
@@ -124,23 +175,29 @@ def get_bpm_from_buffer(buf: BytesIO) -> int:
     return int(round(tempo))
 
 
-def get_key_from_buffer(buf: BytesIO) -> str:
-    buf.seek(0)
-    y, sr = librosa.load(buf, sr=None, mono=True)
+def get_key_from_buffer(buf: BytesIO, sr: int = 16000) -> str:
+    y = decode_audio(buf, sr=sr)
     res = key_find_algorithm(y, sr)
     return res
 
 
-def preprocess_audio(y: np.ndarray, sr: int, trim: bool = True) -> np.ndarray:
+def preprocess_audio(
+    y: np.ndarray, sr: int, trim: bool = True, return_offset: bool = False
+):
+    """return_offset 이면 (y, 앞에서 잘라낸 샘플 수) 를 돌려준다."""
     if y.ndim > 1:
         y = librosa.to_mono(y)
 
+    offset = 0
     if trim:
-        y, _ = librosa.effects.trim(y)
+        y, index = librosa.effects.trim(y)
+        offset = int(index[0])
 
     if len(y) == 0:
         raise ValueError("Audio buffer is empty after preprocessing")
 
+    if return_offset:
+        return y, offset
     return y
 
 
@@ -150,32 +207,15 @@ def compute_chroma_vector(
     segment_seconds: float = 10.0,
     method: str = "cqt",
     hop_length: int = 512,
+    tuning: float | None = None,
 ) -> np.ndarray:
-    seg_len = int(sr * segment_seconds)
-    num_segments = max(1, len(y) // seg_len)
-
-    chroma_sum = np.zeros(12)
-
-    for i in range(num_segments):
-        start = i * seg_len
-        end = min(len(y), (i + 1) * seg_len)
-        segment = y[start:end]
-
-        if method == "cqt":
-            chroma = librosa.feature.chroma_cqt(y=segment, sr=sr, hop_length=hop_length)
-        else:
-            raise ValueError("method must be 'cqt' or 'stft'")
+    if method != "cqt":
+        raise ValueError("method must be 'cqt' or 'stft'")
 
-        chroma_sum += np.mean(chroma, axis=1)
-
-    chroma_vec = chroma_sum / num_segments
-
-    # L2 normalize
-    norm = np.linalg.norm(chroma_vec)
-    if norm < 1e-12:
-        raise ValueError("Chroma vector is near zero")
-
-    return chroma_vec / norm
+    # 세그먼트마다 chroma_cqt 를 부르지 않고 CQT 를 곡 전체에 한 번만 돌린다. (service/chroma_engine.py)
+    return chroma_engine.chroma_vector(
+        y, sr, segment_seconds=segment_seconds, hop_length=hop_length, tuning=tuning
+    )
 
 
 def compute_ks_correlations(
@@ -183,14 +223,13 @@ def compute_ks_correlations(
     major_profile: np.ndarray = MAJOR_PROFILE,
     minor_profile: np.ndarray = MINOR_PROFILE,
 ):
-    major_scores = []
-    minor_scores = []
-
-    for i in range(12):
-        major_scores.append(np.corrcoef(np.roll(major_profile, i), chroma_vec)[0, 1])
-        minor_scores.append(np.corrcoef(np.roll(minor_profile, i), chroma_vec)[0, 1])
+    # 12번 돌리며 np.corrcoef 하던 것을 24×12 행렬 곱 한 번으로 (service/key_scoring.py)
+    if major_profile is MAJOR_PROFILE and minor_profile is MINOR_PROFILE:
+        scorer = get_scorer()
+    else:
+        scorer = KeyScorer(major_profile, minor_profile)
 
-    return np.array(major_scores), np.array(minor_scores)
+    return scorer.major_minor(chroma_vec)
 
 
 def select_key(major_scores: np.ndarray, minor_scores: np.ndarray):
@@ -214,16 +253,7 @@ def select_key(major_scores: np.ndarray, minor_scores: np.ndarray):
 def build_ranked_results(
     major_scores: np.ndarray, minor_scores: np.ndarray, top_n: int = 5
 ):
-    results = []
-
-    for i, s in enumerate(major_scores):
-        results.append((CHROMA_LABELS[i], "Major", float(s)))
-
-    for i, s in enumerate(minor_scores):
-        results.append((CHROMA_LABELS[i], "Minor", float(s)))
-
-    results.sort(key=lambda x: x[2], reverse=True)
-    return results[:top_n]
+    return ranked_keys(np.concatenate([major_scores, minor_scores]), top_n=top_n)
 
 
 def key_find_algorithm(y: np.ndarray, sr: int, segment_seconds: float = 10.0):
@@ -2,6 +2,12 @@ import re
 from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.dml.color import RGBColor
+from service.song_form import compile_song_form
+from service.text_fit import fit_lyrics
+
+# 가사 슬라이드 텍스트박스 크기 (SlideTemplates 도 같은 값으로 줄을 맞춘다)
+LYRICS_BOX_WIDTH = Pt(1400)
+LYRICS_BOX_HEIGHT = Pt(300)
 
 
 def add_empty_slide(prs):
@@ -37,20 +43,23 @@ def add_title_slide(prs, title):
 def parse_song_form(song_form: str):
     """
     송폼을 리스트 형식으로 바꿔주는 파싱 함수
+    반복(B(x2), [AB]x2)은 펼쳐서 돌려준다. 문법 오류는 SongFormError (글자 위치 포함)
     """
-    return re.findall(r"\([^)]+\)|[A-Z][0-9]*", song_form)
+    return list(compile_song_form(song_form).plan)
 
 
-def add_lyrics_slide(prs, slide_text: str):
+def add_lyrics_slide(prs, slide_text: str, font_size: int | None = None):
     """
     가사 슬라이드 넣기 // 추후에 뭐 폰트나 색 이런거 여기서 수정
+    글자 크기와 줄바꿈은 fit_lyrics 가 화면에 보이는 폭에 맞춰 정한다. (최대 44pt)
+    font_size 를 주면 맞추지 않고 줄 그대로 그 크기로. (이미 맞춘 줄일 때)
     """
     slide = prs.slides.add_slide(prs.slide_layouts[6])
     slide.background.fill.solid()
     slide.background.fill.fore_color.rgb = RGBColor(0, 0, 0)
 
-    BOX_WIDTH = Pt(1400)
-    BOX_HEIGHT = Pt(300)
+    BOX_WIDTH = LYRICS_BOX_WIDTH
+    BOX_HEIGHT = LYRICS_BOX_HEIGHT
     LEFT = (prs.slide_width - BOX_WIDTH) / 2
     TOP = Pt(0)
 
@@ -61,11 +70,14 @@ def add_lyrics_slide(prs, slide_text: str):
     tf.vertical_anchor = MSO_ANCHOR.MIDDLE
 
     lines = [l.strip() for l in slide_text.split("\n") if l.strip()]
+    if font_size is None:
+        # 박스가 슬라이드보다 넓으므로 슬라이드 안에 보이는 폭에 맞춘다.
+        font_size, lines = fit_lyrics(lines, min(BOX_WIDTH, prs.slide_width), BOX_HEIGHT)
 
     for i, line in enumerate(lines):
         p = tf.paragraphs[0] if i == 0 else tf.add_paragraph()
         p.text = line
-        p.font.size = Pt(44)
+        p.font.size = Pt(font_size)
         p.font.color.rgb = RGBColor(255, 255, 255)
         p.alignment = PP_ALIGN.CENTER
 
@@ -0,0 +1,95 @@
+"""
+Krumhansl-Schmuckler 방식 키 점수 계산 (행렬 한 번 곱하기)
+
+24개 키(장조 12 + 단조 12)의 회전된 프로파일을 미리 z-score 해서 24×12 행렬로 만들어 둔다.
+chroma 도 z-score 하면 피어슨 상관계수는 내적 / 12 이라서,
+chroma 하나는 행렬-벡터 곱 한 번, N 개 (N×12) 는 행렬 곱 한 번으로 24개 점수가 나온다.
+
+프로파일은 PROFILES 에 이름으로 등록되어 있고 (krumhansl / temperley / aarden),
+get_scorer(name) 이 이름별로 행렬을 한 번만 만든다.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+CHROMA_LABELS = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+
+# 점수 배열의 순서: C Major ... B Major, C Minor ... B Minor
+KEY_LABELS = [(label, "Major") for label in CHROMA_LABELS] + [
+    (label, "Minor") for label in CHROMA_LABELS
+]
+
+PROFILES = {
+    # Krumhansl & Kessler (1982). 기존 MAJOR_PROFILE / MINOR_PROFILE
+    "krumhansl": (
+        [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88],
+        [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17],
+    ),
+    # Temperley (2007), Kostka-Payne 코퍼스
+    "temperley": (
+        [5.0, 2.0, 3.5, 2.0, 4.5, 4.0, 2.0, 4.5, 2.0, 3.5, 1.5, 4.0],
+        [5.0, 2.0, 3.5, 4.5, 2.0, 4.0, 2.0, 4.5, 3.5, 2.0, 1.5, 4.0],
+    ),
+    # Aarden (2003), Essen 민요 코퍼스
+    "aarden": (
+        [17.7661, 0.145624, 14.9265, 0.160186, 19.8049, 11.3587,
+         0.291248, 22.062, 0.145624, 8.15494, 0.232998, 4.95122],
+        [18.2648, 0.737619, 14.0499, 16.8599, 0.702494, 14.4362,
+         0.702494, 18.6161, 4.56621, 1.93186, 7.37619, 1.75623],
+    ),
+}
+
+DEFAULT_PROFILE = "krumhansl"
+
+
+def _zscore(x: np.ndarray) -> np.ndarray:
+    """마지막 축 기준 z-score (모표준편차). 분산이 0 이면 nan (np.corrcoef 와 같게)."""
+    x = np.asarray(x, dtype=float)
+    centered = x - x.mean(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return centered / centered.std(axis=-1, keepdims=True)
+
+
+class KeyScorer:
+    def __init__(self, major_profile, minor_profile):
+        major_profile = np.asarray(major_profile, dtype=float)
+        minor_profile = np.asarray(minor_profile, dtype=float)
+
+        # i 번째 행 = 프로파일을 i 칸 돌린 것 (np.roll(profile, i))
+        shifts = (np.arange(12)[None, :] - np.arange(12)[:, None]) % 12
+        rotated = np.vstack([major_profile[shifts], minor_profile[shifts]])
+
+        self.matrix = _zscore(rotated) / 12  # (24, 12)
+        self.matrix.setflags(write=False)
+
+    def correlations(self, chroma: np.ndarray) -> np.ndarray:
+        """chroma (12,) -> (24,), (N, 12) -> (N, 24). 24 = 장조 12 + 단조 12"""
+        return _zscore(chroma) @ self.matrix.T
+
+    def major_minor(self, chroma: np.ndarray):
+        """compute_ks_correlations 와 같은 (major_scores, minor_scores)"""
+        scores = self.correlations(chroma)
+        return scores[..., :12], scores[..., 12:]
+
+
+@lru_cache(maxsize=None)
+def get_scorer(name: str = DEFAULT_PROFILE) -> KeyScorer:
+    if name not in PROFILES:
+        raise ValueError(f"unknown key profile: {name} (choose from {', '.join(PROFILES)})")
+    return KeyScorer(*PROFILES[name])
+
+
+def best_keys(scores: np.ndarray):
+    """
+    (…, 24) 점수에서 가장 높은 키의 (인덱스, 점수).
+    동점이면 장조가 먼저 (select_key 와 같은 규칙).
+    """
+    idx = np.argmax(scores, axis=-1)
+    return idx, np.take_along_axis(scores, idx[..., None], axis=-1)[..., 0]
+
+
+def ranked_keys(scores: np.ndarray, top_n: int = 5) -> list[tuple[str, str, float]]:
+    """(24,) 점수를 높은 순으로 (key, mode, score). 동점은 장조 → 단조, C → B 순서."""
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    return [(*KEY_LABELS[i], float(scores[i])) for i in order]
@@ -0,0 +1,101 @@
+"""
+시간에 따라 바뀌는 키 / 템포 (전조하는 곡용)
+
+마지막 후렴에서 한 음 올라가는 곡은 곡 전체 chroma 평균으로 키를 하나만 고르면 두 키가 섞인다.
+여기서는 이미 계산한 구간별 chroma 평균(세그먼트 × 12)을 이웃 몇 개와 이동평균하고,
+key_scoring 으로 모든 구간을 행렬 곱 한 번에 점수 매긴 뒤 같은 키가 이어지는 구간끼리 합친다.
+CQT 를 다시 돌리지 않으므로 추가 비용은 거의 없다.
+
+템포는 onset envelope 하나로 librosa 의 프레임별 local tempo 를 구해서 초 단위로 줄인다.
+"""
+
+import librosa
+import numpy as np
+
+from service.key_scoring import KEY_LABELS, get_scorer
+
+
+def _moving_average(x: np.ndarray, width: int) -> np.ndarray:
+    """(n, 12) 를 축 0 으로 가운데 정렬 이동평균. 양 끝은 있는 이웃만 평균."""
+    if width <= 1 or len(x) <= 1:
+        return x
+
+    left = (width - 1) // 2
+    right = width - 1 - left
+    padded = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+
+    idx = np.arange(len(x))
+    lo = np.maximum(idx - left, 0)
+    hi = np.minimum(idx + right + 1, len(x))
+    return (padded[hi] - padded[lo]) / (hi - lo)[:, None]
+
+
+def key_timeline(
+    segment_chroma: np.ndarray,
+    segment_seconds: float,
+    smooth: int = 3,
+    total_seconds: float | None = None,
+    offset_seconds: float = 0.0,
+) -> list[dict]:
+    """
+    구간별 chroma 평균 (n, 12) → [{"start", "end", "key", "mode", "confidence"}, ...]
+    confidence 는 그 구간의 1·2위 상관계수 차이 평균.
+    offset_seconds 는 앞쪽 무음을 잘라낸 길이 (원래 곡 기준 시각으로 돌려주려고).
+    """
+    if len(segment_chroma) == 0:
+        return []
+
+    scores = get_scorer().correlations(_moving_average(segment_chroma, smooth))
+
+    # 무음 구간은 chroma 분산이 0 이라 점수가 nan. 키 없음(-1)으로 두고 결과에서 뺀다.
+    valid = np.isfinite(scores).all(axis=1)
+    scores = np.where(valid[:, None], scores, 0.0)
+
+    order = np.argsort(scores, axis=1)
+    rows = np.arange(len(scores))
+    best = np.where(valid, order[:, -1], -1)
+    margin = scores[rows, order[:, -1]] - scores[rows, order[:, -2]]
+
+    # 키가 바뀌는 지점에서 끊는다.
+    breaks = np.flatnonzero(np.diff(best)) + 1
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks, [len(best)]])
+
+    if total_seconds is None:
+        total_seconds = len(best) * segment_seconds
+
+    spans = []
+    for s, e in zip(starts, ends):
+        if best[s] < 0:
+            continue
+        key, mode = KEY_LABELS[best[s]]
+        spans.append(
+            {
+                "start": float(offset_seconds + s * segment_seconds),
+                "end": float(offset_seconds + min(e * segment_seconds, total_seconds)),
+                "key": key,
+                "mode": mode,
+                "confidence": float(margin[s:e].mean()),
+            }
+        )
+    return spans
+
+
+def tempo_curve(
+    onset_envelope: np.ndarray,
+    sr: int,
+    hop_length: int = 512,
+    step_seconds: float = 1.0,
+) -> list[tuple[float, float]]:
+    """[(초, BPM), ...] step_seconds 간격의 local tempo"""
+    if len(onset_envelope) == 0 or not onset_envelope.any():
+        return []
+
+    local = librosa.feature.tempo(
+        onset_envelope=onset_envelope, sr=sr, hop_length=hop_length, aggregate=None
+    )
+    step = max(1, int(round(step_seconds * sr / hop_length)))
+    frames = np.arange(0, len(local), step)
+    times = librosa.frames_to_time(frames, sr=sr, hop_length=hop_length)
+
+    return [(float(t), float(b)) for t, b in zip(times, local[frames])]
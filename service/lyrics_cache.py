@@ -0,0 +1,206 @@
+"""
+가사 검색 결과 / 곡 가사 영구 캐시 (SQLite 로컬 파일)
+
+- 검색 결과는 정규화한 검색어로, 곡 가사는 track_id 로 저장한다.
+- TTL 이 지난 항목은 기본적으로 안 쓰지만, 네트워크가 안 될 때는 allow_stale 로 꺼내 쓴다.
+  (예배 중 교회 와이파이가 끊겨도 검색이 되도록)
+- 가사가 없는 곡("")도 저장해서 같은 곡을 계속 다시 요청하지 않는다. (negative cache, TTL 은 짧게)
+- 테이블마다 max_entries 를 넘으면 가장 오래 안 쓴 항목부터 지운다.
+- track.seq 는 AUTOINCREMENT 라 지워진 번호를 다시 쓰지 않는다. LyricsIndex 가 마지막 seq 만
+  기억해서 그 뒤에 저장된 가사만 읽어 간다.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+DAY = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search (
+    query       TEXT PRIMARY KEY,
+    max_limit   INTEGER NOT NULL,
+    results     TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    used_at     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS track (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    track_id    TEXT NOT NULL UNIQUE,
+    lyrics      TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    used_at     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS track_meta (
+    track_id    TEXT PRIMARY KEY,
+    title       TEXT NOT NULL,
+    artist      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_used_at ON search (used_at);
+CREATE INDEX IF NOT EXISTS track_used_at ON track (used_at);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """NFC 정규화 + 공백 정리 + 소문자. "창세  전에" 와 "창세 전에" 를 같은 키로."""
+    query = unicodedata.normalize("NFC", query)
+    return " ".join(query.split()).lower()
+
+
+class LyricsCache:
+    def __init__(
+        self,
+        path,
+        ttl: float = 7 * DAY,
+        negative_ttl: float = 1 * DAY,
+        max_entries: int = 5000,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        # Streamlit 은 rerun 마다 다른 스레드에서 돌 수 있으므로 연결 하나를 락으로 보호한다.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _fresh(self, fetched_at: float, ttl: float) -> bool:
+        return time.time() - fetched_at < ttl
+
+    def _evict(self, table: str):
+        if table == "track":
+            # 지워질 곡의 제목/아티스트도 같이 지운다.
+            self._conn.execute(
+                """
+                DELETE FROM track_meta WHERE track_id IN (
+                    SELECT track_id FROM track ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+        self._conn.execute(
+            f"""
+            DELETE FROM {table} WHERE rowid IN (
+                SELECT rowid FROM {table} ORDER BY used_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    # ----------------------
+    # 검색 결과
+    # ----------------------
+    def get_search(self, query: str, limit: int, allow_stale: bool = False):
+        key = normalize_query(query)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT max_limit, results, fetched_at FROM search WHERE query = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            max_limit, results, fetched_at = row
+            if max_limit < limit:
+                return None
+            if not allow_stale and not self._fresh(fetched_at, self.ttl):
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE search SET used_at = ? WHERE query = ?", (time.time(), key)
+                )
+
+        return json.loads(results)[:limit]
+
+    def put_search(self, query: str, limit: int, results: list[dict]):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search VALUES (?, ?, ?, ?, ?)",
+                (
+                    normalize_query(query),
+                    limit,
+                    json.dumps(results, ensure_ascii=False),
+                    now,
+                    now,
+                ),
+            )
+            # 가사만 저장되는 track 테이블에 제목/아티스트를 붙일 수 있도록 따로 남긴다.
+            # 지난 검색에서 가사를 못 받은 곡의 메타는 여기서 정리한다.
+            self._conn.execute(
+                "DELETE FROM track_meta WHERE track_id NOT IN (SELECT track_id FROM track)"
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO track_meta VALUES (?, ?, ?)",
+                [(r["track_id"], r["title"], r.get("artist", "")) for r in results],
+            )
+            self._evict("search")
+
+    # ----------------------
+    # 곡 가사
+    # ----------------------
+    def get_track(self, track_id: str, allow_stale: bool = False) -> str | None:
+        """캐시된 가사. "" 는 '가사 없음'이 캐시된 것이고, None 은 캐시에 없는 것."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lyrics, fetched_at FROM track WHERE track_id = ?", (track_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            lyrics, fetched_at = row
+            ttl = self.ttl if lyrics else self.negative_ttl
+            if not allow_stale and not self._fresh(fetched_at, ttl):
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE track SET used_at = ? WHERE track_id = ?",
+                    (time.time(), track_id),
+                )
+
+        return lyrics
+
+    def put_track(self, track_id: str, lyrics: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO track (track_id, lyrics, fetched_at, used_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (track_id, lyrics, now, now),
+            )
+            self._evict("track")
+
+    def iter_tracks_since(self, seq: int = 0):
+        """
+        seq 이후에 저장(또는 갱신)된 가사 (seq, track_id, lyrics, title, artist).
+        INSERT OR REPLACE 는 새 seq 를 받고, seq 는 줄어들거나 다시 쓰이지 않으므로
+        마지막 seq 만 기억하면 증분으로 읽을 수 있다.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT t.seq, t.track_id, t.lyrics,
+                       COALESCE(m.title, ''), COALESCE(m.artist, '')
+                FROM track t LEFT JOIN track_meta m ON t.track_id = m.track_id
+                WHERE t.seq > ? AND t.lyrics != ''
+                ORDER BY t.seq
+                """,
+                (seq,),
+            ).fetchall()
+        return rows
@@ -0,0 +1,148 @@
+"""
+bugs.co.kr 가사 검색 클라이언트 (asyncio + 공유 커넥션 풀)
+
+검색 결과를 받은 뒤 상위 limit 개 곡의 가사를 동시에 미리 받아 둔다.
+그래서 목록에서 "select" 를 눌렀을 때 다시 네트워크를 타지 않는다.
+
+HTTP 는 새 의존성 없이 requests.Session 하나(keep-alive 커넥션 풀)를 공유하고,
+블로킹 호출은 concurrency 크기의 전용 스레드 풀에서 돌려서 그만큼 동시에 보낸다.
+(asyncio.to_thread 의 기본 풀은 CPU 수에 묶여 있어서 쓰지 않는다.)
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from service.lyrics_extract import (
+    DEFAULT_BACKEND,
+    parse_search_results,
+    parse_track_lyrics,
+)
+
+BUGS_BASE_URL = "https://music.bugs.co.kr"
+HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+
+
+class LyricsClient:
+    """
+    client = LyricsClient(concurrency=8, timeout=10)
+    results = asyncio.run(client.search_with_lyrics("그리스도 안에서"))
+    """
+
+    def __init__(
+        self,
+        base_url: str = BUGS_BASE_URL,
+        concurrency: int = 8,
+        timeout: float | tuple[float, float] = 10,
+        cache=None,
+        parser: str = DEFAULT_BACKEND,
+    ):
+        """
+        cache(LyricsCache) 를 주면 검색 결과/가사를 먼저 캐시에서 찾는다.
+        parser 는 service.lyrics_extract 의 추출 백엔드 이름 ("lxml" / "bs4").
+        """
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.parser = parser
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="lyrics"
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _get_text(self, url: str) -> str:
+        res = self.session.get(url, timeout=self.timeout)
+        res.raise_for_status()
+        return res.text
+
+    async def _fetch(self, url: str, semaphore: asyncio.Semaphore | None = None) -> str:
+        loop = asyncio.get_running_loop()
+        if semaphore is None:
+            return await loop.run_in_executor(self._executor, self._get_text, url)
+
+        async with semaphore:
+            return await loop.run_in_executor(self._executor, self._get_text, url)
+
+    def search_url(self, query: str) -> str:
+        return f"{self.base_url}/search/lyrics?q={quote(query)}"
+
+    def track_url(self, track_id: str) -> str:
+        return f"{self.base_url}/track/{track_id}"
+
+    async def search(self, query: str, limit: int = 8) -> list[dict]:
+        if self.cache is not None:
+            cached = self.cache.get_search(query, limit)
+            if cached is not None:
+                return cached
+
+        try:
+            html = await self._fetch(self.search_url(query))
+        except requests.RequestException:
+            # 오프라인이면 TTL 이 지난 결과라도 돌려준다.
+            stale = self._stale("get_search", query, limit)
+            if stale is None:
+                raise
+            return stale
+
+        results = parse_search_results(html, limit=limit, backend=self.parser)
+        if self.cache is not None:
+            self.cache.put_search(query, limit, results)
+        return results
+
+    async def track_lyrics(self, track_id: str, semaphore=None) -> str:
+        if self.cache is not None:
+            cached = self.cache.get_track(track_id)
+            if cached is not None:
+                return cached
+
+        try:
+            html = await self._fetch(self.track_url(track_id), semaphore)
+        except requests.RequestException:
+            stale = self._stale("get_track", track_id)
+            if stale is None:
+                raise
+            return stale
+
+        lyrics = parse_track_lyrics(html, backend=self.parser)
+        if self.cache is not None:
+            self.cache.put_track(track_id, lyrics)
+        return lyrics
+
+    def _stale(self, getter: str, *args):
+        # cache 가 없을 수도 있으니 메서드는 이름으로 받아서 여기서 꺼낸다.
+        if self.cache is None:
+            return None
+        return getattr(self.cache, getter)(*args, allow_stale=True)
+
+    async def search_with_lyrics(self, query: str, limit: int = 8) -> list[dict]:
+        """
+        검색 후 결과 곡들의 가사를 동시에 받아서 각 결과에 "lyrics" 로 붙인다.
+        가사 요청 하나가 실패해도 검색 결과는 그대로 돌려주고, 그 곡의 lyrics 는 None.
+        """
+        results = await self.search(query, limit=limit)
+
+        # Semaphore 는 만들어진 이벤트 루프에 묶이므로 호출마다 새로 만든다.
+        semaphore = asyncio.Semaphore(self.concurrency)
+        lyrics = await asyncio.gather(
+            *(self.track_lyrics(r["track_id"], semaphore) for r in results),
+            return_exceptions=True,
+        )
+
+        for r, text in zip(results, lyrics):
+            r["lyrics"] = None if isinstance(text, Exception) else text
+
+        return results
@@ -0,0 +1,163 @@
+"""
+bugs.co.kr 페이지에서 필요한 노드만 뽑는 추출 백엔드
+
+- "bs4"  : 기존 방식. 페이지 전체를 BeautifulSoup(html.parser) 트리로 만든다.
+- "lxml" : 검색 결과는 lxml(C 파서)로 파싱해 XPath 로 행만 읽고,
+           곡 페이지는 lyricsContainer 안의 <xmp> 내용만 잘라서 그 조각만 파싱한다.
+
+두 백엔드는 같은 결과를 돌려준다. (bench/bench_extract.py 에서 fixture 로 확인)
+lxml 은 python-pptx 의존성이라 보통 설치되어 있지만, 없으면 bs4 로 돌아간다.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover
+    lxml = None
+
+
+# ----------------------
+# bs4 (기존 방식)
+# ----------------------
+def _bs4_search_results(html: str, limit: int) -> list[dict]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    results = []
+
+    rows = soup.select('tr[rowtype="lyrics"]')
+
+    for row in rows:
+        if len(results) >= limit:
+            break
+
+        # track_id (진짜 곡 ID)
+        track_id = row.get("trackid", "").strip()
+
+        # 제목
+        title_a = row.select_one("a[title]")
+        title = title_a.get_text(" ", strip=True) if title_a else ""
+
+        # 아티스트
+        artist_a = row.select_one('a[href*="/artist/"]')
+        artist = artist_a.get_text(" ", strip=True) if artist_a else ""
+
+        if track_id and title:
+            results.append(
+                {
+                    "track_id": track_id,
+                    "title": title,
+                    "artist": artist,
+                }
+            )
+    return results
+
+
+def _bs4_track_lyrics(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+
+    # div.lyricsContainer 안에 xmp에 가사가 들어있는 구조
+    xmp = soup.select_one("div.lyricsContainer xmp")
+    if not xmp:
+        return ""
+
+    return xmp.get_text("\n", strip=True)
+
+
+# ----------------------
+# lxml
+# ----------------------
+_LYRICS_DIV_OPEN = re.compile(
+    r"""<div\b[^>]*\bclass\s*=\s*["'][^"']*\blyricsContainer\b""", re.IGNORECASE
+)
+_XMP_OPEN = re.compile(r"<xmp\b[^>]*>", re.IGNORECASE)
+_XMP_CLOSE = re.compile(r"</xmp\s*>", re.IGNORECASE)
+_DIV_TAG = re.compile(r"<(/?)div\b[^>]*>", re.IGNORECASE)
+
+
+def _joined_text(element, sep: str) -> str:
+    """BeautifulSoup get_text(sep, strip=True) 와 같은 규칙."""
+    return sep.join(t.strip() for t in element.itertext() if t.strip())
+
+
+def _lxml_search_results(html: str, limit: int) -> list[dict]:
+    doc = lxml.html.fromstring(html)
+
+    results = []
+
+    for row in doc.iterfind('.//tr[@rowtype="lyrics"]'):
+        if len(results) >= limit:
+            break
+
+        track_id = row.get("trackid", "").strip()
+
+        title_a = row.find(".//a[@title]")
+        title = _joined_text(title_a, " ") if title_a is not None else ""
+
+        artist_a = next(iter(row.xpath('.//a[contains(@href, "/artist/")]')), None)
+        artist = _joined_text(artist_a, " ") if artist_a is not None else ""
+
+        if track_id and title:
+            results.append(
+                {
+                    "track_id": track_id,
+                    "title": title,
+                    "artist": artist,
+                }
+            )
+    return results
+
+
+def _div_end(html: str, start: int) -> int:
+    """start 에서 열린 div 가 닫히는 위치. 안 닫히면 문서 끝 (html.parser 와 같이)"""
+    depth = 0
+    for m in _DIV_TAG.finditer(html, start):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return m.start()
+    return len(html)
+
+
+def _lxml_track_lyrics(html: str) -> str:
+    # 페이지 전체 대신 <div class="... lyricsContainer ..."> 안의 첫 <xmp> 안쪽만 파싱한다.
+    # libxml2 는 xmp 를 raw text 로 읽으므로, html.parser 처럼 엔티티와 태그를 풀기 위해
+    # 안쪽 문자열을 일반 HTML 조각으로 다시 파싱한다.
+    for m in _LYRICS_DIV_OPEN.finditer(html):
+        # div 밖(다음 div 등)의 xmp 는 bs4 의 "div.lyricsContainer xmp" 에 걸리지 않는다.
+        xmp_open = _XMP_OPEN.search(html, m.end(), _div_end(html, m.start()))
+        if xmp_open:
+            break
+    else:
+        return ""
+
+    # 닫는 태그가 없으면 html.parser 처럼 문서 끝까지가 xmp 안쪽이다.
+    xmp_close = _XMP_CLOSE.search(html, xmp_open.end())
+    end = xmp_close.start() if xmp_close else len(html)
+
+    inner = html[xmp_open.end() : end]
+    if not inner.strip():
+        return ""
+
+    fragment = lxml.html.fragment_fromstring(inner, create_parent="div")
+    return _joined_text(fragment, "\n")
+
+
+BACKENDS = {
+    "bs4": (_bs4_search_results, _bs4_track_lyrics),
+}
+if lxml is not None:
+    BACKENDS["lxml"] = (_lxml_search_results, _lxml_track_lyrics)
+
+DEFAULT_BACKEND = "lxml" if lxml is not None else "bs4"
+
+
+def parse_search_results(html: str, limit: int = 8, backend: str = DEFAULT_BACKEND):
+    """가사 검색 결과 페이지에서 track_id / title / artist 목록을 뽑는다."""
+    return BACKENDS[backend][0](html, limit)
+
+
+def parse_track_lyrics(html: str, backend: str = DEFAULT_BACKEND) -> str:
+    """곡 상세 페이지에서 가사를 뽑는다. 가사가 없으면 빈 문자열."""
+    return BACKENDS[backend][1](html)
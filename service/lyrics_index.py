@@ -0,0 +1,188 @@
+"""
+로컬 가사 전문 검색 인덱스
+
+source/lyrics.py 의 SONGS 와 bugs.co.kr 에서 받아 캐시해 둔 가사(LyricsCache)를 대상으로
+제목과 가사 줄을 한글 글자 bigram 으로 쪼갠 역색인을 만든다.
+띄어쓰기가 조금 달라도 ("창세전에" / "창세 전에") 찾을 수 있고, 네트워크 없이 몇 ms 안에 끝난다.
+
+문서 단위는 SONGS 는 (곡, 파트), 캐시 가사는 곡 하나.
+캐시에 새 가사가 들어오면 refresh_from_cache() 가 그 곡들만 추가로 색인한다.
+"""
+
+import textwrap
+import unicodedata
+from collections import defaultdict
+
+LIBRARY = "library"
+CACHE = "cache"
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text).lower()
+
+
+def _compact(text: str) -> str:
+    """공백을 모두 뺀 비교용 문자열"""
+    return "".join(_normalize(text).split())
+
+
+def tokenize(text: str) -> set[str]:
+    """
+    공백을 뺀 글자열의 bigram. 한 글자짜리 검색어는 그 글자 자체.
+    단어 경계를 넘는 bigram 도 넣어서 띄어쓰기 차이에 강하게 한다.
+    """
+    compact = _compact(text)
+    if len(compact) == 1:
+        return {compact}
+    return {compact[i : i + 2] for i in range(len(compact) - 1)}
+
+
+def _index_grams(text: str) -> set[str]:
+    """문서 쪽은 한 글자 검색어도 걸리도록 unigram 까지 넣는다."""
+    compact = _compact(text)
+    return set(compact) | {compact[i : i + 2] for i in range(len(compact) - 1)}
+
+
+class _Doc:
+    __slots__ = ("source", "key", "title", "artist", "part", "lines", "compact_lines", "lyrics")
+
+    def __init__(self, source, key, title, artist, part, lines, lyrics):
+        self.source = source
+        self.key = key
+        self.title = title
+        self.artist = artist
+        self.part = part
+        self.lines = lines
+        self.compact_lines = [_compact(l) for l in lines]
+        self.lyrics = lyrics
+
+
+class LyricsIndex:
+    def __init__(self):
+        self._docs: dict[int, _Doc] = {}
+        self._postings: dict[str, set[int]] = defaultdict(set)
+        self._doc_grams: dict[int, set[str]] = {}
+        self._doc_ids_by_key: dict[tuple, list[int]] = {}
+        self._next_doc_id = 0
+        self._cache_seq = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ----------------------
+    # 색인
+    # ----------------------
+    def _add_doc(self, doc: _Doc):
+        doc_id = self._next_doc_id
+        self._next_doc_id += 1
+
+        grams = _index_grams(doc.title)
+        for line in doc.lines:
+            grams |= _index_grams(line)
+
+        self._docs[doc_id] = doc
+        self._doc_grams[doc_id] = grams
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+
+        self._doc_ids_by_key.setdefault((doc.source, doc.key), []).append(doc_id)
+
+    def remove(self, source: str, key):
+        for doc_id in self._doc_ids_by_key.pop((source, key), []):
+            for gram in self._doc_grams.pop(doc_id):
+                postings = self._postings[gram]
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+            del self._docs[doc_id]
+
+    def add_song(self, key, song: dict):
+        """SONGS 형식의 곡 dict 하나를 파트별 문서로 색인한다."""
+        self.remove(LIBRARY, key)
+
+        title = song.get("title", "")
+        lyrics = song_lyrics_text(song)
+
+        for part, text in song["parts"].items():
+            lines = [l.strip() for l in text.splitlines() if l.strip()]
+            self._add_doc(_Doc(LIBRARY, key, title, "", part, lines, lyrics))
+
+    def add_track(self, track_id: str, lyrics: str, title: str = "", artist: str = ""):
+        self.remove(CACHE, track_id)
+
+        lines = [l.strip() for l in lyrics.splitlines() if l.strip()]
+        self._add_doc(_Doc(CACHE, track_id, title, artist, None, lines, lyrics))
+
+    def add_library(self, songs):
+        """SONGS 리스트 또는 SongLibrary. 라이브러리 곡은 id 를 키로 쓴다."""
+        for i, song in enumerate(songs):
+            self.add_song(song.get("id", i), song)
+
+    def refresh_from_cache(self, cache) -> int:
+        """LyricsCache 에 마지막 refresh 이후 들어온 가사만 색인한다. 색인한 곡 수를 돌려준다."""
+        rows = cache.iter_tracks_since(self._cache_seq)
+        for seq, track_id, lyrics, title, artist in rows:
+            self.add_track(track_id, lyrics, title, artist)
+            self._cache_seq = seq
+        return len(rows)
+
+    # ----------------------
+    # 검색
+    # ----------------------
+    def search(self, query: str, limit: int = 8) -> list[dict]:
+        """
+        검색어 bigram 이 모두 들어 있는 문서를 찾고,
+        검색어(공백 무시)가 그대로 들어 있는 줄/제목이 있는 문서를 앞에 둔다.
+        같은 곡의 여러 파트가 걸리면 가장 잘 맞는 파트 하나만 돌려준다.
+        exact 는 검색어가 그대로 들어 있는 줄/제목이 있는지. (False 면 bigram 만 겹친 비슷한 곡)
+        """
+        grams = tokenize(query)
+        needle = _compact(query)
+        if not grams:
+            return []
+
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates &= p
+            if not candidates:
+                return []
+
+        scored = {}
+        for doc_id in candidates:
+            doc = self._docs[doc_id]
+
+            line_idx = next(
+                (i for i, c in enumerate(doc.compact_lines) if needle in c), None
+            )
+            in_title = needle in _compact(doc.title)
+            score = (line_idx is not None or in_title, in_title, -doc_id)
+
+            best = scored.get((doc.source, doc.key))
+            if best is None or score > best[0]:
+                scored[(doc.source, doc.key)] = (score, doc, line_idx)
+
+        ranked = sorted(scored.values(), key=lambda x: x[0], reverse=True)
+
+        results = []
+        for score, doc, line_idx in ranked[:limit]:
+            results.append(
+                {
+                    "source": doc.source,
+                    "key": doc.key,
+                    "title": doc.title,
+                    "artist": doc.artist,
+                    "part": doc.part,
+                    "line": doc.lines[line_idx] if line_idx is not None else "",
+                    "lyrics": doc.lyrics,
+                    "exact": score[0],
+                }
+            )
+        return results
+
+
+def song_lyrics_text(song: dict) -> str:
+    """SONGS 형식 곡의 파트 가사를 들여쓰기를 걷어내고 빈 줄로 이어 붙인다."""
+    return "\n\n".join(
+        textwrap.dedent(text).strip() for text in song["parts"].values()
+    )
@@ -0,0 +1,77 @@
+"""
+곡 단위 병렬 렌더링
+
+곡끼리는 공유하는 상태가 없으므로 ProcessPoolExecutor 워커가 곡 하나의 슬라이드 XML 조각을
+독립적으로 만들고, 부모 프로세스가 song_list 순서대로 받아서 덱에 붙인다.
+슬라이드 파트 이름, 관계 id, 슬라이드 id 는 붙이는 쪽(TemplateRenderer / StreamingDeckWriter)이
+순서대로 매기므로 순차 렌더링과 같은 덱이 나온다.
+
+한꺼번에 잡아 두는 곡은 jobs * 2 개까지. 앞 곡을 내보내야 다음 곡을 워커에 넘기므로
+stream=True 와 같이 쓰면 곡 수와 상관없이 메모리가 일정하다.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pptx.opc.oxml import serialize_part_xml
+
+from service.slide_cache import render_style, song_cache_key
+from service.slide_template import SlideTemplates, iter_song_slides
+
+# 워커 프로세스마다 한 번만 만드는 프로토타입
+_templates = None
+
+
+def _init_worker(slide_width, slide_height):
+    global _templates
+    _templates = SlideTemplates(slide_width, slide_height)
+
+
+def _render_song(song: dict) -> list[bytes]:
+    return [serialize_part_xml(sld) for sld in iter_song_slides(_templates, song)]
+
+
+def iter_song_fragments(
+    song_list, slide_width, slide_height, jobs: int | None = None, cache=None
+):
+    """
+    song_list 순서대로 곡별 슬라이드 XML 조각 목록을 내보낸다.
+    cache(SongSlideCache) 에 있는 곡은 워커로 보내지 않는다.
+    song_list 는 제너레이터여도 된다. (앞에서부터 window 곡만 읽어 둔다)
+    """
+    style = render_style(slide_width, slide_height)
+    window = 2 * (jobs or os.cpu_count() or 1)
+
+    def finish(entry):
+        key, fragments, future = entry
+        if future is not None:
+            fragments = future.result()
+            if cache is not None:
+                cache.put(key, fragments)
+        return fragments
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(slide_width, slide_height),
+    ) as executor:
+        pending = deque()
+
+        for song in song_list:
+            if len(pending) >= window:
+                yield finish(pending.popleft())
+
+            if cache is not None:
+                key = song_cache_key(song, style)
+                fragments = cache.get(key)
+                if fragments is not None:
+                    pending.append((None, fragments, None))
+                    continue
+            else:
+                key = None
+
+            pending.append((key, None, executor.submit(_render_song, song)))
+
+        while pending:
+            yield finish(pending.popleft())
@@ -0,0 +1,229 @@
+"""
+Presentation 객체 그래프를 메모리에 쌓지 않고 슬라이드 파트를 zip 에 바로 쓰는 스트리밍 PPTX writer
+
+곡마다 iter_song_slides 로 만든 슬라이드 XML 을 곧바로 ppt/slides/slideN.xml 로 쓰고 버린다.
+presentation.xml, 그 관계 파일, [Content_Types].xml 은 슬라이드 목록이 다 정해진 마지막에 쓴다.
+메모리에는 슬라이드 개수와 zip 목차 항목(파트당 수백 바이트)만 남아서
+곡이 몇 개든 peak 메모리가 거의 일정하다.
+
+경로로 쓰면 같은 폴더의 임시 파일에 쓰다가 다 쓰면 바꿔 끼운다.
+중간에 예외가 나면 임시 파일만 지워서, 잘린(그런데 열리는 것처럼 보이는) .pptx 가 남지 않는다.
+"""
+
+import os
+import stat
+import tempfile
+import zipfile
+from pathlib import Path
+
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.package import Part
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml import parse_xml
+from pptx.opc.oxml import serialize_part_xml
+from pptx.parts.slide import SlidePart
+
+from service.parallel_render import iter_song_fragments
+from service.slide_template import SlideTemplates, iter_song_slides
+
+
+class _ChunkSink:
+    """
+    zipfile 이 쓰는 바이트를 모아뒀다가 take() 로 꺼내가는 쓰기 전용 스트림.
+    tell/seek 이 없어서 zipfile 은 data descriptor 방식(비 seekable)으로 쓴다.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class StreamingDeckWriter:
+    """
+    with StreamingDeckWriter(path_or_file) as writer:
+        for song in song_list:
+            writer.write_song(song)
+    """
+
+    def __init__(self, file, templates: SlideTemplates | None = None):
+        """
+        templates 를 주면 프로토타입을 새로 그리지 않고 그걸 쓴다.
+        (여러 덱을 연달아 만들 때 덱마다 다시 그리지 않도록. 슬라이드 크기는 기본 Presentation 과 같아야 한다)
+        """
+        self._prs = Presentation()
+        self.slide_width = self._prs.slide_width
+        self.slide_height = self._prs.slide_height
+        if templates is None:
+            templates = SlideTemplates(self.slide_width, self.slide_height)
+        self._templates = templates
+
+        self._slide_count = 0
+
+        # 모든 슬라이드가 같은 레이아웃(6번)을 쓰므로 관계 파일은 한 번만 만든다.
+        probe = SlidePart(
+            PackURI("/ppt/slides/slide1.xml"), CT.PML_SLIDE, self._prs.part.package, None
+        )
+        probe.relate_to(self._prs.slide_layouts[6].part, RT.SLIDE_LAYOUT)
+        self._slide_rels_xml = probe.rels.xml
+
+        self._base_parts = [
+            part
+            for part in self._prs.part.package.iter_parts()
+            if part is not self._prs.part
+        ]
+
+        self._path = self._tmp = None
+        if isinstance(file, (str, os.PathLike)):
+            self._path = Path(file)
+            fd, self._tmp = tempfile.mkstemp(
+                dir=self._path.parent, prefix=f"{self._path.name}.", suffix=".tmp"
+            )
+            # mkstemp 는 0600 으로 만든다. 덮어쓰는 파일이 있으면 그 권한을 따른다.
+            mode = stat.S_IMODE(self._path.stat().st_mode) if self._path.exists() else 0o644
+            os.chmod(self._tmp, mode)
+            file = os.fdopen(fd, "wb")
+        self._file = file
+
+        try:
+            self._zip = zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED)
+            for part in self._base_parts:
+                self._write_part(part)
+        except BaseException:
+            self.abort()
+            raise
+
+    @property
+    def slide_count(self) -> int:
+        return self._slide_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def abort(self):
+        """다 쓰지 못했을 때. 경로로 쓰던 중이면 임시 파일을 지우고 기존 파일은 그대로 둔다."""
+        try:
+            if hasattr(self, "_zip"):
+                self._zip.close()
+        finally:
+            if self._tmp is not None:
+                self._file.close()
+                Path(self._tmp).unlink(missing_ok=True)
+                self._tmp = None
+
+    def _write_part(self, part):
+        self._zip.writestr(part.partname.membername, part.blob)
+        if part._rels:
+            self._zip.writestr(part.partname.rels_uri.membername, part.rels.xml)
+
+    def add_slide_xml(self, blob: bytes):
+        self._slide_count += 1
+        partname = PackURI(f"/ppt/slides/slide{self._slide_count}.xml")
+
+        self._zip.writestr(partname.membername, blob)
+        self._zip.writestr(partname.rels_uri.membername, self._slide_rels_xml)
+
+    def add_slide_element(self, sld):
+        self.add_slide_xml(serialize_part_xml(sld))
+
+    def write_song(self, song: dict, cache=None):
+        if cache is not None:
+            for blob in cache.song_fragments(self._templates, song):
+                self.add_slide_xml(blob)
+            return
+
+        for sld in iter_song_slides(self._templates, song):
+            self.add_slide_element(sld)
+
+    def close(self):
+        """presentation.xml / 관계 / content-types 를 마지막에 채워 넣고 zip 을 닫는다."""
+        try:
+            self._finish()
+        except BaseException:
+            self.abort()
+            raise
+
+        if self._tmp is not None:
+            self._file.close()
+            os.replace(self._tmp, self._path)
+            self._tmp = None
+
+    def _finish(self):
+        prs_part = self._prs.part
+        package = prs_part.package
+
+        # presentation.xml 은 원본을 건드리지 않도록 복사본에 sldIdLst 를 채운다.
+        prs_element = parse_xml(serialize_part_xml(prs_part._element))
+        sldIdLst = prs_element.get_or_add_sldIdLst()
+
+        slide_parts = []
+        for n in range(1, self._slide_count + 1):
+            slide_part = Part(PackURI(f"/ppt/slides/slide{n}.xml"), CT.PML_SLIDE, package)
+            rId = prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+            sldIdLst._add_sldId(id=255 + n, rId=rId)
+            slide_parts.append(slide_part)
+
+        self._zip.writestr(prs_part.partname.membername, serialize_part_xml(prs_element))
+        self._zip.writestr(prs_part.partname.rels_uri.membername, prs_part.rels.xml)
+        self._zip.writestr(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+
+        parts = [prs_part, *self._base_parts, *slide_parts]
+        self._zip.writestr(
+            CONTENT_TYPES_URI.membername,
+            serialize_part_xml(_ContentTypesItem.xml_for(parts)),
+        )
+        self._zip.close()
+
+
+def stream_deck(song_list, file, cache=None, jobs: int = 1):
+    """
+    ppt_save 의 스트리밍 버전. file 은 경로 또는 쓰기 가능한 바이너리 파일 객체.
+    jobs > 1 이면 곡 렌더링을 프로세스 풀에 나눠 맡긴다.
+    """
+    with StreamingDeckWriter(file) as writer:
+        if jobs > 1:
+            for fragments in iter_song_fragments(
+                song_list, writer.slide_width, writer.slide_height, jobs=jobs, cache=cache
+            ):
+                for blob in fragments:
+                    writer.add_slide_xml(blob)
+            return
+
+        for song in song_list:
+            writer.write_song(song, cache=cache)
+
+
+def iter_deck_chunks(song_list, cache=None):
+    """
+    완성된 zip 바이트를 곡 단위 청크로 내보내는 제너레이터.
+    청크를 이어 붙이면 그대로 .pptx 파일이 된다. (비 seekable 이라 data descriptor 형식)
+    """
+    sink = _ChunkSink()
+    writer = StreamingDeckWriter(sink)
+
+    yield sink.take()
+
+    for song in song_list:
+        writer.write_song(song, cache=cache)
+        yield sink.take()
+
+    writer.close()
+    yield sink.take()
@@ -0,0 +1,94 @@
+"""
+확신이 서면 일찍 멈추는 키 분석
+
+key_find_algorithm 은 잘라낸 신호 전체(최대 180초)의 chroma 를 계산한다.
+여기서는 앞부분 first_seconds 부터 분석 구간을 growth 배씩 늘려 가면서
+매번 1위 / 2위 후보 상관계수 차이(margin)를 보고, min_margin 을 넘으면 거기서 멈춘다.
+
+- 구간은 세그먼트(segment_seconds) 경계에 맞춰 늘리고, 새로 늘어난 세그먼트만 CQT 를 돌린다.
+- 점수는 지금까지 본 세그먼트 평균들의 평균이라서, 끝까지 가면 key_find_algorithm 과 같은 정의다.
+"""
+
+import math
+
+import numpy as np
+
+from service import chroma_engine
+from service.ffmpeg_function import (
+    build_ranked_results,
+    preprocess_audio,
+    select_key,
+)
+from service.key_scoring import get_scorer
+
+DEFAULT_MIN_MARGIN = 0.1
+
+
+def progressive_key_find(
+    y: np.ndarray,
+    sr: int,
+    segment_seconds: float = 10.0,
+    first_seconds: float = 20.0,
+    growth: float = 2.0,
+    min_margin: float = DEFAULT_MIN_MARGIN,
+    hop_length: int = 512,
+    tuning: float | None = None,
+    trim: bool = True,
+):
+    """
+    key_find_algorithm 과 같은 dict 에 더해
+    "seconds_used" (실제로 분석한 길이), "stopped_early", "margin" (멈췄을 때 1, 2위 차이),
+    "windows" ([(초, margin), ...] 구간별 기록) 를 돌려준다.
+    """
+    y = preprocess_audio(y, sr, trim=trim)
+    y, seg_len, num_segments = chroma_engine.segment_layout(y, sr, segment_seconds)
+
+    if tuning is None:
+        head = y[: min(len(y), int(sr * max(first_seconds, segment_seconds)))]
+        tuning = chroma_engine.estimate_tuning(head, sr, hop_length=hop_length)
+
+    scorer = get_scorer()
+    means = []
+    windows = []
+    done = 0
+    target = max(1, round(first_seconds / segment_seconds))
+
+    while True:
+        target = min(target, num_segments)
+        means.append(
+            chroma_engine.segment_chroma_range(
+                y, sr, seg_len, done, target, hop_length=hop_length, tuning=tuning
+            )
+        )
+        done = target
+
+        chroma_vec = np.vstack(means).mean(axis=0)
+        norm = np.linalg.norm(chroma_vec)
+        if norm < 1e-12:
+            raise ValueError("Chroma vector is near zero")
+        chroma_vec = chroma_vec / norm
+
+        scores = scorer.correlations(chroma_vec)
+        top2 = np.sort(scores)[-2:]
+        margin = float(top2[1] - top2[0])
+
+        seconds_used = min(len(y), done * seg_len) / sr
+        windows.append((seconds_used, margin))
+
+        if margin >= min_margin or done >= num_segments:
+            break
+        target = max(done + 1, math.ceil(done * growth))
+
+    major_scores, minor_scores = scores[:12], scores[12:]
+
+    return {
+        "primary_key": select_key(major_scores, minor_scores),
+        "ranked_candidates": build_ranked_results(major_scores, minor_scores),
+        "major_scores": major_scores,
+        "minor_scores": minor_scores,
+        "chroma_vector": chroma_vec,
+        "seconds_used": seconds_used,
+        "stopped_early": done < num_segments,
+        "margin": margin,
+        "windows": windows,
+    }
@@ -0,0 +1,329 @@
+"""
+세트리스트 텍스트 형식 + 곡 단위 증분 파서
+
+PPT 생성기 페이지는 텍스트 영역 전체를 rerun(키 입력)마다 ast.literal_eval 로 다시 읽었고,
+곡 하나에 오타가 있으면 리스트 전체가 버려졌다. 여기서는 줄 단위 형식을 쓴다.
+
+    = 그리스도 안에서
+    form: (4)(1)AB(4)ABBCBB(기도)
+
+    [A]
+    창세 전에 그리스도 안에서
+    사랑으로 우리를 택하시고
+
+    주님의 그 사랑 안에서
+    ...
+
+    [B]
+    ...
+
+    = 다음 곡 제목
+    ...
+
+- "= 제목" 줄이 곡 하나를 시작한다. 곡 블록은 다음 "= " 줄 전까지.
+  "=" 뒤에 공백이 있거나 "=" 만 있는 줄이 제목 줄이다. ("=주님" 처럼 붙은 줄은 가사)
+- "form:" (또는 "송폼:") 줄이 송폼, "[A]" / "[B1]" 처럼 대괄호만 있는 줄이 파트 시작.
+- 파트 안의 가사는 그대로 둔다. (빈 줄 / // 로 슬라이드를 나누는 규칙은 split_part 와 같다)
+
+곡 블록 텍스트 → 곡 dict 는 lru_cache 로 기억해서, 텍스트가 바뀌어도 바뀐 블록만 다시 파싱한다.
+오류는 곡마다 줄 번호와 같이 모으고, 오류가 없는 곡은 그대로 쓴다.
+송폼에는 있는데 가사가 없는 파트는 경고만 하고 곡은 쓴다. (그 파트는 렌더링에서 건너뛴다)
+결과 dict 는 render_song / plan_song 이 쓰는 {"title", "parts", "song_form"} 모양이다.
+
+예전 형식(list 리터럴)을 붙여넣으면 그대로 읽는다. (증분 파싱은 안 되지만 곡 단위 오류 보고는 같다)
+"""
+
+import ast
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from service.song_form import SongFormError, compile_song_form
+
+_TITLE = re.compile(r"^=(?:[ \t]+(.*?))?\s*$")
+_FORM = re.compile(r"^(?:form|송폼)\s*:\s*(.*?)\s*$", re.IGNORECASE)
+_PART = re.compile(r"^\[\s*([A-Z][0-9]*)\s*\]\s*$")
+_BLOCK_START = re.compile(r"^=(?:[ \t]|$)", re.MULTILINE)
+
+
+class SetlistError(ValueError):
+    """세트리스트를 읽을 수 없거나 곡 형식이 잘못됨"""
+
+
+@dataclass(frozen=True)
+class SetlistIssue:
+    line: int  # 1부터 세는 줄 번호 (텍스트 전체 기준)
+    song: int | None  # 몇 번째 곡인지 (0부터). 곡 블록 밖이면 None
+    title: str | None
+    message: str
+
+    def __str__(self):
+        where = f"{self.line}번째 줄"
+        if self.song is not None:
+            where += f" ({self.song + 1}번째 곡 {self.title or '(제목 없음)'})"
+        return f"{where}: {self.message}"
+
+
+@dataclass
+class Setlist:
+    songs: list[dict] = field(default_factory=list)  # 오류 없는 곡만, 입력 순서대로
+    issues: list[SetlistIssue] = field(default_factory=list)
+    warnings: list[SetlistIssue] = field(default_factory=list)  # 곡은 그대로 쓰는 문제
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+# ----------------------
+# 곡 블록
+# ----------------------
+def _form_issues(song: dict) -> list[str]:
+    """값의 타입 / 송폼 컴파일 오류. (줄 번호는 부르는 쪽에서 채운다)"""
+    title, parts, song_form = song["title"], song["parts"], song["song_form"]
+
+    if title is not None and not isinstance(title, str):
+        return ["title 은 문자열이어야 합니다."]
+    if not all(isinstance(k, str) and isinstance(v, str) for k, v in parts.items()):
+        return ["parts 의 이름과 가사는 문자열이어야 합니다."]
+    if not isinstance(song_form, str):
+        return ["song_form 은 문자열이어야 합니다."]
+
+    try:
+        compile_song_form(song_form)
+    except SongFormError as e:
+        return [f"송폼 오류 - {e}"]
+    return []
+
+
+def check_song(item) -> tuple[dict | None, list[str]]:
+    """
+    list 리터럴 / JSON / SONGS 모듈의 곡 하나 → (render_song 이 쓰는 모양의 곡 dict, []) 또는 (None, 오류 메시지)
+    세트리스트 텍스트, PPT 생성기 페이지, CLI, 곡 라이브러리가 모두 이 검사를 쓴다.
+    """
+    if not isinstance(item, dict) or not isinstance(item.get("parts"), dict):
+        return None, ["dict 형식의 곡이 아닙니다. (parts 필요)"]
+    if "song_form" not in item:
+        return None, ["song_form 이 없습니다."]
+
+    song = {"title": item.get("title"), "parts": item["parts"], "song_form": item["song_form"]}
+    problems = _form_issues(song)
+    if problems:
+        return None, problems
+    return song, []
+
+
+def _missing_parts_warning(song: dict) -> str | None:
+    """송폼에는 있는데 가사가 없는 파트. 렌더링은 그 파트를 건너뛴다."""
+    plan = compile_song_form(song["song_form"]).plan
+    missing = sorted({t for t in plan if not t.startswith("(") and t not in song["parts"]})
+    if missing:
+        return f"송폼에 있는 파트의 가사가 없어서 건너뜁니다: {', '.join(missing)}"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_block(block: str):
+    """
+    "= 제목" 으로 시작하는 곡 블록 하나
+    → (곡 dict 또는 None, 오류 ((블록 안 줄 번호, 메시지), ...), 경고 (같은 모양))
+    줄 번호는 0부터. 같은 텍스트의 블록은 한 번만 파싱한다.
+    """
+    lines = block.split("\n")
+    title = _TITLE.match(lines[0]).group(1) or None  # "=" 만 있으면 제목 슬라이드 없는 곡
+
+    issues = []
+
+    song_form = None
+    form_line = 0
+    parts = {}
+    current = None  # (이름, 줄 목록)
+
+    for n, line in enumerate(lines[1:], start=1):
+        m = _PART.match(line)
+        if m:
+            name = m.group(1)
+            if name in parts:
+                issues.append((n, f"[{name}] 파트가 두 번 나옵니다."))
+            current = parts[name] = []
+            continue
+
+        if current is None:
+            if not line.strip():
+                continue
+
+            m = _FORM.match(line)
+            if m and song_form is None:
+                song_form, form_line = m.group(1), n
+            elif m:
+                issues.append((n, "송폼이 두 번 나옵니다."))
+            else:
+                issues.append((n, f"파트([A] 같은 줄) 앞에 가사가 있습니다: {line.strip()[:20]}"))
+            continue
+
+        current.append(line)
+
+    if song_form is None:
+        issues.append((0, "송폼(form: ...) 줄이 없습니다."))
+
+    if issues:
+        return None, tuple(issues), ()
+
+    song = {
+        "title": title,
+        "parts": {name: "\n".join(body).strip("\n") for name, body in parts.items()},
+        "song_form": song_form,
+    }
+    issues = [(form_line, message) for message in _form_issues(song)]
+    if issues:
+        return None, tuple(issues), ()
+
+    warning = _missing_parts_warning(song)
+    return song, (), ((form_line, warning),) if warning else ()
+
+
+def iter_blocks(text: str):
+    """(시작 줄 번호(0부터), 블록 텍스트) 를 내보낸다. 첫 "= " 줄 앞부분도 블록 하나로 (제목 없음)."""
+    starts = [m.start() for m in _BLOCK_START.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+
+    line = 0
+    for start, end in zip(starts, starts[1:] + [len(text) + 1]):
+        block = text[start : end - 1]
+        yield line, block
+        line += block.count("\n") + 1
+
+
+# ----------------------
+# 예전 형식 (list 리터럴)
+# ----------------------
+def _parse_literal(text: str) -> Setlist:
+    """list 리터럴을 곡(원소)마다 따로 literal_eval 해서, 잘못된 곡만 빼고 나머지는 쓴다."""
+    result = Setlist()
+    offset = text[: len(text) - len(text.lstrip())].count("\n")
+
+    try:
+        tree = ast.parse(text.strip(), mode="eval").body
+    except SyntaxError as e:
+        line = offset + (e.lineno or 1)
+        result.issues.append(SetlistIssue(line, None, None, f"파싱 실패: {e.msg}"))
+        return result
+
+    if not isinstance(tree, ast.List):
+        result.issues.append(SetlistIssue(offset + 1, None, None, "list 형식이 아닙니다."))
+        return result
+
+    for i, node in enumerate(tree.elts):
+        line = offset + node.lineno
+        try:
+            item = ast.literal_eval(node)
+        except (ValueError, TypeError) as e:
+            # TypeError: {[1]: 2} 처럼 해시가 안 되는 키
+            result.issues.append(SetlistIssue(line, i, None, f"리터럴이 아닙니다: {e}"))
+            continue
+
+        title = item.get("title") if isinstance(item, dict) else None
+        title = title if isinstance(title, str) else None
+        song, problems = check_song(item)
+        if problems:
+            result.issues.extend(SetlistIssue(line, i, title, m) for m in problems)
+            continue
+
+        warning = _missing_parts_warning(song)
+        if warning:
+            result.warnings.append(SetlistIssue(line, i, title, warning))
+        result.songs.append(song)
+
+    return result
+
+
+# ----------------------
+# 공개 API
+# ----------------------
+def is_literal(text: str) -> bool:
+    """예전 형식인지: 첫 글자가 "[" 인데 파트 헤더 줄이 아니면 list 리터럴로 본다."""
+    stripped = text.lstrip()
+    first_line = stripped.split("\n", 1)[0]
+    return stripped.startswith("[") and not _PART.match(first_line)
+
+
+def parse_setlist(text: str) -> Setlist:
+    """
+    세트리스트 텍스트 → Setlist(songs, issues).
+    곡 dict 는 캐시에 있는 객체를 그대로 돌려주므로 고쳐 쓰지 말 것.
+    """
+    if is_literal(text):
+        return _parse_literal(text)
+
+    result = Setlist()
+    index = 0
+
+    for start, block in iter_blocks(text):
+        if not _BLOCK_START.match(block):
+            # 첫 곡 앞부분은 비어 있어야 한다.
+            for n, line in enumerate(block.split("\n")):
+                if line.strip():
+                    result.issues.append(
+                        SetlistIssue(start + n + 1, None, None, "곡은 '= 제목' 줄로 시작해야 합니다.")
+                    )
+                    break
+            continue
+
+        song, issues, warnings = _parse_block(block)
+        title = _TITLE.match(block.split("\n", 1)[0]).group(1) or None
+        if song is not None:
+            result.songs.append(song)
+        else:
+            result.issues.extend(
+                SetlistIssue(start + n + 1, index, title, message) for n, message in issues
+            )
+        result.warnings.extend(
+            SetlistIssue(start + n + 1, index, title, message) for n, message in warnings
+        )
+        index += 1
+
+    return result
+
+
+def load_setlist(text: str) -> list[dict]:
+    """오류가 하나라도 있으면 모아서 SetlistError. (CLI 처럼 덱 전체가 맞아야 하는 곳에서)"""
+    result = parse_setlist(text)
+    if result.issues:
+        raise SetlistError("\n".join(str(issue) for issue in result.issues))
+    return result.songs
+
+
+def validate_songs(song_list, where: str = "") -> list[dict]:
+    """
+    JSON / SONGS 모듈에서 읽은 곡 목록을 check_song 으로 검사한다. (CLI, 곡 라이브러리 가져오기)
+    오류가 하나라도 있으면 몇 번째 곡인지와 같이 모아서 SetlistError, 없으면 검사한 곡 dict 목록.
+    """
+    prefix = f"{where}: " if where else ""
+    if not isinstance(song_list, list):
+        raise SetlistError(f"{prefix}list 형식이 아닙니다.")
+
+    songs, problems = [], []
+    for i, item in enumerate(song_list):
+        song, issues = check_song(item)
+        if song is not None:
+            songs.append(song)
+        problems.extend(f"{prefix}{i + 1}번째 곡: {message}" for message in issues)
+
+    if problems:
+        raise SetlistError("\n".join(problems))
+    return songs
+
+
+def format_song(song: dict) -> str:
+    """곡 dict → 세트리스트 블록 텍스트. (파트 가사의 들여쓰기는 줄마다 걷어낸다)"""
+    out = [f"= {song.get('title') or ''}".rstrip(), f"form: {song['song_form']}"]
+    for name, text in song["parts"].items():
+        body = [line.strip() for line in text.strip("\n").split("\n")]
+        out += ["", f"[{name}]", *body]
+    return "\n".join(out)
+
+
+def format_setlist(song_list) -> str:
+    """list 리터럴 / SONGS 를 세트리스트 형식으로 옮길 때"""
+    return "\n\n".join(format_song(song) for song in song_list) + "\n"
@@ -0,0 +1,139 @@
+"""
+곡 단위 렌더링 결과 캐시
+
+곡 dict 의 title / parts / song_form 과 렌더링 스타일을 해시해서 키로 쓰고,
+그 곡의 슬라이드 XML 조각들을 디스크에 저장한다.
+PPT 를 다시 만들 때 바뀐 곡만 렌더링하고 나머지는 저장된 조각을 그대로 끼워 넣는다.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from pptx.opc.oxml import serialize_part_xml
+
+from service.slide_template import iter_song_slides
+from service.text_fit import font_id
+
+# add_*_slide 의 폰트, 색, 박스 크기 등을 바꾸면 올려서 기존 캐시를 무효화한다.
+# 2: 가사 글자 크기 / 줄바꿈을 text_fit 으로 맞춤
+# 3: 송폼 컴파일러 - "(x2)" 가 쉬는 슬라이드가 아니라 반복으로 바뀜
+STYLE_VERSION = 3
+
+# XML 에는 NUL 이 들어갈 수 없으므로 조각 구분자로 쓴다.
+_SEPARATOR = b"\0"
+
+
+def render_style(slide_width, slide_height) -> dict:
+    return {
+        "version": STYLE_VERSION,
+        "slide_width": int(slide_width),
+        "slide_height": int(slide_height),
+        # 줄 폭을 잰 폰트 (fonts/lyrics.ttf 를 바꾸면 줄바꿈도 바뀐다)
+        "font": font_id(),
+    }
+
+
+def song_cache_key(song: dict, style: dict) -> str:
+    payload = {
+        "title": song.get("title"),
+        "parts": song["parts"],
+        "song_form": song["song_form"],
+        "style": style,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SongSlideCache:
+    """
+    키 하나당 파일 하나(<key>.slides). 파일 mtime 을 최근 사용 시각으로 써서
+    max_entries 를 넘으면 가장 오래 안 쓴 곡부터 지운다(LRU).
+    """
+
+    def __init__(self, cache_dir, max_entries: int = 500):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.slides"
+
+    def get(self, key: str) -> list[bytes] | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # 읽은 뒤에 다른 프로세스가 지움. 읽은 내용은 그대로 쓴다.
+        self.hits += 1
+        return data.split(_SEPARATOR)
+
+    def put(self, key: str, fragments: list[bytes]):
+        """
+        CLI --jobs 워커들과 PPT 페이지가 같은 폴더를 쓰므로 쓰는 쪽마다 다른 임시 파일에 쓰고 바꿔 끼운다.
+        같은 키를 동시에 쓰면 마지막 것이 남는다. (내용은 같다) 저장에 실패하면 다음에 캐시 miss 일 뿐이다.
+        """
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_SEPARATOR.join(fragments))
+            os.replace(tmp, path)
+        except OSError:
+            return
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+        self._evict()
+
+    def _evict(self):
+        entries = list(self.cache_dir.glob("*.slides"))
+        if len(entries) <= self.max_entries:
+            return
+
+        mtimes = []
+        for path in entries:
+            try:
+                mtimes.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass  # 다른 프로세스가 먼저 지움
+
+        mtimes.sort()
+        for _, path in mtimes[: len(mtimes) - self.max_entries]:
+            path.unlink(missing_ok=True)
+
+    def song_fragments(self, templates, song: dict) -> list[bytes]:
+        """
+        곡 하나의 슬라이드 XML 조각 목록. 캐시에 있으면 그대로, 없으면 렌더링해서 저장한다.
+        """
+        style = render_style(templates.slide_width, templates.slide_height)
+        key = song_cache_key(song, style)
+
+        fragments = self.get(key)
+        if fragments is None:
+            fragments = [
+                serialize_part_xml(sld) for sld in iter_song_slides(templates, song)
+            ]
+            self.put(key, fragments)
+
+        return fragments
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
@@ -0,0 +1,100 @@
+"""
+슬라이드 플랜 (레이아웃과 pptx 출력 사이의 중간 표현)
+
+곡 하나를 "어떤 종류의 슬라이드에 어떤 줄이 들어가는지" 목록으로 한 번만 계산해 두고,
+pptx writer, 슬라이드 캐시, 미리보기 등 여러 출력이 같은 플랜을 쓴다.
+레코드는 __slots__ 라 가볍고, 값 비교/해시가 되므로 캐시 키나 diff 에 그대로 쓸 수 있다.
+"""
+
+import re
+from functools import lru_cache
+
+from service.song_form import compile_song_form
+
+TITLE = "title"
+LYRICS = "lyrics"
+EMPTY = "empty"
+
+# 곡 끝 여백 슬라이드 수
+TRAILING_EMPTY = 3
+
+
+class PlannedSlide:
+    """
+    kind       : TITLE / LYRICS / EMPTY
+    lines      : 슬라이드에 들어갈 줄 (strip 된 문자열 튜플)
+    part       : 이 슬라이드가 나온 송폼 토큰 (예: "A1", "(4)"). 제목/곡 끝 여백은 None
+    form_index : 펼친 송폼에서 몇 번째 토큰인지. 같은 파트가 두 번 나오면 구분된다.
+    """
+
+    __slots__ = ("kind", "lines", "part", "form_index")
+
+    def __init__(self, kind: str, lines: tuple = (), part=None, form_index=None):
+        self.kind = kind
+        self.lines = lines
+        self.part = part
+        self.form_index = form_index
+
+    def _key(self):
+        return (self.kind, self.lines, self.part, self.form_index)
+
+    def __eq__(self, other):
+        if not isinstance(other, PlannedSlide):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"PlannedSlide({self.kind!r}, {self.lines!r}, part={self.part!r}, form_index={self.form_index!r})"
+
+
+@lru_cache(maxsize=4096)
+def split_part(part_text: str) -> tuple:
+    """
+    파트 가사를 슬라이드별 줄 튜플로 나눈다.
+    빈 줄 또는 // 로 슬라이드를 나누고, 각 줄은 strip 해서 빈 줄은 버린다.
+    """
+    slides = []
+    for slide_text in re.split(r"\n\s*\n|//+", part_text):
+        lines = tuple(l.strip() for l in slide_text.split("\n") if l.strip())
+        if lines:
+            slides.append(lines)
+    return tuple(slides)
+
+
+def plan_song(song: dict) -> tuple:
+    """
+    render_song 과 같은 순서의 PlannedSlide 튜플.
+    곡 dict 는 해시가 안 되므로 내용으로 키를 만들어 같은 곡은 한 번만 계산한다.
+    """
+    parts = song["parts"]
+    return _plan_song(song.get("title"), tuple(parts.items()), song["song_form"])
+
+
+@lru_cache(maxsize=1024)
+def _plan_song(title, part_items: tuple, song_form: str) -> tuple:
+    parts = dict(part_items)
+    plan = []
+
+    if title:
+        plan.append(PlannedSlide(TITLE, (title,)))
+
+    for i, token in enumerate(compile_song_form(song_form).plan):
+        if token.startswith("("):
+            plan.append(PlannedSlide(EMPTY, (), token, i))
+            continue
+
+        text = parts.get(token, "").strip()
+        if not text:
+            continue
+
+        for lines in split_part(text):
+            plan.append(PlannedSlide(LYRICS, lines, token, i))
+
+    # 곡 끝 여백
+    for _ in range(TRAILING_EMPTY):
+        plan.append(PlannedSlide(EMPTY))
+
+    return tuple(plan)
@@ -0,0 +1,184 @@
+"""
+프로토타입 슬라이드 복제 방식의 렌더링 엔진
+
+render_song 은 슬라이드마다 python-pptx 프록시로 배경, 텍스트박스, 폰트를 하나씩 만든다.
+여기서는 슬라이드 종류(빈 / 제목 / N줄 가사)별 p:sld XML 을 기존 add_*_slide 로
+한 번만 만들어 두고, 그걸 deepcopy 해서 글자만 바꿔 끼운다.
+결과 XML 은 render_song 과 동일하다.
+"""
+
+import copy
+import re
+
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.parts.slide import SlidePart
+
+from service.function import (
+    LYRICS_BOX_HEIGHT,
+    LYRICS_BOX_WIDTH,
+    add_empty_slide,
+    add_lyrics_slide,
+    add_title_slide,
+)
+from service.slide_plan import LYRICS, TITLE, PlannedSlide, plan_song, split_part
+from service.text_fit import fit_lyrics
+
+_A_T = qn("a:t")
+
+# python-pptx 가 a:br 이나 _xHHHH_ 로 바꾸는 제어문자. 이런 글자는 기존 함수로 그대로 그린다.
+_CTRL_CHARS = re.compile(r"[\x00-\x1f]")
+
+_PLACEHOLDER = "x"
+
+
+class SlideTemplates:
+    """
+    슬라이드 종류별 프로토타입 p:sld 엘리먼트 모음.
+    프로토타입은 별도의 scratch Presentation 에 기존 함수로 그려서 만든다.
+    Presentation 과 무관한 엘리먼트만 돌려주므로 prs 에 붙이든 zip 에 바로 쓰든 상관없다.
+    """
+
+    def __init__(self, slide_width, slide_height):
+        self.slide_width = slide_width
+        self.slide_height = slide_height
+
+        self._scratch = Presentation()
+        self._scratch.slide_width = slide_width
+        self._scratch.slide_height = slide_height
+
+        self._empty = None
+        self._title = None
+        self._lyrics = {}
+
+    def _draw(self, add_fn, *args):
+        """scratch 에 기존 함수로 슬라이드를 그리고, 엘리먼트만 떼어낸 뒤 슬라이드는 지운다."""
+        add_fn(self._scratch, *args)
+
+        sldIdLst = self._scratch.part._element.sldIdLst
+        sldId = sldIdLst[-1]
+        sld = self._scratch.part.related_part(sldId.rId)._element
+
+        sldIdLst.remove(sldId)
+        self._scratch.part.drop_rel(sldId.rId)
+        return sld
+
+    def empty(self):
+        if self._empty is None:
+            self._empty = self._draw(add_empty_slide)
+        return copy.deepcopy(self._empty)
+
+    def title(self, title: str):
+        if _CTRL_CHARS.search(title):
+            return self._draw(add_title_slide, title)
+
+        if self._title is None:
+            self._title = self._draw(add_title_slide, _PLACEHOLDER)
+
+        sld = copy.deepcopy(self._title)
+        next(sld.iter(_A_T)).text = title
+        return sld
+
+    def lyrics(self, lines):
+        if any(_CTRL_CHARS.search(l) for l in lines):
+            return self._draw(add_lyrics_slide, "\n".join(lines))
+
+        # add_lyrics_slide 와 같은 크기 / 줄바꿈. 프로토타입은 (줄 수, 글자 크기)마다 하나.
+        size, lines = fit_lyrics(lines, min(LYRICS_BOX_WIDTH, self.slide_width), LYRICS_BOX_HEIGHT)
+        n = len(lines)
+        proto = self._lyrics.get((n, size))
+        if proto is None:
+            proto = self._lyrics[(n, size)] = self._draw(
+                add_lyrics_slide, "\n".join([_PLACEHOLDER] * n), size
+            )
+
+        sld = copy.deepcopy(proto)
+        for t, line in zip(sld.iter(_A_T), lines):
+            t.text = line
+        return sld
+
+    def slide(self, planned: PlannedSlide):
+        """슬라이드 플랜 레코드 하나를 p:sld 엘리먼트로."""
+        if planned.kind == LYRICS:
+            return self.lyrics(planned.lines)
+        if planned.kind == TITLE:
+            return self.title(planned.lines[0])
+        return self.empty()
+
+
+def iter_plan_slides(templates: SlideTemplates, plan):
+    """슬라이드 플랜을 순서대로 p:sld 엘리먼트로 만든다."""
+    for planned in plan:
+        yield templates.slide(planned)
+
+
+def iter_song_slides(templates: SlideTemplates, song: dict):
+    """render_song 과 같은 규칙으로 곡 하나의 p:sld 엘리먼트를 순서대로 만든다."""
+    return iter_plan_slides(templates, plan_song(song))
+
+
+class TemplateRenderer:
+    """
+    prs 하나에 붙어서 프로토타입을 찍어내는 렌더러.
+    render_song / render_part 와 같은 이름의 메서드로 같은 슬라이드를 만든다.
+    """
+
+    def __init__(self, prs):
+        self.prs = prs
+        self.templates = SlideTemplates(prs.slide_width, prs.slide_height)
+
+        self._prs_part = prs.part
+        self._layout_part = prs.slide_layouts[6].part
+        self._sldIdLst = prs.part._element.get_or_add_sldIdLst()
+        self._last_slide_id = self._sldIdLst._next_id - 1
+
+    def add_slide_element(self, sld):
+        """
+        p:sld 엘리먼트를 새 슬라이드 파트로 prs 끝에 붙인다.
+        새 슬라이드라 기존 관계를 찾을 필요가 없어서 relate_to / add_sldId 의
+        선형 탐색(슬라이드 수에 대해 O(n^2))을 건너뛴다.
+        """
+        partname = self._prs_part._next_slide_partname
+        slide_part = SlidePart(partname, CT.PML_SLIDE, self._prs_part.package, sld)
+        slide_part.relate_to(self._layout_part, RT.SLIDE_LAYOUT)
+
+        rId = self._prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+
+        # prs.slides.add_slide 등 다른 경로로 붙은 슬라이드가 끝에 있을 수 있으니 마지막 id 와 비교
+        if len(self._sldIdLst):
+            self._last_slide_id = max(self._last_slide_id, self._sldIdLst[-1].id)
+        self._last_slide_id += 1
+        self._sldIdLst._add_sldId(id=self._last_slide_id, rId=rId)
+
+    def add_slide_xml(self, blob: bytes):
+        """직렬화된 슬라이드 XML(캐시 등에서 온 것)을 새 슬라이드로 붙인다."""
+        self.add_slide_element(parse_xml(blob))
+
+    def add_empty_slide(self):
+        self.add_slide_element(self.templates.empty())
+
+    def add_title_slide(self, title: str):
+        self.add_slide_element(self.templates.title(title))
+
+    def add_lyrics_slide(self, slide_text: str):
+        lines = [l.strip() for l in slide_text.split("\n") if l.strip()]
+        if not lines:
+            add_lyrics_slide(self.prs, slide_text)
+            return
+        self.add_slide_element(self.templates.lyrics(lines))
+
+    def render_part(self, part_text: str):
+        for lines in split_part(part_text):
+            self.add_slide_element(self.templates.lyrics(lines))
+
+    def render_song(self, song: dict, cache=None):
+        """cache(SongSlideCache) 를 주면 바뀌지 않은 곡은 저장된 XML 을 그대로 붙인다."""
+        if cache is not None:
+            for blob in cache.song_fragments(self.templates, song):
+                self.add_slide_xml(blob)
+            return
+
+        for sld in iter_song_slides(self.templates, song):
+            self.add_slide_element(sld)
@@ -0,0 +1,264 @@
+"""
+송폼 컴파일러
+
+"(4)A1B(4)[AB]x2C(x2)" 같은 송폼 문자열을 토큰 → AST → 평탄한 렌더 플랜 순서로 바꾼다.
+
+문법
+    form    := item*
+    item    := atom repeat?
+    atom    := PART | PAUSE | "[" form "]"
+    repeat  := "x" N | "(x" N ")"
+    PART    := 대문자 + 숫자*        예) A, B1, C12
+    PAUSE   := "(" 글자들 ")"        예) (4), (기도)
+공백과 쉼표는 구분자로 무시한다.
+
+렌더 플랜은 기존 parse_song_form 과 같은 모양의 토큰 목록이다. ["(4)", "A1", "B", ...]
+같은 송폼 문자열은 프로세스 안에서 한 번만 컴파일한다.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+MAX_REPEAT = 99
+# 반복을 겹치면 ([[[Ax99]x99]x99]x99) 펼친 길이가 곱으로 늘어나므로 전체 길이도 막는다.
+MAX_PLAN_LENGTH = 1000
+
+_SEPARATORS = " \t\r\n,"
+_PART = re.compile(r"[A-Z][0-9]*")
+_REPEAT = re.compile(r"x([0-9]+)")
+_PAREN_REPEAT = re.compile(r"\(x([0-9]+)\)")
+
+
+class SongFormError(ValueError):
+    """송폼 문법 오류. position 은 0부터 세는 글자 위치."""
+
+    def __init__(self, message: str, song_form: str, position: int):
+        self.song_form = song_form
+        self.position = position
+        super().__init__(f"{position + 1}번째 글자: {message}")
+
+
+# ----------------------
+# Tokens
+# ----------------------
+@dataclass(frozen=True)
+class Token:
+    kind: str  # "part" | "pause" | "repeat" | "lbracket" | "rbracket"
+    value: str
+    position: int
+
+
+def tokenize(song_form: str) -> list[Token]:
+    tokens = []
+    i = 0
+    n = len(song_form)
+
+    while i < n:
+        ch = song_form[i]
+
+        if ch in _SEPARATORS:
+            i += 1
+            continue
+
+        if ch == "[":
+            tokens.append(Token("lbracket", ch, i))
+            i += 1
+            continue
+
+        if ch == "]":
+            tokens.append(Token("rbracket", ch, i))
+            i += 1
+            continue
+
+        m = _PART.match(song_form, i)
+        if m:
+            tokens.append(Token("part", m.group(), i))
+            i = m.end()
+            continue
+
+        m = _PAREN_REPEAT.match(song_form, i) or _REPEAT.match(song_form, i)
+        if m:
+            tokens.append(Token("repeat", m.group(1), i))
+            i = m.end()
+            continue
+
+        if ch == "(":
+            end = song_form.find(")", i + 1)
+            if end == -1:
+                raise SongFormError("괄호 '('가 닫히지 않았습니다.", song_form, i)
+
+            inner = song_form[i + 1 : end]
+            if not inner.strip() or "(" in inner:
+                raise SongFormError("괄호 안이 비어 있거나 잘못되었습니다.", song_form, i)
+
+            tokens.append(Token("pause", song_form[i : end + 1], i))
+            i = end + 1
+            continue
+
+        raise SongFormError(f"알 수 없는 문자 '{ch}'", song_form, i)
+
+    return tokens
+
+
+# ----------------------
+# AST
+# ----------------------
+@dataclass(frozen=True)
+class PartRef:
+    name: str
+    position: int
+
+
+@dataclass(frozen=True)
+class Pause:
+    label: str  # 괄호 포함 원문, 예) "(4)"
+    position: int
+
+
+@dataclass(frozen=True)
+class Repeat:
+    node: object
+    count: int
+    position: int
+
+
+@dataclass(frozen=True)
+class Group:
+    items: tuple
+    position: int
+
+
+class _Parser:
+    def __init__(self, song_form: str, tokens: list[Token]):
+        self.song_form = song_form
+        self.tokens = tokens
+        self.i = 0
+
+    def error(self, message: str, position: int):
+        return SongFormError(message, self.song_form, position)
+
+    def peek(self) -> Token | None:
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def parse_form(self, closing: bool = False) -> tuple:
+        items = []
+
+        while True:
+            tok = self.peek()
+            if tok is None:
+                return tuple(items)
+
+            if tok.kind == "rbracket":
+                if not closing:
+                    raise self.error("짝이 맞지 않는 ']'", tok.position)
+                return tuple(items)
+
+            if tok.kind == "repeat":
+                raise self.error("반복할 대상이 없습니다.", tok.position)
+
+            items.append(self.parse_item())
+
+    def parse_item(self):
+        node = self.parse_atom()
+
+        tok = self.peek()
+        while tok is not None and tok.kind == "repeat":
+            count = int(tok.value)
+            if not 1 <= count <= MAX_REPEAT:
+                raise self.error(f"반복 횟수는 1~{MAX_REPEAT} 사이여야 합니다.", tok.position)
+
+            node = Repeat(node, count, tok.position)
+            self.i += 1
+            tok = self.peek()
+
+        return node
+
+    def parse_atom(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+
+        if tok.kind == "part":
+            return PartRef(tok.value, tok.position)
+
+        if tok.kind == "pause":
+            return Pause(tok.value, tok.position)
+
+        # lbracket
+        items = self.parse_form(closing=True)
+        end = self.peek()
+        if end is None:
+            raise self.error("대괄호 '['가 닫히지 않았습니다.", tok.position)
+        if not items:
+            raise self.error("빈 그룹입니다.", tok.position)
+
+        self.i += 1
+        return Group(items, tok.position)
+
+
+def parse(song_form: str) -> tuple:
+    """송폼 문자열을 AST 노드 튜플로 파싱한다."""
+    return _Parser(song_form, tokenize(song_form)).parse_form()
+
+
+# ----------------------
+# Expansion
+# ----------------------
+def _check_length(song_form: str, nodes) -> None:
+    """펼치기 전에 플랜 길이를 세어 MAX_PLAN_LENGTH 를 넘으면 SongFormError"""
+
+    def size(node) -> int:
+        if isinstance(node, (PartRef, Pause)):
+            return 1
+        if isinstance(node, Repeat):
+            total = size(node.node) * node.count
+        else:
+            total = sum(size(item) for item in node.items)
+
+        if total > MAX_PLAN_LENGTH:
+            raise SongFormError(
+                f"펼친 송폼이 너무 깁니다. (최대 {MAX_PLAN_LENGTH}개)", song_form, node.position
+            )
+        return total
+
+    size(Group(tuple(nodes), 0))
+
+
+def expand(nodes) -> list[str]:
+    """AST 를 render_song / export_holiday 가 쓰는 평탄한 토큰 목록으로 펼친다."""
+    plan = []
+
+    def walk(node):
+        if isinstance(node, PartRef):
+            plan.append(node.name)
+        elif isinstance(node, Pause):
+            plan.append(node.label)
+        elif isinstance(node, Repeat):
+            for _ in range(node.count):
+                walk(node.node)
+        else:
+            for item in node.items:
+                walk(item)
+
+    for node in nodes:
+        walk(node)
+
+    return plan
+
+
+@dataclass(frozen=True)
+class CompiledSongForm:
+    source: str
+    ast: tuple
+    plan: tuple
+
+    @property
+    def part_names(self) -> frozenset:
+        return frozenset(t for t in self.plan if not t.startswith("("))
+
+
+@lru_cache(maxsize=1024)
+def compile_song_form(song_form: str) -> CompiledSongForm:
+    ast = parse(song_form)
+    _check_length(song_form, ast)
+    return CompiledSongForm(song_form, ast, tuple(expand(ast)))
@@ -0,0 +1,251 @@
+"""
+곡 라이브러리 (SQLite 파일 하나, 곡 단위로 필요할 때만 읽는다)
+
+source/lyrics.py 의 SONGS 는 import 하는 곳마다 리스트 전체를 평가해서 메모리에 들고 있다.
+곡이 수천 개가 되면 import 시간과 메모리가 곡 수에 비례해서 는다.
+SongLibrary 는 곡을 한 줄씩 저장해 두고
+- 제목 / id 로 찾으면 그 곡 한 줄만 읽어서 dict 로 풀고
+- 순회하면 몇십 곡씩 끊어 읽으면서 하나씩 내보낸다. (ppt_save / stream_deck / LyricsIndex 에 그대로 넘길 수 있다)
+
+songs 테이블
+    id, title, title_key(검색용 정규화 제목), song_form,
+    parts (zlib 압축 JSON), source(가져온 파일), position(그 파일 안 순서)
+
+source/lyrics.py 는 그대로 편집용 원본으로 두고, open_library() 가 파일 내용이 바뀌었을 때만
+그 파일에서 온 곡들을 다시 가져온다. (다른 파일에서 가져온 곡은 건드리지 않는다)
+SONGS 모듈은 import 하지 않고 ast 로 리터럴만 읽는다.
+
+    uv run python -m service.song_library source/lyrics.py setlists/*.setlist --db .cache/songs.sqlite3
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+
+from service.setlist_format import SetlistError, load_setlist, validate_songs
+
+DEFAULT_DB = ".cache/songs.sqlite3"
+DEFAULT_SOURCE = "source/lyrics.py"
+
+# 순회할 때 한 번에 읽는 곡 수
+_PAGE = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    id          INTEGER PRIMARY KEY,
+    title       TEXT NOT NULL,
+    title_key   TEXT NOT NULL,
+    song_form   TEXT NOT NULL,
+    parts       BLOB NOT NULL,
+    source      TEXT NOT NULL,
+    position    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_title_key ON songs (title_key);
+CREATE UNIQUE INDEX IF NOT EXISTS songs_order ON songs (source, position);
+CREATE TABLE IF NOT EXISTS sources (
+    path        TEXT PRIMARY KEY,
+    digest      TEXT NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+
+def normalize_title(title: str) -> str:
+    """NFC + 공백 제거 + 소문자. "말씀이 육신되어" 와 "말씀이육신되어" 를 같은 키로."""
+    return "".join(unicodedata.normalize("NFC", title or "").split()).lower()
+
+
+def read_songs_module(path) -> list[dict]:
+    """SONGS = [...] 가 있는 .py 파일에서 리터럴만 읽는다. (import / 실행하지 않는다)"""
+    path = Path(path)
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "SONGS" for t in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise SetlistError(f"{path}: SONGS = [...] 가 없습니다.")
+
+
+def read_song_file(path) -> list[dict]:
+    """라이브러리로 가져올 수 있는 파일: SONGS 모듈(.py), .json, 세트리스트 텍스트"""
+    path = Path(path)
+    if path.suffix == ".py":
+        songs = read_songs_module(path)
+    elif path.suffix == ".json":
+        songs = json.loads(path.read_text(encoding="utf-8"))
+    else:
+        return load_setlist(path.read_text(encoding="utf-8"))
+
+    return validate_songs(songs, where=str(path))
+
+
+def _pack_parts(parts: dict) -> bytes:
+    return zlib.compress(json.dumps(parts, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(row) -> dict:
+    song_id, title, song_form, parts = row
+    return {
+        "id": song_id,
+        "title": title,
+        "parts": json.loads(zlib.decompress(parts)),
+        "song_form": song_form,
+    }
+
+
+class SongLibrary:
+    """
+    library = SongLibrary(".cache/songs.sqlite3")
+    library.find("그리스도 안에서")     # 그 곡만 읽는다
+    for song in library: ...            # 몇십 곡씩 끊어 읽는다
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Streamlit rerun / 작업 스레드에서 같이 쓰므로 연결 하나를 락으로 보호한다. (LyricsCache 와 같음)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    # ----------------------
+    # 읽기
+    # ----------------------
+    def get(self, song_id: int) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, title, song_form, parts FROM songs WHERE id = ?", (song_id,)
+            ).fetchone()
+        return _unpack(row) if row is not None else None
+
+    def find(self, title: str) -> dict | None:
+        """제목(공백 / 대소문자 무시)으로 찾는다. 같은 제목이 여럿이면 먼저 가져온 곡."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT id, title, song_form, parts FROM songs
+                WHERE title_key = ? ORDER BY source, position LIMIT 1
+                """,
+                (normalize_title(title),),
+            ).fetchone()
+        return _unpack(row) if row is not None else None
+
+    def titles(self) -> list[tuple[int, str]]:
+        """[(id, 제목), ...] 가사는 읽지 않는다. (목록 / 선택 UI 용)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, title FROM songs ORDER BY source, position"
+            ).fetchall()
+
+    def __iter__(self):
+        """
+        라이브러리 순서(가져온 파일, 파일 안 순서)대로 곡 dict 를 하나씩.
+        _PAGE 곡씩 끊어 읽고, 락은 한 페이지를 읽는 동안만 잡는다.
+        """
+        last = ("", -1)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    """
+                    SELECT id, title, song_form, parts, source, position FROM songs
+                    WHERE (source, position) > (?, ?)
+                    ORDER BY source, position LIMIT ?
+                    """,
+                    (*last, _PAGE),
+                ).fetchall()
+
+            for row in rows:
+                yield _unpack(row[:4])
+            if len(rows) < _PAGE:
+                return
+            last = rows[-1][4:]
+
+    # ----------------------
+    # 가져오기
+    # ----------------------
+    def import_songs(self, source: str, songs, digest: str = "") -> int:
+        """source 에서 온 곡들을 통째로 바꿔 넣는다. (한 트랜잭션)"""
+        rows = [
+            (
+                song.get("title") or "",
+                normalize_title(song.get("title")),
+                song["song_form"],
+                _pack_parts(song["parts"]),
+                source,
+                position,
+            )
+            for position, song in enumerate(songs)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM songs WHERE source = ?", (source,))
+            self._conn.executemany(
+                """
+                INSERT INTO songs (title, title_key, song_form, parts, source, position)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (source, digest, time.time())
+            )
+        return len(rows)
+
+    def sync_file(self, path) -> bool:
+        """파일 내용이 지난번 가져올 때와 다르면 다시 가져온다. 가져왔으면 True."""
+        path = Path(path)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        source = path.as_posix()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM sources WHERE path = ?", (source,)
+            ).fetchone()
+        if row is not None and row[0] == digest:
+            return False
+
+        self.import_songs(source, read_song_file(path), digest)
+        return True
+
+
+def open_library(db_path=DEFAULT_DB, source=DEFAULT_SOURCE) -> SongLibrary:
+    """라이브러리를 열고, source(SONGS 모듈)가 바뀌었으면 그 곡들만 다시 가져온다."""
+    library = SongLibrary(db_path)
+    if source is not None and Path(source).exists():
+        library.sync_file(source)
+    return library
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SONGS 모듈 / 세트리스트를 곡 라이브러리로 변환")
+    parser.add_argument("inputs", nargs="+", help="SONGS 모듈(.py), .json, 세트리스트 파일")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    args = parser.parse_args(argv)
+
+    library = SongLibrary(args.db)
+    for path in args.inputs:
+        t0 = time.perf_counter()
+        imported = library.sync_file(path)
+        state = "가져옴" if imported else "변경 없음"
+        print(f"[TIME] {path}: {state} {time.perf_counter() - t0:.3f}s")
+    print(f"{args.db}: {len(library)}곡")
+
+
+if __name__ == "__main__":
+    main()
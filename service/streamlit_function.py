@@ -1,14 +1,17 @@
-from service.function import parse_song_form, render_song
+from service.function import parse_song_form
+from service.setlist_format import format_song
+from service.slide_template import TemplateRenderer
+from service.pptx_stream import stream_deck
+from service.parallel_render import iter_song_fragments
 from pptx import Presentation
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+from service.lyrics_client import LyricsClient
+from service.lyrics_cache import LyricsCache
+from service.lyrics_index import LyricsIndex
+from service.song_library import open_library
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import numpy as np
 import re
 import streamlit as st
-import requests
+import asyncio
 
 
 def load_css(path: str):
@@ -47,13 +50,15 @@ def collect_parts_from_session() -> dict[str, str]:
     return parts
 
 
-def export_holiday(song_form: str) -> str:
-    parts = collect_parts_from_session()
-
-    parsed = parse_song_form(song_form)
+def holiday_text(parts: dict[str, str], song_form: str) -> str:
+    """
+    송폼 순서대로 파트 가사를 이어 붙인 평문. 파트 사이에는 빈 줄.
+    파트 안의 줄은 그대로 두고 // 만 지운다. ("가 // 나" 는 한 줄로 이어진다)
+    슬라이드 플랜(줄 strip, // 를 슬라이드 나눔으로)과는 규칙이 달라서 따로 만든다.
+    """
     output_lines = []
 
-    for token in parsed:
+    for token in parse_song_form(song_form):
         if token.startswith("(") and token.endswith(")"):
             continue
 
@@ -62,7 +67,11 @@ def export_holiday(song_form: str) -> str:
             output_lines.append("")
 
     result = "\n".join(output_lines)
-    result = re.sub(r"//+", "", result).strip()
+    return re.sub(r"//+", "", result).strip()
+
+
+def export_holiday(song_form: str) -> str:
+    result = holiday_text(collect_parts_from_session(), song_form)
 
     formatted = f"""{st.session_state.get("song_title", "")}
 
@@ -76,28 +85,15 @@ def export_holiday(song_form: str) -> str:
 
 
 def export_retreat(song_form: str):
-    parts_dict = collect_parts_from_session()
-
-    formatted = f"""{{
-    "title": "{st.session_state.get("song_title", "")}",
-    "parts": {{
-"""
-
-    for k, v in parts_dict.items():
-        indented_v = indent_text(v, spaces=18)
-
-        formatted += f'''        "{k}": """
-{indented_v}
-""",
-'''
-
-    formatted += f"""    }},
-    "song_form": "{song_form}",
-}},
-"""
+    """PPT 생성기 페이지에 그대로 붙여넣는 세트리스트 블록 (service/setlist_format.py 형식)"""
+    song = {
+        "title": st.session_state.get("song_title", ""),
+        "parts": collect_parts_from_session(),
+        "song_form": song_form,
+    }
 
     # pyperclip.copy(formatted)
-    st.session_state.extracted_text = formatted
+    st.session_state.extracted_text = format_song(song) + "\n"
     st.toast("복사되었습니다 ✅", icon="📋")
 
 
@@ -108,71 +104,130 @@ def indent_text(text: str, spaces: int = 8) -> str:
     )
 
 
-def ppt_save(list, path):
-    prs = Presentation()
+def ppt_save(list, path, stream: bool = False, cache=None, jobs: int = 1):
+    """
+    stream=True 면 Presentation 을 메모리에 만들지 않고 슬라이드를 zip 에 바로 쓴다.
+    cache(SongSlideCache) 를 주면 바뀌지 않은 곡은 렌더링하지 않고 저장된 슬라이드를 쓴다.
+    jobs > 1 이면 곡들을 프로세스 풀에서 병렬로 렌더링한다. (슬라이드 순서는 list 순서 그대로)
+    """
+    if stream:
+        stream_deck(list, path, cache=cache, jobs=jobs)
+        return
 
-    for song in list:
-        render_song(prs, song)
+    prs = Presentation()
+    renderer = TemplateRenderer(prs)
+
+    if jobs > 1:
+        for fragments in iter_song_fragments(
+            list, prs.slide_width, prs.slide_height, jobs=jobs, cache=cache
+        ):
+            for blob in fragments:
+                renderer.add_slide_xml(blob)
+    else:
+        for song in list:
+            renderer.render_song(song, cache=cache)
 
     prs.save(path)
 
 
+@st.cache_resource
+def get_lyrics_client() -> LyricsClient:
+    # 세션/커넥션 풀과 캐시는 프로세스 전체에서 하나를 재사용한다.
+    cache = LyricsCache(".cache/lyrics.sqlite3")
+    return LyricsClient(concurrency=8, timeout=10, cache=cache)
+
+
 def crawl_lyrics(song_name: str, limit: int = 8):
-    url = f"https://music.bugs.co.kr/search/lyrics?q={quote(song_name)}"
-    headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+    return asyncio.run(get_lyrics_client().search(song_name, limit=limit))
 
-    res = requests.get(url, headers=headers, timeout=10)
-    res.raise_for_status()
-    soup = BeautifulSoup(res.text, "html.parser")
 
-    results = []
+def crawl_lyrics_with_prefetch(song_name: str, limit: int = 8):
+    """
+    검색 + 결과 곡들의 가사를 동시에 미리 받아서 세션에 저장해 둔다.
+    select 를 누르면 sync_lyrics_with_track 이 네트워크 없이 바로 가사를 채운다.
+    """
+    results = asyncio.run(
+        get_lyrics_client().search_with_lyrics(song_name, limit=limit)
+    )
 
-    rows = soup.select('tr[rowtype="lyrics"]')
+    prefetched = st.session_state.setdefault("prefetched_lyrics", {})
+    for r in results:
+        lyrics = r.pop("lyrics")
+        if lyrics is not None:
+            prefetched[r["track_id"]] = lyrics
 
-    print(rows)
+    return results
 
-    for row in rows:
-        if len(results) >= limit:
-            break
 
-        # track_id (진짜 곡 ID)
-        track_id = row.get("trackid", "").strip()
+@st.cache_resource
+def get_song_library():
+    # source/lyrics.py 가 바뀌었으면 그 곡들만 라이브러리에 다시 가져온다.
+    return open_library()
 
-        # 제목
-        title_a = row.select_one("a[title]")
-        title = title_a.get_text(" ", strip=True) if title_a else ""
 
-        # 아티스트
-        artist_a = row.select_one('a[href*="/artist/"]')
-        artist = artist_a.get_text(" ", strip=True) if artist_a else ""
+@st.cache_resource
+def get_lyrics_index() -> LyricsIndex:
+    index = LyricsIndex()
+    index.add_library(get_song_library())
+    return index
+
+
+def search_local_lyrics(query: str, limit: int = 8):
+    """
+    곡 라이브러리 + 캐시된 가사에서 먼저 찾는다. 결과는 crawl_lyrics 와 같은 모양이고,
+    가사는 prefetched_lyrics 에 넣어 두어서 select 하면 바로 채워진다.
+    """
+    index = get_lyrics_index()
+    index.refresh_from_cache(get_lyrics_client().cache)
+
+    prefetched = st.session_state.setdefault("prefetched_lyrics", {})
+    results = []
+
+    for hit in index.search(query, limit=limit):
+        if hit["source"] == "library":
+            track_id = f"library:{hit['key']}"
+            artist = f"📚 라이브러리 · {hit['part']} 파트"
+        else:
+            track_id = hit["key"]
+            artist = hit["artist"]
+
+        prefetched[track_id] = hit["lyrics"]
+        results.append(
+            {
+                "track_id": track_id,
+                "title": hit["title"],
+                "artist": artist,
+                "exact": hit["exact"],
+            }
+        )
 
-        if track_id and title:
-            results.append(
-                {
-                    "track_id": track_id,
-                    "title": title,
-                    "artist": artist,
-                }
-            )
     return results
 
 
-def crawl_track_lyrics(track_id: str) -> str:
-    url = f"https://music.bugs.co.kr/track/{track_id}"
-    headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+def search_lyrics(query: str, limit: int = 8):
+    """
+    로컬(라이브러리 + 캐시) 에서 먼저 찾고, 검색어가 제목이나 가사 줄에 그대로 들어 있는 곡이
+    없으면 (글자만 몇 개 겹친 비슷한 곡뿐이면) 벅스 검색 결과를 앞에 붙인다.
+    벅스 검색이 실패해도 로컬 결과가 있으면 그것만 돌려준다. (오프라인)
+    """
+    local = search_local_lyrics(query, limit=limit)
+    exact = [r.pop("exact") for r in local]
+    if any(exact):
+        return local
 
-    res = requests.get(url, headers=headers, timeout=10)
-    res.raise_for_status()
+    try:
+        network = crawl_lyrics_with_prefetch(query, limit=limit)
+    except Exception:
+        if not local:
+            raise
+        return local
 
-    soup = BeautifulSoup(res.text, "html.parser")
+    seen = {r["track_id"] for r in network}
+    return (network + [r for r in local if r["track_id"] not in seen])[:limit]
 
-    # div.lyricsContainer 안에 xmp에 가사가 들어있는 구조
-    xmp = soup.select_one("div.lyricsContainer xmp")
-    if not xmp:
-        return ""
 
-    lyrics = xmp.get_text("\n", strip=True)
-    return lyrics
+def crawl_track_lyrics(track_id: str) -> str:
+    return asyncio.run(get_lyrics_client().track_lyrics(track_id))
 
 
 def sync_lyrics_with_track():
@@ -185,8 +240,12 @@ def sync_lyrics_with_track():
     prev_track_id = st.session_state.get("prev_track_id")
 
     if current_track_id and current_track_id != prev_track_id:
+        prefetched = st.session_state.get("prefetched_lyrics", {})
         try:
-            st.session_state.lyrics_text = crawl_track_lyrics(current_track_id)
+            if current_track_id in prefetched:
+                st.session_state.lyrics_text = prefetched[current_track_id]
+            else:
+                st.session_state.lyrics_text = crawl_track_lyrics(current_track_id)
             st.session_state.prev_track_id = current_track_id
         except Exception as e:
             st.toast(f"가사 불러오기 실패: {e}", icon="❌")
@@ -218,25 +277,3 @@ def listup_lyrics_result(results):
                 st.session_state.song_artist = r["artist"]
                 st.session_state.track_id = r["track_id"]
                 st.rerun()
-
-
-def plot_chroma_histogram(chroma_vec):
-    notes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-
-    fig, ax = plt.subplots(figsize=(8, 3))
-    ax.bar(notes, chroma_vec)
-    ax.set_title("Pitch Class Histogram (Chroma)")
-    ax.set_ylabel("Normalized Energy")
-    ax.set_xlabel("Note")
-
-    return fig
-
-
-def build_key_ranking_table(ranked_candidates, top_n=10):
-    rows = []
-    for i, (key, mode, score) in enumerate(ranked_candidates[:top_n], start=1):
-        rows.append(
-            {"Rank": i, "Key": key, "Mode": mode, "Correlation": round(score, 3)}
-        )
-
-    return pd.DataFrame(rows)
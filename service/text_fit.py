@@ -0,0 +1,255 @@
+"""
+가사 줄 폭 측정 + 글자 크기 / 줄바꿈 정하기
+
+add_lyrics_slide 는 44pt 고정에 1400pt 폭 박스를 슬라이드 가운데에 둔다.
+기본 슬라이드 폭은 720pt 라서 PowerPoint 가 줄을 바꾸기 전에 긴 줄이 화면 밖으로 나가고,
+그래서 가사에 // 나 줄바꿈을 손으로 넣어 왔다.
+여기서는 TTF 의 글자 폭(advance width)으로 줄 폭을 재서 보이는 영역(박스 ∩ 슬라이드)에 맞춘다.
+
+1. 글자만 조금 줄여서(shrink_floor 까지) 줄바꿈 없이 들어가면 그 크기
+2. 아니면 넘치는 줄을 띄어쓰기에서 나눠서(나눈 줄 길이는 고르게) 들어가는 가장 큰 크기
+3. 그래도 안 되면 min_size 로 나눈 결과 (넘치더라도 가장 작게)
+
+폰트는 fonts/lyrics.ttf 가 있으면 그 파일 (프로젝터 PC 에서 쓰는 폰트를 넣어 두면 정확해진다),
+없으면 matplotlib 에 들어 있는 DejaVuSans.ttf. 폰트에 없는 글자는
+전각(한글 음절, 자모, 한자 등)이면 1em, 나머지는 폰트의 ASCII 평균 폭으로 친다.
+한글 폰트의 음절 폭은 거의 1em 이하라서 실제보다 조금 넓게 재는 쪽이다. (넘치지 않게)
+
+글자 폭은 BMP 전체(65536자)를 em 단위 float32 배열 하나로 만들어 두고,
+줄 폭은 코드포인트 배열로 인덱싱해서 한 번에 더한다.
+- 줄 폭(em)은 줄마다 기억한다. 크기(pt)를 곱하면 되므로 크기마다 다시 재지 않는다.
+- 줄 나누기는 (줄, 크기) 마다, 맞춘 결과는 (박스, 줄들) 마다 기억한다.
+
+numpy / fontTools 는 처음 잴 때 import 한다. (페이지 첫 화면에는 필요 없다)
+"""
+
+import hashlib
+import importlib.util
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+DEFAULT_FONT = Path(__file__).resolve().parent.parent / "fonts" / "lyrics.ttf"
+
+_EMU_PER_PT = 12700
+
+# python-pptx 텍스트박스 기본 여백 (bodyPr lIns / rIns 0.1in, tIns / bIns 0.05in)
+_INSET_X = 7.2
+_INSET_Y = 3.6
+
+# PowerPoint 한 줄 간격 ≈ 글자 크기 x 1.2
+LINE_SPACING = 1.2
+
+# BMP 밖 글자(이모지 등)는 이 칸의 폭(1em)으로 잰다.
+_ASTRAL = 0xFFFF
+
+
+def default_font_path() -> Path | None:
+    if DEFAULT_FONT.exists():
+        return DEFAULT_FONT
+
+    # matplotlib 을 import 하지 않고 패키지 위치만 찾는다.
+    spec = importlib.util.find_spec("matplotlib")
+    if spec is not None and spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            path = Path(location) / "mpl-data" / "fonts" / "ttf" / "DejaVuSans.ttf"
+            if path.exists():
+                return path
+    return None
+
+
+class FontMetrics:
+    """
+    metrics = FontMetrics("fonts/lyrics.ttf")
+    metrics.line_em("창세 전에 그리스도 안에서")   # em 단위 줄 폭 (x 크기(pt) = pt)
+    """
+
+    def __init__(self, path=None):
+        import numpy as np
+
+        self.path = Path(path) if path is not None else None
+
+        widths = np.zeros(0x10000, dtype=np.float32)
+        known = np.zeros(0x10000, dtype=bool)
+
+        if self.path is not None:
+            from fontTools.ttLib import TTFont
+
+            data = self.path.read_bytes()
+            self.digest = hashlib.sha256(data).hexdigest()[:16]
+
+            font = TTFont(self.path, lazy=True)
+            upem = font["head"].unitsPerEm
+            hmtx = font["hmtx"].metrics
+            for cp, glyph in font.getBestCmap().items():
+                if cp < 0x10000:
+                    widths[cp] = hmtx[glyph][0] / upem
+                    known[cp] = True
+            font.close()
+        else:
+            self.digest = "builtin"
+
+        ascii_known = known[0x20:0x7F]
+        narrow = float(widths[0x20:0x7F][ascii_known].mean()) if ascii_known.any() else 0.6
+
+        for cp in np.flatnonzero(~known).tolist():
+            ch = chr(cp)
+            if unicodedata.category(ch) in ("Cc", "Cf", "Mn"):
+                continue  # 폭 없음
+            widths[cp] = 1.0 if unicodedata.east_asian_width(ch) in ("W", "F") else narrow
+        widths[_ASTRAL] = 1.0
+
+        self.widths = widths
+
+        self.line_em = lru_cache(maxsize=16384)(self._line_em)
+        self.wrap = lru_cache(maxsize=16384)(self._wrap)
+
+    def _codes(self, line: str):
+        import numpy as np
+
+        codes = np.frombuffer(line.encode("utf-32-le"), dtype="<u4")
+        return np.minimum(codes, _ASTRAL)
+
+    def _line_em(self, line: str) -> float:
+        return float(self.widths[self._codes(line)].sum())
+
+    def _wrap(self, line: str, limit: float) -> tuple:
+        """
+        line 을 limit(em) 폭 안에 들어가는 줄들로. 띄어쓰기에서 나누고,
+        한 단어가 limit 보다 길면 글자 단위로 자른다.
+        나눈 줄 수가 같은 한에서 가장 좁은 폭으로 다시 나눠서 줄 길이를 고르게 한다.
+        """
+        import numpy as np
+
+        cum = np.concatenate(([0.0], np.cumsum(self.widths[self._codes(line)], dtype=np.float64)))
+        spaces = np.array([i for i, ch in enumerate(line) if ch == " "], dtype=np.int64)
+
+        spans = _break_spans(line, cum, spaces, limit)
+        if len(spans) > 1:
+            # 줄 수가 그대로인 가장 작은 폭을 이분 탐색 (고르게 나누기)
+            lo, hi = float(cum[-1]) / len(spans), limit
+            for _ in range(12):
+                mid = (lo + hi) / 2
+                if len(_break_spans(line, cum, spaces, mid)) <= len(spans):
+                    hi = mid
+                else:
+                    lo = mid
+            spans = _break_spans(line, cum, spaces, hi)
+
+        return tuple(line[start:end] for start, end in spans)
+
+
+def _break_spans(line: str, cum, spaces, limit: float) -> list[tuple[int, int]]:
+    """cum: 글자 폭 누적합(앞에 0). limit 안에 드는 (시작, 끝) 글자 구간을 앞에서부터 채운다."""
+    import numpy as np
+
+    n = len(line)
+    spans = []
+    start = 0
+    while start < n:
+        # [start, end) 가 limit 안에 드는 가장 큰 end
+        end = int(np.searchsorted(cum, cum[start] + limit + 1e-9, side="right")) - 1
+        if end >= n:
+            spans.append((start, n))
+            break
+
+        k = int(np.searchsorted(spaces, end, side="right")) - 1
+        if k >= 0 and spaces[k] > start:
+            cut = int(spaces[k])
+            spans.append((start, cut))
+            start = cut
+        else:
+            cut = max(end, start + 1)
+            spans.append((start, cut))
+            start = cut
+
+        while start < n and line[start] == " ":
+            start += 1
+    return spans
+
+
+class TextFitter:
+    """
+    박스 하나(pt 단위 안쪽 크기)에 가사 줄들을 맞춘다.
+    fit(lines) -> (글자 크기 pt, 슬라이드에 넣을 줄들)
+    """
+
+    def __init__(
+        self,
+        metrics: FontMetrics,
+        width: float,
+        height: float,
+        max_size: int = 44,
+        min_size: int = 28,
+        shrink_floor: int = 36,
+        step: int = 2,
+    ):
+        self.metrics = metrics
+        self.width = width
+        self.height = height
+        self.max_size = max_size
+        self.min_size = min_size
+        self.shrink_floor = shrink_floor
+        self.step = step
+
+        self.fit = lru_cache(maxsize=8192)(self._fit)
+
+    def _sizes(self, floor: int):
+        return range(self.max_size, floor - 1, -self.step)
+
+    def _fits_height(self, n_lines: int, size: int) -> bool:
+        return n_lines * size * LINE_SPACING <= self.height
+
+    def _fit(self, lines: tuple) -> tuple[int, tuple]:
+        ems = [self.metrics.line_em(line) for line in lines]
+        widest = max(ems, default=0.0)
+
+        # 1. 줄바꿈 없이 글자만 줄이기
+        for size in self._sizes(self.shrink_floor):
+            if widest * size <= self.width and self._fits_height(len(lines), size):
+                return size, lines
+
+        # 2. 넘치는 줄만 나누기
+        for size in self._sizes(self.min_size):
+            wrapped = self._wrap_all(lines, ems, size)
+            if self._fits_height(len(wrapped), size):
+                return size, wrapped
+
+        return self.min_size, self._wrap_all(lines, ems, self.min_size)
+
+    def _wrap_all(self, lines, ems, size) -> tuple:
+        out = []
+        for line, em in zip(lines, ems):
+            if em * size <= self.width:
+                out.append(line)
+            else:
+                out.extend(self.metrics.wrap(line, self.width / size))
+        return tuple(out)
+
+
+@lru_cache(maxsize=None)
+def get_metrics() -> FontMetrics:
+    """기본 폰트의 FontMetrics (프로세스마다 한 번)"""
+    return FontMetrics(default_font_path())
+
+
+@lru_cache(maxsize=None)
+def _fitter(box_width: int, box_height: int) -> TextFitter:
+    return TextFitter(
+        get_metrics(),
+        box_width / _EMU_PER_PT - 2 * _INSET_X,
+        box_height / _EMU_PER_PT - 2 * _INSET_Y,
+    )
+
+
+def fit_lyrics(lines, box_width, box_height) -> tuple[int, tuple]:
+    """
+    가사 줄들 → (글자 크기 pt, 맞춘 줄들).
+    box_width / box_height 는 EMU. 슬라이드 밖으로 나가는 부분은 빼고 넘긴다.
+    """
+    return _fitter(int(box_width), int(box_height)).fit(tuple(lines))
+
+
+def font_id() -> str:
+    """슬라이드 캐시 키에 넣는 폰트 식별자 (폰트 파일이 바뀌면 캐시도 바뀐다)"""
+    return get_metrics().digest
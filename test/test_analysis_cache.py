@@ -0,0 +1,42 @@
+"""AnalysisCache 를 배치 분석과 페이지 작업 큐가 같은 폴더로 쓸 때"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from service.analysis_cache import AnalysisCache, analysis_params
+
+PARAMS = analysis_params(22050, 180, 10.0, False)
+RESULT = {"bpm": 120.0, "chroma_vector": np.arange(12, dtype=np.float64)}
+
+
+def _hammer(cache_dir, times, max_bytes):
+    cache = AnalysisCache(cache_dir, max_bytes=max_bytes)
+    pcm = np.zeros(22050, dtype=np.float32)
+    for n in range(times):
+        cache.put_result("dQw4w9WgXcQ", PARAMS, RESULT)
+        cache.put_pcm("dQw4w9WgXcQ", 22050, pcm[: 1000 + n], complete=False)
+        # 다른 영상도 섞어서 evict 가 같이 돌게
+        cache.put_result(f"video{n % 5:06d}", PARAMS, RESULT)
+        result = cache.get_result("dQw4w9WgXcQ", PARAMS)
+        assert result is None or result["bpm"] == 120.0
+    return True
+
+
+def test_concurrent_writers(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_hammer, tmp_path, 100, 20_000) for _ in range(4)]
+        assert all(f.result() for f in futures)
+
+    assert not list(tmp_path.glob("*/*.tmp"))
+
+
+def test_put_get(tmp_path):
+    cache = AnalysisCache(tmp_path)
+    cache.put_result("dQw4w9WgXcQ", PARAMS, RESULT)
+    result = cache.get_result("dQw4w9WgXcQ", PARAMS)
+    assert result["bpm"] == 120.0
+    assert np.array_equal(result["chroma_vector"], RESULT["chroma_vector"])
+
+    cache.put_pcm("dQw4w9WgXcQ", 22050, np.ones(22050, dtype=np.float32), complete=True)
+    assert len(cache.get_pcm("dQw4w9WgXcQ", 22050, 180)) == 22050
@@ -0,0 +1,97 @@
+"""AnalysisQueue 중복 판단 / 끝난 작업 재사용 / 실패한 작업 다시 받기"""
+
+import threading
+
+import pytest
+
+from service import analysis_jobs
+from service.analysis_cache import analysis_params, params_key
+from service.analysis_jobs import DONE, FAILED, AnalysisQueue
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def fake_analyze(monkeypatch):
+    """네트워크 없이: release 가 set 될 때까지 기다렸다가 fail 이면 실패, 아니면 결과를 돌려준다."""
+    state = {"calls": [], "release": threading.Event(), "fail": False}
+
+    def analyze_url(url, cache=None, on_update=None, on_step=None, **options):
+        state["calls"].append(options)
+        state["release"].wait(5)
+        if state["fail"]:
+            raise RuntimeError("boom")
+        return {"bpm": 120.0}
+
+    monkeypatch.setattr(analysis_jobs, "analyze_url", analyze_url)
+    return state
+
+
+@pytest.fixture
+def queue():
+    q = AnalysisQueue(workers=2)
+    yield q
+    q.shutdown()
+
+
+def test_dedup_in_flight(queue, fake_analyze):
+    job = queue.submit(URL, streaming=True, key_margin=0.1)
+    # 같은 영상(다른 URL 형태) + 스트리밍에서 의미 없는 key_margin 만 다름 -> 같은 작업
+    assert queue.submit("https://youtu.be/dQw4w9WgXcQ", streaming=True, key_margin=0.3) is job
+    # 옵션이 다르면 다른 작업
+    other = queue.submit(URL, streaming=False, key_margin=0.1)
+    assert other is not job
+
+    fake_analyze["release"].set()
+    assert job.wait(5) and other.wait(5)
+    assert job.status == DONE and job.result == {"bpm": 120.0}
+    assert len(fake_analyze["calls"]) == 2
+
+
+def test_dedup_key_matches_cache_key(queue, fake_analyze):
+    fake_analyze["release"].set()
+    job = queue.submit(URL, streaming=True, key_margin=0.3)
+    job.wait(5)
+
+    # 작업에 넘긴 옵션으로 analyze_url 이 만드는 캐시 키 == 작업의 중복 판단 키
+    options = fake_analyze["calls"][0]
+    params = analysis_params(
+        options["sr"], options["max_seconds"], options["segment_seconds"],
+        options["streaming"], options["key_margin"], options["timeline"],
+    )
+    assert options["key_margin"] is None
+    assert job.dedup_key == ("dQw4w9WgXcQ", params_key(params))
+
+
+def test_finished_job_is_reused_until_keep_seconds(fake_analyze):
+    fake_analyze["release"].set()
+    queue = AnalysisQueue(workers=1, keep_seconds=600)
+    try:
+        job = queue.submit(URL)
+        assert job.wait(5)
+        assert queue.submit(URL) is job
+        assert len(fake_analyze["calls"]) == 1
+
+        # keep_seconds 가 지나면 목록에서 빠지고 새 작업이 된다
+        job.finished_at -= 601
+        again = queue.submit(URL)
+        assert again is not job
+        assert queue.get(job.id) is None
+        assert again.wait(5)
+        assert len(fake_analyze["calls"]) == 2
+    finally:
+        queue.shutdown()
+
+
+def test_failed_job_is_resubmitted(queue, fake_analyze):
+    fake_analyze["fail"] = True
+    fake_analyze["release"].set()
+    job = queue.submit(URL)
+    assert job.wait(5)
+    assert job.status == FAILED and job.error == "boom"
+
+    fake_analyze["fail"] = False
+    retry = queue.submit(URL)
+    assert retry is not job
+    assert retry.wait(5)
+    assert retry.status == DONE
@@ -0,0 +1,42 @@
+"""analyze_stream 세그먼트 / 청크 길이 조합 (ffmpeg 없이 PCM 청크를 직접 넣는다)"""
+
+import numpy as np
+import pytest
+
+from service import audio_stream
+
+SR = 22050
+
+
+def _synth(seconds: float, bpm: float = 120) -> np.ndarray:
+    """C 장3화음 + 박자마다 클릭"""
+    t = np.arange(int(SR * seconds)) / SR
+    y = sum(np.sin(2 * np.pi * f * t) for f in (261.63, 329.63, 392.0)) / 6
+    beat = (t * bpm / 60) % 1.0
+    y += 0.5 * np.exp(-beat * 40) * np.sin(2 * np.pi * 1000 * t)
+    return y.astype(np.float32)
+
+
+@pytest.fixture
+def fake_stream(monkeypatch):
+    pcm = _synth(12)
+
+    def iter_pcm_chunks(url, sr, max_seconds, chunk_seconds=1.0):
+        n = int(sr * chunk_seconds)
+        for start in range(0, len(pcm), n):
+            yield pcm[start : start + n]
+
+    monkeypatch.setattr(audio_stream, "iter_pcm_chunks", iter_pcm_chunks)
+    return pcm
+
+
+@pytest.mark.parametrize("segment_seconds", [0.5, 3.0])
+def test_segment_shorter_or_longer_than_chunk(fake_stream, segment_seconds):
+    result = audio_stream.analyze_stream(
+        "local", sr=SR, segment_seconds=segment_seconds, min_seconds=60, keep_pcm=True
+    )
+
+    assert result["key"]["primary_key"]["key"] is not None
+    assert not result["stopped_early"]
+    assert result["seconds_used"] == pytest.approx(len(fake_stream) / SR, abs=segment_seconds)
+    assert len(result["pcm"]) == len(fake_stream)
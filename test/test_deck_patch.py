@@ -0,0 +1,91 @@
+"""patch_deck: 고친 덱이 새로 만든 덱과 같은 슬라이드를 갖는지, 빠진 슬라이드의 파트가 남지 않는지"""
+
+import copy
+import zipfile
+from io import BytesIO
+
+from pptx import Presentation
+
+from service.deck_patch import patch_deck
+from service.streamlit_function import ppt_save
+from source.lyrics import SONGS
+
+
+def _save(songs):
+    buf = BytesIO()
+    ppt_save(songs, buf)
+    buf.seek(0)
+    return buf
+
+
+def _blobs(deck):
+    deck.seek(0)
+    return [s.part.blob for s in Presentation(deck).slides]
+
+
+def _shorter(song):
+    """첫 파트만 남겨서 슬라이드 수를 줄인 곡"""
+    song = copy.deepcopy(song)
+    first = next(iter(song["parts"]))
+    song["song_form"] = first
+    return song
+
+
+def test_patch_matches_fresh_deck():
+    old = SONGS[:3]
+    new = [old[0], _shorter(old[1]), old[2], SONGS[3]]
+
+    out = BytesIO()
+    stats = patch_deck(_save(old), new, out=out)
+
+    assert stats["removed"] > 0 and stats["added"] > 0
+    assert _blobs(out) == _blobs(_save(new))
+
+
+def test_removed_slide_notes_are_dropped():
+    old = SONGS[:2]
+    # 새로 붙는 슬라이드가 첫 슬라이드의 노트를 가리키지 않아야 한다.
+    new = [old[0], _shorter(old[1]), SONGS[2]]
+    new_blobs = set(_blobs(_save(new)))
+
+    prs = Presentation(_save(old))
+    # 새 덱에 없는 (빠질) 슬라이드와 첫 슬라이드에 노트를 단다.
+    removed = next(s for s in prs.slides if s.part.blob not in new_blobs)
+    removed.notes_slide.notes_text_frame.text = "빠질 슬라이드"
+    prs.slides[0].notes_slide.notes_text_frame.text = "남는 슬라이드"
+    src = BytesIO()
+    prs.save(src)
+    src.seek(0)
+
+    out = BytesIO()
+    stats = patch_deck(src, new, out=out)
+    assert stats["removed"] > 0 and stats["added"] > 0 and stats["rewritten"] == 0
+
+    with zipfile.ZipFile(out) as z:
+        notes = [n for n in z.namelist() if "notesSlides/notesSlide" in n and n.endswith(".xml")]
+        content_types = z.read("[Content_Types].xml").decode()
+
+    assert len(notes) == 1
+    assert content_types.count("/ppt/notesSlides/") == 1
+
+    patched = Presentation(out)
+    assert patched.slides[0].notes_slide.notes_text_frame.text == "남는 슬라이드"
+    assert not any(s.has_notes_slide for s in list(patched.slides)[1:])
+    assert [s.part.blob for s in patched.slides] == _blobs(_save(new))
+
+
+def test_patch_in_place_uses_private_temp_file(tmp_path):
+    deck = tmp_path / "deck.pptx"
+    deck.write_bytes(_save(SONGS[:2]).getvalue())
+    deck.chmod(0o640)
+    # 다른 프로세스가 같은 이름 규칙으로 쓰는 중인 파일은 건드리지 않는다
+    other = tmp_path / "deck.pptx.tmp"
+    other.write_bytes(b"other writer")
+
+    new = [SONGS[0], _shorter(SONGS[1])]
+    patch_deck(deck, new)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["deck.pptx", "deck.pptx.tmp"]
+    assert other.read_bytes() == b"other writer"
+    assert deck.stat().st_mode & 0o777 == 0o640
+    assert _blobs(BytesIO(deck.read_bytes())) == _blobs(_save(new))
@@ -0,0 +1,44 @@
+"""LyricsCache 와 LyricsIndex 증분 색인"""
+
+from service.lyrics_cache import LyricsCache
+from service.lyrics_index import LyricsIndex
+
+
+def test_refresh_after_newest_track_deleted(tmp_path):
+    cache = LyricsCache(tmp_path / "lyrics.sqlite3")
+    index = LyricsIndex()
+
+    cache.put_track("1", "창세 전에")
+    cache.put_track("2", "주님의 사랑")
+    assert index.refresh_from_cache(cache) == 2
+
+    # 가장 큰 번호의 곡이 먼저 지워져도 (시계가 뒤로 가서 evict 순서가 바뀐 경우 등)
+    # 다음에 저장되는 곡이 그 번호를 다시 받지 않아야 새로 읽힌다.
+    with cache._conn:
+        cache._conn.execute("DELETE FROM track WHERE track_id = '2'")
+    cache.put_track("3", "넓고 크도다")
+    assert index.refresh_from_cache(cache) == 1
+    assert index.search("넓고 크도다")[0]["key"] == "3"
+
+
+def test_track_meta_is_evicted(tmp_path):
+    cache = LyricsCache(tmp_path / "lyrics.sqlite3", max_entries=2)
+    cache.put_search("q", 3, [{"track_id": str(i), "title": f"곡{i}"} for i in range(3)])
+
+    for i in range(3):
+        cache.put_track(str(i), f"가사{i}")
+    # 다음 검색 때 가사를 못 받은 곡의 메타도 정리된다.
+    cache.put_search("q2", 1, [{"track_id": "9", "title": "곡9"}])
+
+    ids = [r[0] for r in cache._conn.execute("SELECT track_id FROM track_meta ORDER BY 1")]
+    assert ids == ["1", "2", "9"]
+
+
+def test_exact_flag():
+    index = LyricsIndex()
+    # bigram 은 모두 있지만 "주님의사랑" 이 이어서 나오지는 않는 곡
+    index.add_track("1", "사랑하는 주님의\n의사 선생님", title="그리스도 안에서")
+    index.add_track("2", "주님의 사랑 넓고 크도다", title="찬양")
+
+    hits = {h["key"]: h["exact"] for h in index.search("주님의 사랑")}
+    assert hits == {"1": False, "2": True}
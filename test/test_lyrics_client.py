@@ -0,0 +1,122 @@
+"""LyricsClient 를 로컬 http.server (bench/fixtures 페이지) 에 붙여서"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+from service.lyrics_client import LyricsClient
+from service.lyrics_extract import parse_search_results, parse_track_lyrics
+
+FIXTURES = Path(__file__).parent.parent / "bench" / "fixtures"
+SEARCH_HTML = (FIXTURES / "bugs_search.html").read_bytes()
+TRACK_HTML = (FIXTURES / "bugs_track.html").read_bytes()
+
+RESULTS = parse_search_results(SEARCH_HTML.decode("utf-8"), limit=8)
+LYRICS = parse_track_lyrics(TRACK_HTML.decode("utf-8"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+
+        if self.path.startswith("/search/lyrics"):
+            self._send(200, SEARCH_HTML)
+            return
+
+        track_id = self.path.rsplit("/", 1)[-1]
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if track_id in server.fail_ids:
+                self._send(500, b"")
+            else:
+                self._send(200, TRACK_HTML)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status, body):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 타임아웃으로 클라이언트가 먼저 끊은 경우
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.in_flight = 0
+    httpd.max_in_flight = 0
+    httpd.delay = 0
+    httpd.fail_ids = set()
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _client(server, **kwargs):
+    host, port = server.server_address
+    return LyricsClient(base_url=f"http://{host}:{port}", **kwargs)
+
+
+def test_search_with_lyrics(server):
+    server.fail_ids = {RESULTS[1]["track_id"]}
+    client = _client(server)
+    try:
+        results = asyncio.run(client.search_with_lyrics("그리스도 안에서", limit=8))
+    finally:
+        client.close()
+
+    assert [r["track_id"] for r in results] == [r["track_id"] for r in RESULTS]
+    # 가사 요청 하나가 실패해도 나머지는 그대로
+    assert results[1]["lyrics"] is None
+    assert all(r["lyrics"] == LYRICS for i, r in enumerate(results) if i != 1)
+
+
+def test_concurrency_limit(server):
+    server.delay = 0.1
+    client = _client(server, concurrency=3)
+    try:
+        results = asyncio.run(client.search_with_lyrics("그리스도 안에서", limit=8))
+    finally:
+        client.close()
+
+    assert all(r["lyrics"] == LYRICS for r in results)
+    assert 1 < server.max_in_flight <= 3
+
+
+def test_timeout(server):
+    server.delay = 1.0
+    client = _client(server, timeout=0.2)
+    try:
+        with pytest.raises(requests.Timeout):
+            asyncio.run(client.track_lyrics(RESULTS[0]["track_id"]))
+
+        started = time.perf_counter()
+        results = asyncio.run(client.search_with_lyrics("그리스도 안에서", limit=8))
+        elapsed = time.perf_counter() - started
+    finally:
+        client.close()
+
+    assert len(results) == 8
+    assert all(r["lyrics"] is None for r in results)
+    assert elapsed < server.delay
@@ -0,0 +1,42 @@
+"""lxml 추출 백엔드가 bs4 (기존 방식) 와 같은 결과를 내는지"""
+
+from pathlib import Path
+
+import pytest
+
+from service.lyrics_extract import parse_search_results, parse_track_lyrics
+
+FIXTURES = Path(__file__).parent.parent / "bench" / "fixtures"
+
+
+def _read(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("limit", [1, 8, 100])
+def test_search_results(limit):
+    html = _read("bugs_search.html")
+    assert parse_search_results(html, limit, backend="lxml") == parse_search_results(
+        html, limit, backend="bs4"
+    )
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "bugs_track.html",
+        "bugs_track_no_lyrics.html",
+        # lyricsContainer 안에는 xmp 가 없고 다음 div 에 있는 경우
+        "bugs_track_xmp_outside.html",
+        # 대문자 <XMP> ... </XMP>
+        "bugs_track_upper_xmp.html",
+    ],
+)
+def test_track_lyrics(name):
+    html = _read(name)
+    assert parse_track_lyrics(html, backend="lxml") == parse_track_lyrics(html, backend="bs4")
+
+
+def test_track_lyrics_fixtures():
+    assert parse_track_lyrics(_read("bugs_track_xmp_outside.html")) == ""
+    assert parse_track_lyrics(_read("bugs_track_upper_xmp.html")).endswith("& 영광을 돌리세")
@@ -0,0 +1,54 @@
+"""병렬 렌더링(jobs > 1) 이 순차 렌더링과 같은 덱을 만드는지"""
+
+from io import BytesIO
+
+from pptx import Presentation
+
+from service.parallel_render import iter_song_fragments
+from service.slide_cache import SongSlideCache
+from service.streamlit_function import ppt_save
+from source.lyrics import SONGS
+
+SONGS_X3 = SONGS[:4] * 3
+
+
+def _build(songs, **kwargs):
+    buf = BytesIO()
+    ppt_save(songs, buf, **kwargs)
+    buf.seek(0)
+    return Presentation(buf)
+
+
+def _slides(prs):
+    return [(s.slide_id, s.part.blob) for s in prs.slides]
+
+
+def test_parallel_matches_sequential(tmp_path):
+    expected = _slides(_build(SONGS_X3))
+
+    assert _slides(_build(SONGS_X3, jobs=2)) == expected
+    assert _slides(_build(SONGS_X3, jobs=2, stream=True)) == expected
+
+    # 캐시가 비었을 때(워커 렌더링) 와 찼을 때(캐시 적중) 모두 같아야 한다.
+    cache = SongSlideCache(tmp_path)
+    assert _slides(_build(SONGS_X3, jobs=2, cache=cache)) == expected
+    assert _slides(_build(SONGS_X3, jobs=2, cache=cache)) == expected
+    assert cache.stats()["hits"] > 0
+
+
+def test_in_flight_songs_are_bounded():
+    jobs = 2
+    read = 0
+
+    def songs():
+        nonlocal read
+        for song in SONGS_X3:
+            read += 1
+            yield song
+
+    prs = Presentation()
+    fragments = iter_song_fragments(songs(), prs.slide_width, prs.slide_height, jobs=jobs)
+    for done, _ in enumerate(fragments, start=1):
+        assert read - done <= jobs * 2
+
+    assert read == len(SONGS_X3)
@@ -0,0 +1,105 @@
+"""
+python-pptx 내부 API 의존성 점검
+
+slide_template / pptx_stream / deck_patch 는 슬라이드를 빨리 붙이려고 python-pptx 의
+밑줄(_) API 를 직접 쓴다. pyproject 에서 버전을 묶어 두었지만, 올릴 때 여기가 먼저 깨지도록.
+"""
+
+import pytest
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import Part
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml import parse_xml
+
+from service.function import render_song
+from service.pptx_stream import stream_deck
+from service.slide_template import TemplateRenderer
+from source.lyrics import SONGS
+
+
+def test_presentation_part_internals():
+    prs = Presentation()
+    prs_part = prs.part
+
+    sldIdLst = prs_part._element.get_or_add_sldIdLst()
+    assert isinstance(sldIdLst._next_id, int)
+    assert callable(sldIdLst._add_sldId)
+    assert prs_part._element.sldIdLst is sldIdLst
+
+    assert str(prs_part._next_slide_partname) == "/ppt/slides/slide1.xml"
+    assert callable(prs_part.rels._add_relationship)
+    assert callable(prs_part.drop_rel)
+    assert prs_part.package._rels.xml
+
+
+def test_add_relationship_and_sld_id():
+    """TemplateRenderer / StreamingDeckWriter 가 쓰는 순서 그대로"""
+    prs = Presentation()
+    prs_part = prs.part
+    slide_part = Part(prs_part._next_slide_partname, "application/xml", prs_part.package)
+
+    rId = prs_part.rels._add_relationship(RT.SLIDE, slide_part)
+    sldIdLst = prs_part._element.get_or_add_sldIdLst()
+    sldIdLst._add_sldId(id=256, rId=rId)
+
+    assert sldIdLst[-1].rId == rId
+    assert prs_part.rels[rId].target_part is slide_part
+    assert not slide_part._rels
+
+
+def test_content_types_item():
+    prs = Presentation()
+    parts = list(prs.part.package.iter_parts())
+    xml = serialize_part_xml(_ContentTypesItem.xml_for(parts))
+    assert b"/ppt/presentation.xml" in xml
+    assert parse_xml(xml) is not None
+
+
+def test_template_renderer_matches_render_song():
+    """내부 API 동작이 바뀌면 프로토타입 복제 결과가 render_song 과 달라진다."""
+    songs = SONGS[:2]
+
+    expected = Presentation()
+    for song in songs:
+        render_song(expected, song)
+
+    actual = Presentation()
+    renderer = TemplateRenderer(actual)
+    for song in songs:
+        renderer.render_song(song)
+
+    assert [s.part.blob for s in actual.slides] == [s.part.blob for s in expected.slides]
+
+
+def test_stream_deck_opens(tmp_path):
+    path = tmp_path / "deck.pptx"
+    stream_deck(SONGS[:2], path)
+
+    expected = Presentation()
+    for song in SONGS[:2]:
+        render_song(expected, song)
+
+    assert [s.part.blob for s in Presentation(path).slides] == [
+        s.part.blob for s in expected.slides
+    ]
+
+
+def test_stream_deck_error_leaves_no_partial_file(tmp_path):
+    path = tmp_path / "deck.pptx"
+    path.write_bytes(b"old deck")
+
+    def songs():
+        yield SONGS[0]
+        raise RuntimeError("렌더링 중 오류")
+
+    with pytest.raises(RuntimeError):
+        stream_deck(songs(), path)
+
+    # 기존 파일은 그대로, 임시 파일은 남지 않는다.
+    assert path.read_bytes() == b"old deck"
+    assert [p.name for p in tmp_path.iterdir()] == ["deck.pptx"]
+
+    stream_deck(SONGS[:1], path)
+    assert len(Presentation(path).slides) > 0
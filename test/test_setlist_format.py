@@ -0,0 +1,82 @@
+"""세트리스트 형식 파서"""
+
+import json
+
+import pytest
+
+from service.deck_builder import load_song_list
+from service.setlist_format import (
+    SetlistError,
+    format_setlist,
+    load_setlist,
+    parse_setlist,
+    validate_songs,
+)
+from service.song_library import read_song_file
+from service.slide_plan import LYRICS, plan_song
+from source.lyrics import SONGS
+
+
+def test_round_trip():
+    songs = SONGS[:3]
+    parsed = parse_setlist(format_setlist(songs))
+    assert parsed.ok and not parsed.warnings
+    assert all(plan_song(a) == plan_song(b) for a, b in zip(songs, parsed.songs))
+
+
+def test_lyric_line_starting_with_equals_is_not_a_header():
+    text = "= 곡\nform: A\n\n[A]\n=주님 찬양해\n== 할렐루야\n\n= 다음 곡\nform: A\n\n[A]\n가사\n"
+    parsed = parse_setlist(text)
+    assert parsed.ok
+    assert [s["title"] for s in parsed.songs] == ["곡", "다음 곡"]
+    assert parsed.songs[0]["parts"]["A"] == "=주님 찬양해\n== 할렐루야"
+
+
+def test_text_before_first_header():
+    parsed = parse_setlist("=주님\n= 곡\nform: A\n\n[A]\n가사\n")
+    assert [issue.line for issue in parsed.issues] == [1]
+    assert len(parsed.songs) == 1
+
+
+def test_missing_part_is_a_warning():
+    text = "= 곡\nform: AB\n\n[A]\n가사\n"
+    parsed = parse_setlist(text)
+    assert parsed.ok and len(parsed.songs) == 1
+    assert "B" in parsed.warnings[0].message
+    assert parsed.warnings[0].line == 2
+    assert [s.lines for s in plan_song(parsed.songs[0]) if s.kind == LYRICS] == [("가사",)]
+    assert load_setlist(text) == parsed.songs
+
+
+def test_literal_bad_values_are_issues():
+    text = """[
+    {[1]: 2},
+    {"title": "t", "parts": {"A": "가"}, "song_form": None},
+    {"title": "t", "parts": {"A": 1}, "song_form": "A"},
+    {"title": "ok", "parts": {"A": "가"}, "song_form": "AB"},
+]"""
+    parsed = parse_setlist(text)
+    assert [issue.song for issue in parsed.issues] == [0, 1, 2]
+    assert [s["title"] for s in parsed.songs] == ["ok"]
+    assert [w.song for w in parsed.warnings] == [3]
+
+
+def test_literal_missing_song_form_is_an_issue():
+    parsed = parse_setlist('[{"title": "t", "parts": {"A": "가사"}}]')
+    assert not parsed.songs
+    assert [(issue.song, issue.title) for issue in parsed.issues] == [(0, "t")]
+    assert "song_form" in parsed.issues[0].message
+
+
+def test_json_and_library_use_the_same_check(tmp_path):
+    path = tmp_path / "songs.json"
+    path.write_text(json.dumps([{"title": "t", "parts": {"A": "가사"}}]), encoding="utf-8")
+
+    for load in (load_song_list, read_song_file, lambda p: validate_songs(json.loads(p.read_text()))):
+        with pytest.raises(SetlistError, match="1번째 곡: song_form 이 없습니다"):
+            load(path)
+
+    path.write_text(json.dumps([{"title": "t", "parts": {"A": "가사"}, "song_form": "A", "x": 1}]))
+    assert load_song_list(path) == read_song_file(path) == [
+        {"title": "t", "parts": {"A": "가사"}, "song_form": "A"}
+    ]
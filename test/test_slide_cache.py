@@ -0,0 +1,36 @@
+"""SongSlideCache 를 여러 프로세스가 같은 폴더로 쓸 때 (CLI --jobs 워커 + PPT 페이지)"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from service.slide_cache import SongSlideCache
+
+_FRAGMENTS = [b"<p:sld>a</p:sld>", b"<p:sld>b</p:sld>"]
+
+
+def _hammer(cache_dir, key, times, max_entries):
+    cache = SongSlideCache(cache_dir, max_entries=max_entries)
+    for n in range(times):
+        cache.put(key, _FRAGMENTS)
+        cache.put(f"{key}{n % 7}", _FRAGMENTS)  # 다른 키도 섞어서 evict 도 같이 돌게
+        fragments = cache.get(key)
+        assert fragments is None or fragments == _FRAGMENTS
+    return True
+
+
+def test_concurrent_put_same_key(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_hammer, tmp_path, "same", 150, 5) for _ in range(4)]
+        assert all(f.result() for f in futures)
+
+    assert not list(tmp_path.glob("*.tmp"))
+    assert SongSlideCache(tmp_path).get("same") in (None, _FRAGMENTS)
+
+
+def test_put_get_and_evict(tmp_path):
+    cache = SongSlideCache(tmp_path, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, _FRAGMENTS)
+
+    assert len(list(tmp_path.glob("*.slides"))) == 2
+    assert cache.get("c") == _FRAGMENTS
+    assert cache.stats() == {"hits": 1, "misses": 0}
@@ -0,0 +1,26 @@
+"""슬라이드 플랜과 텍스트 내보내기"""
+
+from service.slide_plan import LYRICS, plan_song
+from service.streamlit_function import holiday_text
+
+PARTS = {
+    "A": "  주님의 사랑 //  넓고 크도다\n\n우리 주를",
+    "B": "할렐루야",
+}
+
+
+def test_plan_splits_on_double_slash_and_strips():
+    lyrics = [s.lines for s in plan_song({"parts": PARTS, "song_form": "AB"}) if s.kind == LYRICS]
+    assert lyrics == [("주님의 사랑",), ("넓고 크도다",), ("우리 주를",), ("할렐루야",)]
+
+
+def test_plan_song_is_memoized_per_song():
+    song = {"title": "t", "parts": PARTS, "song_form": "A(4)B"}
+    assert plan_song(song) is plan_song(dict(song, parts=dict(PARTS)))
+
+
+def test_holiday_text_removes_inline_double_slash():
+    # 플랜과 달리 // 는 지우기만 하고 (줄이 이어짐) 파트 안의 줄은 strip 하지 않는다.
+    assert holiday_text(PARTS, "A(4)Bx2C") == (
+        "주님의 사랑   넓고 크도다\n\n우리 주를\n\n할렐루야\n\n할렐루야"
+    )
@@ -0,0 +1,26 @@
+"""송폼 컴파일러"""
+
+import pytest
+
+from service.song_form import MAX_PLAN_LENGTH, SongFormError, compile_song_form
+
+
+def test_repeats_and_groups():
+    compiled = compile_song_form("(4)A1B(4)[AB]x2C(x2)")
+    assert compiled.plan == ("(4)", "A1", "B", "(4)", "A", "B", "A", "B", "C", "C")
+    assert compiled.part_names == {"A1", "B", "A", "C"}
+
+
+def test_nested_repeat_length_is_capped():
+    with pytest.raises(SongFormError) as exc:
+        compile_song_form("A[[[Bx99]x99]x99]x99")
+    assert "너무 깁니다" in str(exc.value)
+    assert exc.value.position == 9  # 처음 한도를 넘긴 "x99"
+
+    assert len(compile_song_form(f"Ax{MAX_PLAN_LENGTH // 100}x99").plan) <= MAX_PLAN_LENGTH
+
+
+def test_error_position():
+    with pytest.raises(SongFormError) as exc:
+        compile_song_form("AB]")
+    assert exc.value.position == 2